@@ -1,7 +1,27 @@
-from .client_dm_v3 import get_cognite_client_dm_v3
-from .get_client import get_cognite_client
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .client_dm_v3 import get_cognite_client_dm_v3
+    from .get_client import get_cognite_client
 
 __all__ = [
     "get_cognite_client",
     "get_cognite_client_dm_v3",
 ]
+
+# Imported on first access (PEP 562), the cognite SDK is slow to import:
+_LAZY_IMPORTS = {
+    "get_cognite_client": ".get_client",
+    "get_cognite_client_dm_v3": ".client_dm_v3",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
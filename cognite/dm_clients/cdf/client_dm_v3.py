@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import json
 import logging
 from contextlib import suppress
+from contextvars import ContextVar
 from pprint import pformat
-from typing import Any, Dict, Iterable, List, Literal, Optional, Sequence
+from time import perf_counter
+from typing import Any, Dict, Iterable, Iterator, List, Literal, Optional, Sequence, Tuple
 from urllib.parse import urlencode
 
 from cognite.client import ClientConfig, CogniteClient
@@ -13,9 +16,11 @@ from pydantic import parse_obj_as
 from requests import Response
 from retry import retry
 
+from cognite.dm_clients import explain
 from cognite.dm_clients.cdf.data_classes_dm_v3 import Container, DataModel, Edge, Node, Space, View
 from cognite.dm_clients.cdf.get_client import get_client_config
 from cognite.dm_clients.config import settings
+from cognite.dm_clients.metrics import Metrics
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +29,36 @@ HttpVerbT = Literal["GET", "PUT", "DELETE", "POST"]
 
 _MAX_TRIES = int(settings.get("dm_clients.max_tries", 15))
 
+# the last failed request attempt in this context, with the metrics to count its retry in:
+_failed_request: ContextVar[Optional[Tuple[Metrics, str, str]]] = ContextVar("failed_request", default=None)
+
+
+class _RetryLogger:
+    """
+    Logger for `retry`, which only calls it when a failed attempt is followed by another one: logs the retry and counts
+    it in the metrics of the failed request (the last attempt is not a retry).
+    """
+
+    def warning(self, msg: str, *args: Any) -> None:
+        logger.warning(msg, *args)
+        if (failed := _failed_request.get()) is not None:
+            _failed_request.set(None)
+            metrics, method, endpoint = failed
+            metrics.record_retry(method, endpoint)
+
+
+_retry_logger = _RetryLogger()
+
 
 class DataModelStorageAPI(APIClient):
     """Base for other API classes"""
 
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # share metrics with the client, if it has them:
+        metrics = getattr(self._cognite_client, "metrics", None)
+        self.metrics: Metrics = metrics if isinstance(metrics, Metrics) else Metrics()
+
     @property
     def url(self) -> str:
         return f"/api/v1/projects/{self._config.project}"
@@ -38,7 +69,12 @@ class DataModelStorageAPI(APIClient):
     def _get_from_endpoint(self, url_query: dict, endpoint: str) -> dict:
         return self._retrieve_from_endpoint("GET", f"{self.url}{endpoint}", url_query)
 
-    @retry(CogniteAPIError, delay=1, backoff=2, max_delay=10, tries=_MAX_TRIES, logger=logger)
+    @retry(CogniteAPIError, delay=1, backoff=2, max_delay=10, tries=_MAX_TRIES, logger=_retry_logger)
+    def _post_page(self, payload: dict, endpoint: str) -> dict:
+        """Request a single page of results, the response includes `nextCursor` if there are more."""
+        return self._request("POST", f"{self.url}{endpoint}", payload)
+
+    @retry(CogniteAPIError, delay=1, backoff=2, max_delay=10, tries=_MAX_TRIES, logger=_retry_logger)
     def _retrieve_from_endpoint(self, method: Literal["GET", "POST"], url: str, data: dict) -> dict:
         """
         Request data from API, potentially making multiple request if `limit` is not set in `data`.
@@ -47,20 +83,54 @@ class DataModelStorageAPI(APIClient):
         """
         follow_cursor = data.get("limit") is None
         data = data.copy()
-        response = self._make_request(method, url, data)
-        response.raise_for_status()
-        result = response.json()
+        result = self._request(method, url, data)
         while follow_cursor and (cursor := result.get("nextCursor")):
             data["cursor"] = cursor
-            another_response = self._make_request(method, url, data)
-            another_response.raise_for_status()
-            another_result = another_response.json()
+            another_result = self._request(method, url, data)
             result["items"].extend(another_result["items"])
             result["nextCursor"] = another_result.get("nextCursor")
         with suppress(KeyError):
             del result["nextCursor"]
             del result["cursor"]
-        logger.debug(f"{method} to {url}\ndata:\n{pformat(data)}\nresult:\n{pformat(result)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"{method} to {url}\ndata:\n{pformat(data)}\nresult:\n{pformat(result)}")
+        return result
+
+    def _request(self, method: Literal["GET", "POST"], url: str, data: Dict[str, Any]) -> dict:
+        """
+        Make a single request and return the parsed response, recording metrics (if enabled) and the request itself
+        (in explain mode). Writes are not sent in explain's dry-run mode.
+        """
+        if not self.metrics.enabled and not explain.is_active():
+            response = self._make_request(method, url, data)
+            response.raise_for_status()
+            return response.json()
+
+        endpoint = url.split(f"/projects/{self._config.project}/", 1)[-1]
+        if not explain.should_send(method, endpoint):
+            result: dict = {"items": []}
+            explain.record_request(method, endpoint, data, result, seconds=0.0, sent=False)
+            return result
+        start = perf_counter()
+        try:
+            response = self._make_request(method, url, data)
+            response.raise_for_status()
+            result = response.json()
+        except CogniteAPIError:
+            if self.metrics.enabled:
+                _failed_request.set((self.metrics, method, endpoint))  # counted if it is retried, see `_RetryLogger`
+            raise
+        seconds = perf_counter() - start
+        if self.metrics.enabled:
+            self.metrics.record_request(
+                method,
+                endpoint,
+                seconds=seconds,
+                request_bytes=len(json.dumps(data)) if method == "POST" else len(urlencode(data)),
+                response_bytes=len(response.content) if isinstance(response.content, bytes) else 0,
+                items=len(result.get("items", [])) if isinstance(result, dict) else 0,
+            )
+        explain.record_request(method, endpoint, data, result, seconds=seconds, sent=True)
         return result
 
     def _make_request(
@@ -119,7 +189,6 @@ class SpacesAPI(DataModelStorageAPI):
         self._post_to_endpoint(self._payload_space_ids(_ext_ids), "/delete")
 
 
-# DataModelAPI not currently used, but included here for completeness.
 class DataModelAPI(DataModelStorageAPI):
     @property
     def url(self) -> str:
@@ -170,6 +239,19 @@ class DataModelAPI(DataModelStorageAPI):
             return
         self._post_to_endpoint(self._payload_delete(_data_models), "/delete")
 
+    @retry(CogniteAPIError, delay=1, backoff=2, max_delay=10, tries=_MAX_TRIES, logger=_retry_logger)
+    def graphql(self, space: str, datamodel: str, version: str, query: str, variables: Optional[dict] = None) -> dict:
+        """Run a GraphQL query against a data model, the request is recorded like all others (metrics, explain)."""
+        payload: Dict[str, Any] = {"query": query}
+        if variables:
+            payload["variables"] = variables
+        return self._request(
+            "POST",
+            f"/api/v1/projects/{self._config.project}/userapis"
+            f"/spaces/{space}/datamodels/{datamodel}/versions/{version}/graphql",
+            payload,
+        )
+
 
 # ViewsAPI not currently used, but included here for completeness.
 class ViewsAPI(DataModelStorageAPI):
@@ -313,14 +395,67 @@ class NodesAPI(DataModelStorageAPI):
             },
         }
 
-    def list(self, view: View, limit: int = 1000) -> List[Node]:
-        payload = {
-            "limit": limit,
+    def list(self, view: View, limit: Optional[int] = 1000, filter_: Optional[dict] = None) -> List[Node]:
+        """
+        List nodes with properties from the `view`.
+        Optionally, restrict the query with a DM `filter_`.
+        With `limit=None`, all the matching nodes are listed (following cursors).
+        """
+        payload: Dict[str, Any] = {
             "instanceType": "node",
             "sources": [self._payload_view_source(view)],
         }
+        if limit is not None:
+            payload["limit"] = limit
+        if filter_ is not None:
+            payload["filter"] = filter_
         return self._parse(self._post_to_endpoint(payload, "/list"))
 
+    def iter_list(self, view: View, chunk_size: int = 1000, filter_: Optional[dict] = None) -> Iterator[List[Node]]:
+        """
+        Like `list(limit=None)`, but yields the nodes one page (of up to `chunk_size` nodes) at a time. The next page is
+        only requested when iteration continues.
+        """
+        cursor = None
+        while True:
+            nodes, cursor = self.list_page(view, chunk_size, cursor, filter_)
+            yield nodes
+            if not cursor:
+                return
+
+    def list_page(
+        self, view: View, limit: int = 1000, cursor: Optional[str] = None, filter_: Optional[dict] = None
+    ) -> Tuple[List[Node], Optional[str]]:
+        """A single page of `list()`, starting at `cursor`, and the cursor of the next page (None on the last page)."""
+        payload: Dict[str, Any] = {
+            "instanceType": "node",
+            "sources": [self._payload_view_source(view)],
+            "limit": limit,
+        }
+        if filter_ is not None:
+            payload["filter"] = filter_
+        if cursor is not None:
+            payload["cursor"] = cursor
+        result = self._post_page(payload, "/list")
+        return self._parse(result), result.get("nextCursor")
+
+    def list_space_page(
+        self, space: str, limit: int = 1000, cursor: Optional[str] = None
+    ) -> Tuple[List[Node], Optional[str]]:
+        """
+        A single page of all the nodes in `space` (of any view, without properties), starting at `cursor`, and the
+        cursor of the next page (None on the last page).
+        """
+        payload: Dict[str, Any] = {
+            "instanceType": "node",
+            "filter": {"equals": {"property": ["node", "space"], "value": space}},
+            "limit": limit,
+        }
+        if cursor is not None:
+            payload["cursor"] = cursor
+        result = self._post_page(payload, "/list")
+        return self._parse(result), result.get("nextCursor")
+
     def retrieve(self, view: View, external_ids: Iterable[str]) -> List[Node]:
         _ext_ids = list(external_ids)
         if not _ext_ids:
@@ -332,8 +467,12 @@ class NodesAPI(DataModelStorageAPI):
         return self._parse(self._post_to_endpoint(payload, "/byids"))
 
     def apply(self, view: View, nodes: Iterable[Node]) -> None:
-        _nodes = list(nodes)
-        if not _nodes:
+        self.apply_many((view, node) for node in nodes)
+
+    def apply_many(self, view_nodes: Iterable[Tuple[View, Node]]) -> None:
+        """Apply nodes of different views (e.g. of several types) in a single request."""
+        _view_nodes = list(view_nodes)
+        if not _view_nodes:
             return
         payload = {
             "replace": True,
@@ -347,7 +486,7 @@ class NodesAPI(DataModelStorageAPI):
                         },
                     ],
                 }
-                for node in _nodes
+                for view, node in _view_nodes
             ],
         }
         self._parse(self._post_to_endpoint(payload, ""))
@@ -387,13 +526,17 @@ class EdgesAPI(DataModelStorageAPI):
         node_view: View,
         attributes: Optional[Sequence[str]] = None,
         start_external_ids: Optional[Sequence[str]] = None,
-        limit: int = 1000,
+        limit: Optional[int] = 1000,
+        end_external_ids: Optional[Sequence[str]] = None,
     ) -> List[Edge]:
         """
         List edges for "outwards" relationships from the `node_view`, i.e. their startNode is an instance from the view.
         Optionally, further restrict the query with:
          * attributes: list only edges that describe relation on the given set of attributes,
          * start_external_ids: list only edges that have `startNode` matching one of the given set of externalIds
+         * end_external_ids: list only edges that have `endNode` matching one of the given set of externalIds, this
+           is how "inwards" relationships (pointing to the given nodes) are looked up
+        With `limit=None`, all the matching edges are listed (following cursors).
         """
         if attributes is None:
             # query edges for all attributes
@@ -415,7 +558,9 @@ class EdgesAPI(DataModelStorageAPI):
                 },
             ],
         }
-        if start_external_ids is not None and not start_external_ids:
+        if (start_external_ids is not None and not start_external_ids) or (
+            end_external_ids is not None and not end_external_ids
+        ):
             # empty list, that's different from None!
             # Passing in None means "gimme for all", but passing in [] means "gimme for these 0 elements",
             # which we shall do:
@@ -431,13 +576,79 @@ class EdgesAPI(DataModelStorageAPI):
                 }
             )
 
-        payload = {
+        if end_external_ids:
+            filter_["and"].append(
+                {
+                    "in": {
+                        "property": ["edge", "endNode"],
+                        "values": [[node_view.space, ext_id] for ext_id in end_external_ids],
+                    },
+                }
+            )
+
+        payload: Dict[str, Any] = {
             "instanceType": "edge",
-            "limit": limit,
             "filter": filter_,
         }
+        if limit is not None:
+            payload["limit"] = limit
         return self._parse(self._post_to_endpoint(payload, "/list"))
 
+    def iter_list(self, node_view: View, attributes: Sequence[str], chunk_size: int = 1000) -> Iterator[List[Edge]]:
+        """
+        The edges of `attributes` ("outwards" relationships from the `node_view`), one page (of up to `chunk_size`
+        edges) at a time. The next page is only requested when iteration continues.
+        """
+        cursor = None
+        while True:
+            edges, cursor = self.list_page(node_view, attributes, chunk_size, cursor)
+            yield edges
+            if not cursor:
+                return
+
+    def list_page(
+        self, node_view: View, attributes: Sequence[str], limit: int = 1000, cursor: Optional[str] = None
+    ) -> Tuple[List[Edge], Optional[str]]:
+        """
+        A single page of the edges of `attributes` ("outwards" relationships from the `node_view`), starting at
+        `cursor`, and the cursor of the next page (None on the last page).
+        """
+        if not attributes:
+            return [], None
+        payload: Dict[str, Any] = {
+            "instanceType": "edge",
+            "filter": {
+                "in": {
+                    "property": ["edge", "type"],
+                    "values": [
+                        [node_view.space, node_view.properties[attr]["type"]["externalId"]] for attr in attributes
+                    ],
+                },
+            },
+            "limit": limit,
+        }
+        if cursor is not None:
+            payload["cursor"] = cursor
+        result = self._post_page(payload, "/list")
+        return self._parse(result), result.get("nextCursor")
+
+    def list_space_page(
+        self, space: str, limit: int = 1000, cursor: Optional[str] = None
+    ) -> Tuple[List[Edge], Optional[str]]:
+        """
+        A single page of all the edges in `space` (of any type), starting at `cursor`, and the cursor of the next page
+        (None on the last page).
+        """
+        payload: Dict[str, Any] = {
+            "instanceType": "edge",
+            "filter": {"equals": {"property": ["edge", "space"], "value": space}},
+            "limit": limit,
+        }
+        if cursor is not None:
+            payload["cursor"] = cursor
+        result = self._post_page(payload, "/list")
+        return self._parse(result), result.get("nextCursor")
+
     def retrieve(self, space: str, external_ids: Iterable[str]) -> List[Edge]:
         _ext_ids = list(external_ids)
         if not _ext_ids:
@@ -475,6 +686,7 @@ class CogniteClientDmV3(CogniteClient):
     def __init__(self, config: ClientConfig):
         # config.headers["cdf-version"] = "alpha"
         super().__init__(config)
+        self.metrics = Metrics()
         self.spaces = SpacesAPI(self._config, api_version=self._API_VERSION, cognite_client=self)
         self.datamodels = DataModelAPI(self._config, api_version=self._API_VERSION, cognite_client=self)
         self.views = ViewsAPI(self._config, api_version=self._API_VERSION, cognite_client=self)
@@ -482,12 +694,8 @@ class CogniteClientDmV3(CogniteClient):
         self.nodes = NodesAPI(self._config, api_version=self._API_VERSION, cognite_client=self)
         self.edges = EdgesAPI(self._config, api_version=self._API_VERSION, cognite_client=self)
 
-    def graph(self, space: str, datamodel: str, version: str, query: str):
-        return self.post(
-            f"/api/v1/projects/{self.config.project}/userapis"
-            f"/spaces/{space}/datamodels/{datamodel}/versions/{version}/graphql",
-            json={"query": query},
-        ).json()
+    def graph(self, space: str, datamodel: str, version: str, query: str, variables: Optional[dict] = None):
+        return self.datamodels.graphql(space, datamodel, version, query, variables)
 
 
 def get_cognite_client_dm_v3() -> CogniteClientDmV3:
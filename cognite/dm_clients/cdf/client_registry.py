@@ -0,0 +1,112 @@
+"""
+Process-wide registry of CDF clients, so that many `DomainClient` instances (e.g. one per space or data model in a
+multi-tenant service) share credentials (and with them, cached tokens) and `CogniteClientDmV3` instances.
+
+The cognite SDK already shares a single pooled HTTP session between all its clients. The size of the connection pool
+should be at least the number of threads making requests, see `set_connection_pool_size()` and the
+`max_connection_pool_size` and `max_workers` settings. Resizing the pool of an existing session relies on SDK
+internals; with SDK versions which do not have them, the size only applies to sessions created afterwards.
+"""
+from __future__ import annotations
+
+import logging
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+import requests.adapters
+import urllib3
+from cognite.client import ClientConfig, global_config
+
+from cognite.dm_clients.config import settings
+
+from .client_dm_v3 import CogniteClientDmV3
+from .get_client import CogniteConfig, get_client_config, get_cognite_config
+
+try:
+    from cognite.client._http_client import get_global_requests_session
+except ImportError:  # private to the SDK, see the module docstring
+    get_global_requests_session = None  # type: ignore
+
+__all__ = [
+    "ClientRegistry",
+    "client_registry",
+    "set_connection_pool_size",
+]
+
+logger = logging.getLogger(__name__)
+
+_MAX_WORKERS = settings.get("dm_clients.max_workers")
+_POOL_SIZE = settings.get("dm_clients.max_connection_pool_size")
+
+
+def set_connection_pool_size(size: int) -> None:
+    """
+    Set the maximal number of pooled connections (per host) of the HTTP session shared by all CDF clients.
+    Can be called at any time, also after clients were created.
+    """
+    global_config.max_connection_pool_size = size
+    if get_global_requests_session is None:
+        logger.warning(
+            "This version of the cognite SDK does not expose its HTTP session, the connection pool size only applies"
+            " to sessions created from now on."
+        )
+        return
+    session = get_global_requests_session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=size, max_retries=urllib3.Retry(False))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+
+class ClientRegistry:
+    """
+    Thread-safe registry of `ClientConfig` (per `CogniteConfig`) and `CogniteClientDmV3` (per `ClientConfig`)
+    instances. Use the module-level `client_registry` instance.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._configs: Dict[str, ClientConfig] = {}
+        # keyed by `id(config)`, the config is kept in the value so that the id is not reused:
+        self._clients: Dict[int, Tuple[ClientConfig, CogniteClientDmV3]] = {}
+        self._pool_configured = False
+
+    def get_client_config(self, config: Optional[CogniteConfig] = None) -> ClientConfig:
+        """Like `get_client_config()`, but returns the same `ClientConfig` (and credentials) for equal settings."""
+        if config is None:
+            config = get_cognite_config()
+        key = config.json()
+        with self._lock:
+            if key not in self._configs:
+                self._configs[key] = get_client_config(config)
+            return self._configs[key]
+
+    def get_client(self, config: ClientConfig) -> CogniteClientDmV3:
+        """Return the `CogniteClientDmV3` for `config`, creating it on first call."""
+        with self._lock:
+            if not self._pool_configured:
+                self._configure_pool()
+            if id(config) not in self._clients:
+                self._clients[id(config)] = (config, CogniteClientDmV3(config))
+            return self._clients[id(config)][1]
+
+    def discard(self, config: ClientConfig) -> None:
+        """Forget the client created for `config`."""
+        with self._lock:
+            self._clients.pop(id(config), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._configs.clear()
+            self._clients.clear()
+
+    def _configure_pool(self) -> None:
+        self._pool_configured = True
+        pool_size = int(_POOL_SIZE) if _POOL_SIZE is not None else global_config.max_connection_pool_size
+        if _MAX_WORKERS is not None and int(_MAX_WORKERS) > pool_size:
+            logger.info(f"Increasing connection pool size from {pool_size} to match max_workers={_MAX_WORKERS}.")
+            pool_size = int(_MAX_WORKERS)
+        if pool_size != global_config.max_connection_pool_size:
+            set_connection_pool_size(pool_size)
+
+
+client_registry = ClientRegistry()
@@ -1,15 +1,29 @@
 from __future__ import annotations
 
 import getpass
+import hashlib
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional, Union
+from threading import Lock, Timer
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 from cognite.client import ClientConfig, CogniteClient
-from cognite.client.credentials import OAuthClientCredentials, OAuthInteractive
+from cognite.client.credentials import CredentialProvider, OAuthClientCredentials, OAuthInteractive
 from pydantic import BaseSettings, validator
 
 from cognite.dm_clients.config import settings
 
+try:
+    import fcntl
+except ImportError:  # not available on Windows, the token file cache is then used without locking
+    fcntl = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
 
 class CogniteConfig(BaseSettings):
     project: str
@@ -25,7 +39,9 @@ class CogniteConfig(BaseSettings):
     client_name: str = ""
     authority_host_uri: str = "https://login.microsoftonline.com"
     port: int = 53000
-    token_cache_path: Optional[Path] = None
+    token_cache_path: Optional[Path] = None  # msal token cache of OAuthInteractive
+    token_prefetch_seconds: int = 0
+    shared_token_cache_path: Optional[Path] = None  # TokenFileCache of client credentials tokens
 
     @property
     def base_url(self) -> str:
@@ -44,6 +60,140 @@ class CogniteConfig(BaseSettings):
         return getpass.getuser() if value is None else value
 
 
+class TokenFileCache:
+    """
+    Access tokens stored in a JSON file shared between processes, keyed by a hash of the token request parameters.
+    Reads and writes hold an exclusive `fcntl` lock on a sidecar ".lock" file, see `locked()`.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock_path = self.path.with_name(f"{self.path.name}.lock")
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Hold the lock for a read-fetch-write cycle, so that concurrent processes fetch a new token only once."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self) -> Dict[str, Dict[str, Union[str, float]]]:
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        entry = self._read().get(key)
+        return None if entry is None else (str(entry["access_token"]), float(entry["expires_at"]))
+
+    def put(self, key: str, access_token: str, expires_at: float) -> None:
+        tokens = {k: v for k, v in self._read().items() if float(v["expires_at"]) > time.time()}
+        tokens[key] = {"access_token": access_token, "expires_at": expires_at}
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        # the file contains secrets, only the owner can read it:
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as tmp_file:
+            json.dump(tokens, tmp_file)
+        os.replace(tmp_path, self.path)
+
+
+class PrefetchingCredentials(CredentialProvider):
+    """
+    Wraps `OAuthClientCredentials` to keep the access token fresh in the background: a first token is fetched as soon as
+    the credentials are created, and a new one `prefetch_seconds` before the current one expires. Requests only wait
+    for a token if none is valid (e.g. after a long suspension of the process).
+    With a `token_cache`, tokens are also shared between processes (worker pools, repeated CLI runs).
+    Tokens are fetched with `OAuthClientCredentials._refresh_access_token()`, internal to the SDK, see `is_supported()`.
+    """
+
+    _EXPIRY_LEEWAY_SECONDS = 3  # never use a token which expires within this many seconds
+
+    def __init__(
+        self,
+        credentials: OAuthClientCredentials,
+        prefetch_seconds: int = 300,
+        token_cache: Optional[TokenFileCache] = None,
+    ):
+        self.credentials = credentials
+        self.prefetch_seconds = prefetch_seconds
+        self.token_cache = token_cache
+        self._cache_key = hashlib.sha256(
+            json.dumps([credentials.token_url, credentials.client_id, credentials.scopes]).encode()
+        ).hexdigest()
+        self._access_token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._refresh_lock = Lock()
+        self._timer: Optional[Timer] = None
+        if prefetch_seconds > 0:
+            self._schedule_refresh(0)
+
+    @staticmethod
+    def is_supported(credentials: OAuthClientCredentials) -> bool:
+        """Whether this version of the cognite SDK lets tokens be fetched explicitly."""
+        return callable(getattr(credentials, "_refresh_access_token", None))
+
+    def authorization_header(self) -> Tuple[str, str]:
+        if not self._is_valid():
+            with self._refresh_lock:  # also waits for a refresh in progress in the background
+                if not self._is_valid():
+                    self._refresh()
+        return "Authorization", f"Bearer {self._access_token}"
+
+    def _is_valid(self) -> bool:
+        return self._access_token is not None and time.time() < self._expires_at - self._EXPIRY_LEEWAY_SECONDS
+
+    def _refresh(self, newer_than: float = 0.0) -> None:
+        """Fetch a new token, unless another process has cached a valid one expiring after `newer_than`."""
+        if self.token_cache is None:
+            self._set_token(*self.credentials._refresh_access_token())
+            return
+        with self.token_cache.locked():
+            cached = self.token_cache.get(self._cache_key)
+            if cached is not None and cached[1] > max(newer_than, time.time() + self._EXPIRY_LEEWAY_SECONDS):
+                self._set_token(*cached)
+                return
+            access_token, expires_at = self.credentials._refresh_access_token()
+            self.token_cache.put(self._cache_key, access_token, expires_at)
+        self._set_token(access_token, expires_at)
+
+    def _set_token(self, access_token: str, expires_at: float) -> None:
+        self._access_token, self._expires_at = access_token, expires_at
+        if self.prefetch_seconds > 0:
+            # short-lived tokens are refreshed half-way through their lifetime:
+            self._refresh_at = expires_at - min(self.prefetch_seconds, (expires_at - time.time()) / 2)
+            self._schedule_refresh(max(0.0, self._refresh_at - time.time()))
+
+    def _schedule_refresh(self, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = Timer(delay, self._refresh_in_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _refresh_in_background(self) -> None:
+        with self._refresh_lock:
+            if time.time() < self._refresh_at:
+                return  # already refreshed by a request
+            try:
+                self._refresh(newer_than=self._expires_at)
+            except Exception:
+                # the next request will try again (and fail loudly, if the problem persists):
+                logger.warning("Background token refresh failed.", exc_info=True)
+
+    def close(self) -> None:
+        """Stop refreshing the token in the background."""
+        self.prefetch_seconds = 0
+        if self._timer is not None:
+            self._timer.cancel()
+
+
 def get_cognite_config() -> CogniteConfig:
     return CogniteConfig(**settings.cognite)
 
@@ -52,7 +202,7 @@ def get_client_config(config: Optional[CogniteConfig] = None) -> ClientConfig:
     if config is None:
         config = get_cognite_config()
 
-    credentials: Union[OAuthClientCredentials, OAuthInteractive]
+    credentials: Union[PrefetchingCredentials, OAuthClientCredentials, OAuthInteractive]
     if config.client_id and config.client_secret:
         credentials = OAuthClientCredentials(
             token_url=f"https://login.microsoftonline.com/{config.tenant_id}/oauth2/v2.0/token",
@@ -60,6 +210,15 @@ def get_client_config(config: Optional[CogniteConfig] = None) -> ClientConfig:
             client_secret=config.client_secret,
             scopes=config.scopes,
         )
+        prefetching = config.token_prefetch_seconds > 0 or config.shared_token_cache_path is not None
+        if prefetching and not PrefetchingCredentials.is_supported(credentials):
+            logger.warning(
+                "This version of the cognite SDK does not support token prefetching and sharing, the"
+                " token_prefetch_seconds and shared_token_cache_path settings are ignored."
+            )
+        elif prefetching:
+            token_cache = TokenFileCache(config.shared_token_cache_path) if config.shared_token_cache_path else None
+            credentials = PrefetchingCredentials(credentials, config.token_prefetch_seconds, token_cache)
     elif config.client_id and config.authority_uri:
         credentials = OAuthInteractive(
             authority_url=config.authority_uri,
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, List, Optional
+
+from pydantic import parse_obj_as
+
+from .data_classes_dm_v3 import View
+
+__all__ = [
+    "ViewCache",
+]
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCache:
+    """
+    On-disk cache of view definitions for one version of a data model, so that a new process (CLI invocation,
+    serverless cold start) does not need to fetch them again.
+    One JSON file per (project, space, data model, version), a view version is not expected to change once published.
+    """
+
+    def __init__(self, directory: Path, project: str, space_id: str, data_model: str, version: int):
+        self.path = Path(directory) / f"{project}__{space_id}__{data_model}__{version}.json"
+        self._views: Optional[Dict[str, View]] = None
+        self._lock = Lock()
+
+    def _load(self) -> Dict[str, View]:
+        if self._views is None:
+            self._views = {}
+            if self.path.exists():
+                try:
+                    items = json.loads(self.path.read_text())
+                    self._views = {view.externalId: view for view in parse_obj_as(List[View], items)}
+                except (OSError, ValueError):
+                    logger.warning(f"Ignoring unreadable view cache {self.path}.")
+        return self._views
+
+    def get(self, external_id: str) -> Optional[View]:
+        with self._lock:
+            return self._load().get(external_id)
+
+    def put(self, views: Iterable[View]) -> None:
+        with self._lock:
+            cached = self._load()
+            cached.update({view.externalId: view for view in views})
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # write to a temp file and rename, so that concurrent processes never read a partial file:
+            fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+            with os.fdopen(fd, "w") as tmp_file:
+                json.dump([view.dict() for view in cached.values()], tmp_file)
+            os.replace(tmp_name, self.path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._views = None
+            self.path.unlink(missing_ok=True)
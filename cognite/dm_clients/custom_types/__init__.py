@@ -1,8 +1,8 @@
-from . import _scalars
 from .jsonobject import JSONObject
 from .timestamp import Timestamp
 
-SCALARS = tuple(_scalars.__all__)
+# Names of the Strawberry scalars in `_scalars`, which is only imported when rendering GraphQL (it imports Strawberry):
+SCALARS = ("JSONObjectScalar", "TimestampScalar")
 
 
 __all__ = [
@@ -1,5 +1,37 @@
-from .domain_client import DomainClient
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
 from .domain_model import DomainModel
-from .domain_model_api import DomainModelAPI
-from .relationship_api import RelationshipAPI
+from .read_only_model import ReadOnlyModel
 from .schema import Schema
+
+if TYPE_CHECKING:
+    from .domain_client import DomainClient
+    from .domain_model_api import DomainModelAPI
+    from .relationship_api import RelationshipAPI
+
+__all__ = [
+    "DomainClient",
+    "DomainModel",
+    "DomainModelAPI",
+    "ReadOnlyModel",
+    "RelationshipAPI",
+    "Schema",
+]
+
+# Imported on first access (PEP 562), so that importing a schema module does not import the cognite SDK:
+_LAZY_IMPORTS = {
+    "DomainClient": ".domain_client",
+    "DomainModelAPI": ".domain_model_api",
+    "RelationshipAPI": ".relationship_api",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
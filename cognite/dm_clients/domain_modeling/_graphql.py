@@ -0,0 +1,92 @@
+"""
+Render a `Schema` as DM GraphQL directly from the DomainModel field annotations, without building a Strawberry schema.
+The output is identical to rendering with Strawberry (see `_strawberry.py`), which remains the fallback for fields this
+renderer does not support (e.g. fields with descriptions, or types other than scalars, DomainModels and lists).
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Type, Union, get_args, get_origin, get_type_hints
+
+from ..custom_types import JSONObject, Timestamp
+from .domain_model import DomainModel
+
+if TYPE_CHECKING:
+    from .schema import Schema
+
+__all__ = [
+    "render_types",
+]
+
+_BUILTIN_SCALARS: Dict[Any, str] = {
+    str: "String",
+    int: "Int",
+    float: "Float",
+    bool: "Boolean",
+}
+_CUSTOM_SCALARS: Dict[Any, str] = {
+    JSONObject: "JSONObject",
+    Timestamp: "Timestamp",
+}
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def render_types(schema: Schema) -> Optional[str]:
+    """
+    GraphQL type definitions of all the types reachable from the root type, sorted by name (like Strawberry), or None
+    if any of the fields is not supported by this renderer.
+    """
+    if schema._root_type_cls is None:
+        raise ValueError("define one of the schema types with @schema.register_type(root_type=True)")
+    registered = set(schema.types_map.values())
+    rendered: Dict[str, str] = {}
+    used_custom_scalars: Set[str] = set()
+    pending: List[Type[DomainModel]] = [schema._root_type_cls]
+    try:
+        while pending:
+            cls = pending.pop()
+            if cls.__name__ in rendered:
+                continue
+            field_lines = []
+            hints = get_type_hints(cls)
+            for field_name, field in cls.__fields__.items():
+                if field_name == "externalId":
+                    continue
+                if field.field_info.description:
+                    raise _Unsupported(field_name)
+                type_str = _render_annotation(hints[field_name], registered, pending, used_custom_scalars)
+                field_lines.append(f"  {field.alias}: {type_str}")
+            rendered[cls.__name__] = "\n".join([f"type {cls.__name__} {{", *field_lines, "}"])
+    except _Unsupported:
+        return None
+    types_str = "\n\n".join(rendered[name] for name in sorted(rendered))
+    # Stripping `scalar` definitions from the Strawberry output leaves a trailing newline if a scalar is sorted last,
+    # kept for identical output:
+    return f"{types_str}\n" if max([*rendered, *used_custom_scalars]) in used_custom_scalars else types_str
+
+
+def _render_annotation(
+    annotation: Any, registered: Set[type], pending: List[Type[DomainModel]], used_custom_scalars: Set[str]
+) -> str:
+    nullable = False
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]  # noqa: E721
+        if len(args) != 1:
+            raise _Unsupported(annotation)
+        annotation, nullable = args[0], True
+    suffix = "" if nullable else "!"
+
+    if get_origin(annotation) in (list, List):
+        (item_annotation,) = get_args(annotation) or (Any,)
+        return f"[{_render_annotation(item_annotation, registered, pending, used_custom_scalars)}]{suffix}"
+    if annotation in _BUILTIN_SCALARS:
+        return f"{_BUILTIN_SCALARS[annotation]}{suffix}"
+    if annotation in _CUSTOM_SCALARS:
+        used_custom_scalars.add(_CUSTOM_SCALARS[annotation])
+        return f"{_CUSTOM_SCALARS[annotation]}{suffix}"
+    if isinstance(annotation, type) and annotation in registered:
+        pending.append(annotation)
+        return f"{annotation.__name__}{suffix}"
+    raise _Unsupported(annotation)
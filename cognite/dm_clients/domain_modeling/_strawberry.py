@@ -0,0 +1,86 @@
+"""
+Registration of DomainModels with Strawberry, only needed to render the GraphQL schema (see `Schema.as_str`).
+Kept in a separate module so that importing a schema does not import Strawberry.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Optional, Type, get_args, get_type_hints  # noqa: F401
+
+import strawberry
+from strawberry.experimental.pydantic import UnregisteredTypeException
+from strawberry.schema.config import StrawberryConfig
+
+from ..custom_types import SCALARS
+from ..custom_types._scalars import *  # noqa
+from .domain_model import DomainModel
+
+# Strawberry evaluates the (string) annotations of scalar fields in the namespace of this module, which is why the
+# scalars and typing names above are imported here.
+
+if TYPE_CHECKING:
+    from .schema import Schema
+
+__all__ = [
+    "strawberry_schema",
+]
+
+
+def strawberry_schema(schema: Schema) -> strawberry.Schema:
+    """Register all the types of `schema` with Strawberry (only once), and build a Strawberry schema."""
+    schema._update_forward_refs()
+    _close(schema)
+    if schema._root_type is None:
+        raise ValueError("define one of the schema types with @schema.register_type(root_type=True)")
+    return strawberry.Schema(query=schema._root_type, config=StrawberryConfig(auto_camel_case=False))
+
+
+def _do_register(schema: Schema, name: str, cls: Type[DomainModel]) -> None:
+    """Actually register a DomainModel with Strawberry."""
+
+    # this function could be called recursively, so avoid duplicate work:
+    if name in schema._processed_names:
+        return
+    schema._processed_names.add(name)
+
+    # all field names on our DomainModel:
+    field_names = [key for key in cls.__fields__ if key not in {"externalId"}]
+    cls_annotations = get_type_hints(cls)
+
+    # find any custom scalar fields (e.g: Timestamp, JSONObject), they need special consideration:
+    scalar_fields = {}
+    for field_name in field_names:
+        field_type = cls_annotations[field_name]
+        # find out if there is a custom scalar in this field's annotation:
+        while type_args := get_args(field_type):
+            field_type = type_args[0]
+
+        type_name = field_type.__name__
+        scalar_name = f"{type_name}Scalar"
+        # if there is, make a corresponding strawberry scalar (only once), and
+        if scalar_name in SCALARS:
+            scalar_fields[field_name] = cls.__annotations__[field_name].replace(type_name, scalar_name)
+
+    # dynamically create a strawberry type class:
+    cls_dict = {"__annotations__": {field_name: strawberry.auto for field_name in field_names}}
+    cls_dict["__annotations__"].update(scalar_fields)
+    strawberry_type = type(cls.__name__, (), cls_dict)
+
+    # pass the class to strawberry type decorator:
+    try:
+        registered_strawberry_type = strawberry.experimental.pydantic.type(model=cls)(strawberry_type)
+    except UnregisteredTypeException:
+        # Order matters when using `strawberry.experimental.pydantic.type` (unlike `strawberry.type`).
+        # It's a trap! https://github.com/strawberry-graphql/strawberry/issues/769
+        # So when types are out of order, just run one more `_close()` to work on other types, then
+        # try again when it returns. The set of names in `schema._processed_names` guards against duplicates.
+        _close(schema)
+        registered_strawberry_type = strawberry.experimental.pydantic.type(model=cls)(strawberry_type)
+
+    # keep a reference to the schema "root":
+    if schema._root_type_cls == cls:
+        schema._root_type = registered_strawberry_type
+
+
+def _close(schema: Schema) -> None:
+    for name, cls in schema.types_map.items():
+        _do_register(schema, name, cls)
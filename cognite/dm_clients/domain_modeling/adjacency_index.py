@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from threading import RLock
+from typing import DefaultDict, Dict, Iterable, List, Set
+
+from cognite.dm_clients.cdf.data_classes_dm_v3 import Edge
+
+__all__ = [
+    "AdjacencyIndex",
+]
+
+_AdjacencyT = DefaultDict[str, DefaultDict[str, Set[str]]]  # edge type -> node externalId -> node externalIds
+
+
+class AdjacencyIndex:
+    """
+    In-memory adjacency lists (start -> ends and end -> starts) built from edges which were fetched or created by
+    `RelationshipAPI`, keyed by edge type (e.g. "Movie.actors").
+
+    The index only knows about edges it has seen. To serve reverse lookups from the index, it also remembers for which
+    end nodes *all* the inwards edges of a type have been fetched (see `mark_complete_inwards`).
+    This class is considered "internal", use it through `DomainClient.enable_adjacency_index()`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = RLock()
+        self._outwards: _AdjacencyT = defaultdict(lambda: defaultdict(set))
+        self._inwards: _AdjacencyT = defaultdict(lambda: defaultdict(set))
+        self._complete_inwards: Dict[str, Set[str]] = defaultdict(set)
+
+    def add_edges(self, edges: Iterable[Edge]) -> None:
+        with self._lock:
+            for edge in edges:
+                edge_type = edge.type.externalId
+                self._outwards[edge_type][edge.startNode.externalId].add(edge.endNode.externalId)
+                self._inwards[edge_type][edge.endNode.externalId].add(edge.startNode.externalId)
+
+    def remove_edges(self, edges: Iterable[Edge]) -> None:
+        with self._lock:
+            for edge in edges:
+                edge_type = edge.type.externalId
+                self._outwards[edge_type][edge.startNode.externalId].discard(edge.endNode.externalId)
+                self._inwards[edge_type][edge.endNode.externalId].discard(edge.startNode.externalId)
+
+    def mark_complete_inwards(self, edge_type: str, end_ext_ids: Iterable[str]) -> None:
+        """Record that all the edges of `edge_type` which end on `end_ext_ids` are in the index."""
+        with self._lock:
+            self._complete_inwards[edge_type].update(end_ext_ids)
+
+    def is_complete_inwards(self, edge_type: str, end_ext_id: str) -> bool:
+        with self._lock:
+            return end_ext_id in self._complete_inwards[edge_type]
+
+    def ends(self, edge_type: str, start_ext_ids: Iterable[str]) -> List[str]:
+        """ExternalIds of nodes at the end of known edges of `edge_type` starting from any of `start_ext_ids`."""
+        with self._lock:
+            return self._collect(self._outwards[edge_type], start_ext_ids)
+
+    def starts(self, edge_type: str, end_ext_ids: Iterable[str]) -> List[str]:
+        """ExternalIds of nodes at the start of known edges of `edge_type` ending in any of `end_ext_ids`."""
+        with self._lock:
+            return self._collect(self._inwards[edge_type], end_ext_ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._outwards.clear()
+            self._inwards.clear()
+            self._complete_inwards.clear()
+
+    @staticmethod
+    def _collect(adjacency: DefaultDict[str, Set[str]], ext_ids: Iterable[str]) -> List[str]:
+        collected: Dict[str, None] = {}  # dict keeps insertion order
+        for ext_id in ext_ids:
+            if ext_id in adjacency:
+                collected.update(dict.fromkeys(sorted(adjacency[ext_id])))
+        return list(collected)
@@ -0,0 +1,185 @@
+"""
+Building blocks of long-running bulk operations (see `DomainClient.migrate()`): resumable checkpoints, throughput
+reporting, reading pages ahead, writing in parallel chunked batches, and deterministic externalIds.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import Executor
+from contextvars import copy_context
+from hashlib import sha256
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from cognite.dm_clients.misc import chunked
+
+from .domain_model import DomainModel
+
+__all__ = [
+    "Checkpoint",
+    "Progress",
+    "content_external_id",
+    "prefetch_pages",
+    "set_content_external_ids",
+    "write_chunks",
+]
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Checkpoint:
+    """
+    JSON file with the state (e.g. the cursor) of each stream of a bulk operation, saved after every completed page,
+    so that an interrupted operation continues where it stopped. Without a `path`, the state is only kept in memory.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self._state: Dict[str, Any] = {}
+        self._lock = Lock()
+        if path is not None and path.exists():
+            try:
+                self._state = json.loads(path.read_text())
+            except ValueError:
+                logger.warning(f"Ignoring unreadable checkpoint {path}.")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._state.get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._state[key] = value
+            self._save()
+
+    def delete(self, key: str) -> None:
+        """Forget the state of a completed stream, so that the next operation on it starts from the beginning."""
+        with self._lock:
+            if self._state.pop(key, None) is not None:
+                self._save()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._state = {}
+            if self.path is not None:
+                self.path.unlink(missing_ok=True)
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # write to a temp file and rename, so that an interruption does not leave a partial checkpoint:
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        with os.fdopen(fd, "w") as tmp_file:
+            json.dump(self._state, tmp_file, indent=2, sort_keys=True)
+        os.replace(tmp_name, self.path)
+
+
+class Progress:
+    """
+    Thread-safe item counters of a bulk operation (e.g. "nodes read", "nodes written"), with throughput, and the
+    estimated time left for counters with a known total in `totals`.
+    Progress is logged (at INFO level) at most every `log_interval` seconds, and passed to `on_progress` if given.
+    """
+
+    def __init__(
+        self,
+        log_interval: float = 10.0,
+        on_progress: Optional[Callable[[Progress], None]] = None,
+        totals: Optional[Dict[str, int]] = None,
+    ):
+        self.counts: Dict[str, int] = {}
+        self.totals: Dict[str, int] = dict(totals or {})
+        self.log_interval = log_interval
+        self.on_progress = on_progress
+        self._start = perf_counter()
+        self._last_log = self._start
+        self._lock = Lock()
+
+    def add(self, name: str, items: int) -> None:
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + items
+            now = perf_counter()
+            should_log = now - self._last_log >= self.log_interval
+            if should_log:
+                self._last_log = now
+        if should_log:
+            logger.info(str(self))
+        if self.on_progress is not None:
+            self.on_progress(self)
+
+    @property
+    def seconds(self) -> float:
+        return perf_counter() - self._start
+
+    def rate(self, name: str) -> float:
+        """Items per second."""
+        return self.counts.get(name, 0) / max(self.seconds, 1e-9)
+
+    def eta(self, name: str) -> Optional[float]:
+        """Estimated seconds left until the count of `name` reaches its total, None without a total or a rate."""
+        if name not in self.totals or not (rate := self.rate(name)):
+            return None
+        return max(self.totals[name] - self.counts.get(name, 0), 0) / rate
+
+    def __str__(self) -> str:
+        counts = []
+        for name, count in self.counts.items():
+            if (eta := self.eta(name)) is not None:
+                counts.append(f"{name}: {count}/{self.totals[name]} ({self.rate(name):.0f}/s, ETA {eta:.0f}s)")
+            else:
+                counts.append(f"{name}: {count} ({self.rate(name):.0f}/s)")
+        return f"{', '.join(counts) or 'nothing yet'} in {self.seconds:.1f}s"
+
+
+def write_chunks(pool: Executor, write: Callable[[List[T]], Any], items: Iterable[T], chunk_size: int) -> int:
+    """
+    Call `write` with chunks of up to `chunk_size` items in parallel in `pool`, wait for all, and count the items.
+    The writes run in copies of the current context, so that explain mode (and its dry run) applies to them.
+    """
+    futures = [(pool.submit(copy_context().run, write, chunk), len(chunk)) for chunk in chunked(items, chunk_size)]
+    written = 0
+    for future, count in futures:
+        future.result()  # raises if the write failed
+        written += count
+    return written
+
+
+def prefetch_pages(
+    pool: Executor,
+    read_page: Callable[[Optional[str]], Tuple[List[T], Optional[str]]],
+    cursor: Optional[str] = None,
+) -> Iterator[Tuple[List[T], Optional[str]]]:
+    """
+    The pages (items and the cursor of the next page) from `cursor` on, the next page is read in `pool` while the
+    current one is processed.
+    """
+    page = pool.submit(copy_context().run, read_page, cursor)
+    while page is not None:
+        items, cursor = page.result()
+        page = pool.submit(copy_context().run, read_page, cursor) if cursor else None
+        yield items, cursor
+
+
+def content_external_id(item: DomainModel) -> str:
+    """Deterministic externalId of an item, derived from its type and content (everything but its externalId)."""
+    content = json.dumps(item.dict(by_alias=True, exclude={"externalId"}), sort_keys=True, default=str)
+    return f"{type(item).__name__}_{sha256(content.encode()).hexdigest()[:16]}"
+
+
+def set_content_external_ids(item: DomainModel) -> None:
+    """Set `content_external_id()` on the item and its related items (recursively) which have no externalId."""
+    for attr in [*item.get_one_to_one_attrs(), *item.get_one_to_many_attrs()]:
+        value = getattr(item, attr, None)
+        for subitem in value if isinstance(value, list) else [value]:
+            if isinstance(subitem, DomainModel) and not subitem._reference:
+                set_content_external_ids(subitem)
+    if not item.externalId:
+        item.externalId = content_external_id(item)
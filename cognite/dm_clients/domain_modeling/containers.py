@@ -0,0 +1,74 @@
+"""
+Container indexes and constraints from hints on DomainModel fields:
+
+    class Movie(DomainModel):
+        title: str = Field(..., index=True)
+        imdbId: Optional[str] = Field(None, unique=True)
+
+In GraphQL schemas, the hints are the `@index` and `@unique` field directives, carried over by `dm topython`.
+The containers of the types are created when the data model is published, `apply_container_hints()` then adds the
+indexes and constraints to them.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Tuple, Type
+
+from cognite.dm_clients.cdf.client_dm_v3 import ContainersAPI
+from cognite.dm_clients.cdf.data_classes_dm_v3 import Container
+
+from .domain_model import DomainModel
+
+if TYPE_CHECKING:
+    from .schema import Schema
+
+__all__ = [
+    "apply_container_hints",
+    "container_hints",
+]
+
+
+def container_hints(domain_model: Type[DomainModel]) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+    """The indexes and constraints (in the format of `Container.indexes` and `Container.constraints`) of a type."""
+    indexes = {f"{attr}_index": {"properties": [attr]} for attr in domain_model.get_indexed_attrs()}
+    constraints = {
+        f"{attr}_unique": {"constraintType": "uniqueness", "properties": [attr]}
+        for attr in domain_model.get_unique_attrs()
+    }
+    return indexes, constraints
+
+
+def apply_container_hints(
+    containers_api: ContainersAPI, schema: Schema, space_id: str, dry_run: bool = False
+) -> List[Container]:
+    """
+    Add the indexes and constraints of all the types in `schema` to their containers (which have the same externalId
+    as the type), and return the containers which were changed. Indexes and constraints which are already there, or
+    which are not from hints, are kept as they are. With `dry_run`, the changes are returned but not applied.
+    """
+    hints = {
+        domain_model.__name__: hints_
+        for domain_model in schema.types_map.values()
+        if any(hints_ := container_hints(domain_model))
+    }
+    if not hints:
+        return []
+    containers = {container.externalId: container for container in containers_api.retrieve(space_id, list(hints))}
+    if missing := [name for name in hints if name not in containers]:
+        raise ValueError(
+            f"Containers {', '.join(missing)} not found in space {space_id}, publish the data model first."
+        )
+
+    changed = []
+    for name, (indexes, constraints) in hints.items():
+        container = containers[name]
+        updated = container.copy(
+            update={
+                "indexes": {**indexes, **(container.indexes or {})},
+                "constraints": {**constraints, **(container.constraints or {})},
+            }
+        )
+        if updated.indexes != (container.indexes or {}) or updated.constraints != (container.constraints or {}):
+            changed.append(updated)
+    if changed and not dry_run:
+        containers_api.apply(changed)
+    return changed
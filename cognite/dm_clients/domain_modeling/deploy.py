@@ -0,0 +1,227 @@
+"""
+Deployment of a `Schema` to CDF DM (`dm deploy`) through the DM API, without the `cdf` CLI.
+
+Each type gets a container (with the scalar and one-to-one fields, and the indexes and constraints of
+`containers.container_hints()`) and a view (with all the fields, one-to-many fields are edges), in a data model.
+The deployed containers, views and data model are compared with the local ones, and only the ones which differ are
+applied, so that unchanged views are not needlessly re-applied:
+
+    plan = plan_deployment(client, cine_schema, "my_space", "cine", version=1)
+    deploy(client, plan)
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Type, get_args
+
+from pydantic.fields import SHAPE_SINGLETON
+
+from cognite.dm_clients.cdf.client_dm_v3 import CogniteClientDmV3
+from cognite.dm_clients.cdf.data_classes_dm_v3 import Container, DataModel, Space, View
+from cognite.dm_clients.config import settings
+from cognite.dm_clients.custom_types import JSONObject, Timestamp
+
+from .containers import container_hints
+from .domain_model import DomainModel
+from .schema import Schema
+
+__all__ = [
+    "DeploymentPlan",
+    "deploy",
+    "plan_deployment",
+    "schema_containers",
+    "schema_data_model",
+    "schema_views",
+]
+
+_MAX_WORKERS = settings.get("dm_clients.max_workers")  # None = default of ThreadPoolExecutor
+
+_PROPERTY_TYPES: Dict[Any, str] = {
+    str: "text",
+    int: "int64",
+    float: "float64",
+    bool: "boolean",
+    Timestamp: "timestamp",
+    JSONObject: "json",
+}
+
+
+@dataclass
+class DeploymentPlan:
+    """What `deploy()` applies: the (local) definitions which are missing from CDF or differ from the deployed ones."""
+
+    space: Optional[Space] = None
+    containers: List[Container] = field(default_factory=list)
+    views: List[View] = field(default_factory=list)
+    data_model: Optional[DataModel] = None
+    unchanged: List[str] = field(default_factory=list)  # e.g. "container Movie"
+
+    @property
+    def is_empty(self) -> bool:
+        return self.space is None and not self.containers and not self.views and self.data_model is None
+
+    def summary(self) -> List[str]:
+        changes = [f"space {self.space.space}"] if self.space is not None else []
+        changes.extend(f"container {container.externalId}" for container in self.containers)
+        changes.extend(f"view {view.externalId}/{view.version}" for view in self.views)
+        if self.data_model is not None:
+            changes.append(f"data model {self.data_model.externalId}/{self.data_model.version}")
+        return changes
+
+
+def schema_containers(schema: Schema, space_id: str) -> List[Container]:
+    """A container per type, with its scalar and one-to-one fields."""
+    containers = []
+    for domain_model in schema.types_map.values():
+        properties = {}
+        one_to_many = domain_model.get_one_to_many_attrs()
+        for name, model_field in domain_model.__fields__.items():
+            if name == "externalId" or name in one_to_many:
+                continue
+            properties[name] = {"type": _property_type(domain_model, name), "nullable": model_field.allow_none}
+        indexes, constraints = container_hints(domain_model)
+        containers.append(
+            Container(
+                space=space_id,
+                externalId=domain_model.__name__,
+                properties=properties,
+                indexes=indexes or None,
+                constraints=constraints or None,
+            )
+        )
+    return containers
+
+
+def schema_views(schema: Schema, space_id: str, version: int) -> List[View]:
+    """A view per type, mapping its fields to the properties of its container, one-to-many fields are edges."""
+    views = []
+    for domain_model in schema.types_map.values():
+        container_ref = {"space": space_id, "externalId": domain_model.__name__, "type": "container"}
+        one_to_one = domain_model.get_one_to_one_attrs()
+        one_to_many = domain_model.get_one_to_many_attrs()
+        properties: Dict[str, dict] = {}
+        for name in domain_model.__fields__:
+            if name == "externalId":
+                continue
+            if name in one_to_many:
+                properties[name] = {
+                    "type": {"space": space_id, "externalId": f"{domain_model.__name__}.{name}"},
+                    "source": _view_ref(one_to_many[name], space_id, version),
+                    "direction": "outwards",
+                }
+                continue
+            properties[name] = {"container": container_ref, "containerPropertyIdentifier": name}
+            if name in one_to_one:
+                properties[name]["source"] = _view_ref(one_to_one[name], space_id, version)
+        views.append(
+            View(space=space_id, externalId=domain_model.__name__, version=str(version), properties=properties)
+        )
+    return views
+
+
+def schema_data_model(schema: Schema, space_id: str, data_model_id: str, version: int) -> DataModel:
+    return DataModel(
+        space=space_id,
+        externalId=data_model_id,
+        version=str(version),
+        views=schema_views(schema, space_id, version),
+    )
+
+
+def plan_deployment(
+    client: CogniteClientDmV3, schema: Schema, space_id: str, data_model_id: str, version: int
+) -> DeploymentPlan:
+    """
+    Compare the local definitions with the ones deployed in CDF (retrieved concurrently). Deployed definitions can
+    have more details (e.g. defaults filled in by the API), they are unchanged if they have all the local details.
+    """
+    containers = schema_containers(schema, space_id)
+    data_model = schema_data_model(schema, space_id, data_model_id, version)
+    ext_ids = [container.externalId for container in containers]
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+        spaces_future = pool.submit(client.spaces.retrieve, [space_id])
+        containers_future = pool.submit(client.containers.retrieve, space_id, ext_ids)
+        views_future = pool.submit(client.views.retrieve, space_id, ext_ids, version)
+        data_models_future = pool.submit(client.datamodels.retrieve, space_id, [data_model_id])
+    deployed_containers = {container.externalId: container for container in containers_future.result()}
+    deployed_views = {view.externalId: view for view in views_future.result() if view.version == str(version)}
+    deployed_data_model = next(
+        (deployed for deployed in data_models_future.result() if deployed.version == str(version)), None
+    )
+
+    plan = DeploymentPlan()
+    if not spaces_future.result():
+        plan.space = Space(space=space_id)
+    for container in containers:
+        deployed_container = deployed_containers.get(container.externalId)
+        if deployed_container is not None and _container_is_deployed(container, deployed_container):
+            plan.unchanged.append(f"container {container.externalId}")
+        else:
+            plan.containers.append(container)
+    for view in data_model.views:
+        deployed_view = deployed_views.get(view.externalId)
+        if deployed_view is not None and _view_is_deployed(view, deployed_view):
+            plan.unchanged.append(f"view {view.externalId}/{view.version}")
+        else:
+            plan.views.append(view)
+    if deployed_data_model is not None and _view_ids(deployed_data_model) == _view_ids(data_model):
+        plan.unchanged.append(f"data model {data_model_id}/{version}")
+    else:
+        plan.data_model = data_model
+    return plan
+
+
+def deploy(client: CogniteClientDmV3, plan: DeploymentPlan) -> None:
+    """
+    Apply the changes in `plan`: the space, then the containers (concurrently, one request each), then the views (in
+    one request, as they can refer to each other), then the data model.
+    """
+    if plan.space is not None:
+        client.spaces.apply([plan.space])
+    if plan.containers:
+        with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+            list(pool.map(lambda container: client.containers.apply([container]), plan.containers))
+    client.views.apply(plan.views)
+    if plan.data_model is not None:
+        client.datamodels.apply([plan.data_model])
+
+
+def _property_type(domain_model: Type[DomainModel], name: str) -> dict:
+    model_field = domain_model.__fields__[name]
+    field_type = model_field.type_
+    # strip annotations (like Optional[]) of list elements:
+    while type_args := [arg for arg in get_args(field_type) if arg is not type(None)]:  # noqa: E721
+        field_type = type_args[0]
+    is_list = model_field.shape != SHAPE_SINGLETON
+    if isinstance(field_type, type) and issubclass(field_type, DomainModel):
+        return {"type": "direct"}
+    if field_type not in _PROPERTY_TYPES:
+        raise ValueError(f"Unsupported type of {domain_model.__name__}.{name}: {field_type}")
+    return {"type": _PROPERTY_TYPES[field_type], "list": is_list}
+
+
+def _view_ref(domain_model: Type[DomainModel], space_id: str, version: int) -> dict:
+    return {"space": space_id, "externalId": domain_model.__name__, "version": str(version), "type": "view"}
+
+
+def _is_subset(local: Any, deployed: Any) -> bool:
+    """All keys of the (nested) `local` dicts are in `deployed` with the same values."""
+    if isinstance(local, dict):
+        return isinstance(deployed, dict) and all(
+            key in deployed and _is_subset(value, deployed[key]) for key, value in local.items()
+        )
+    return local == deployed
+
+
+def _container_is_deployed(container: Container, deployed: Container) -> bool:
+    # properties, indexes and constraints can only be added to a deployed container, extra ones are ignored:
+    return _is_subset(container.dict(exclude_none=True, exclude={"space", "externalId"}), deployed.dict())
+
+
+def _view_is_deployed(view: View, deployed: View) -> bool:
+    return set(view.properties) == set(deployed.properties) and _is_subset(view.properties, deployed.properties)
+
+
+def _view_ids(data_model: DataModel) -> set:
+    return {(view.externalId, view.version) for view in data_model.views}
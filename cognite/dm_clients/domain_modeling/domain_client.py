@@ -1,16 +1,32 @@
 from __future__ import annotations
 
-from threading import Lock
-from typing import TYPE_CHECKING, Dict, Generic, Iterable, List, Optional, Type, TypeVar
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock, RLock
+from typing import TYPE_CHECKING, Any, Dict, Generic, Iterable, Iterator, List, Optional, Type, TypeVar, Union
 
-from cachelib import BaseCache
+from cachelib import BaseCache, SimpleCache
 from cognite.client import ClientConfig
 
-from cognite.dm_clients.cdf.client_dm_v3 import CogniteClientDmV3, EdgesAPI, NodesAPI
+from cognite.dm_clients import explain
+from cognite.dm_clients.cdf.client_registry import client_registry
+from cognite.dm_clients.cdf.data_classes_dm_v3 import Container, View
+from cognite.dm_clients.cdf.view_cache import ViewCache
 from cognite.dm_clients.config import settings
+from cognite.dm_clients.explain import ExplainReport
+from cognite.dm_clients.metrics import Metrics
 
-from ..cdf.client_dm_v3 import ViewsAPI
+from .adjacency_index import AdjacencyIndex
+from .bulk import Checkpoint, Progress
+from .containers import apply_container_hints
 from .domain_model import DomainModel
+from .migrate import MigrationTransform, migrate_view
+from .purge import purge_space
+from .selection import Selection
+from .session import Session
+from .writer import WriteBehindWriter, WriteErrorCallback
 
 if TYPE_CHECKING:
     from .domain_model_api import DomainModelAPI
@@ -21,6 +37,8 @@ __all__ = [
     "DomainClient",
 ]
 
+_MAX_WORKERS = settings.get("dm_clients.max_workers")
+
 DomainModelT = TypeVar("DomainModelT", bound=DomainModel)
 
 
@@ -29,7 +47,8 @@ class DomainClient(Generic[DomainModelT]):
     Base class for top-level domain client.
 
     Each schema type (registered with `@register_type` decorator) automatically gets a `DomainModelAPI` instance set on
-    an attribute of this object.
+    an attribute of this object. The instance is created on first use of the attribute, which is also when the view of
+    the type is fetched (or read from the view cache in `view_cache_dir`, if set).
     """
 
     def __init__(
@@ -41,6 +60,7 @@ class DomainClient(Generic[DomainModelT]):
         space_id: Optional[str] = None,
         data_model: Optional[str] = None,
         schema_version: Optional[int] = None,
+        view_cache_dir: Optional[Path] = None,
         # TODO ^ some of these args are redundant.
     ):
         # TODO make all these attributes "_private" to distinguish from domain model APIs
@@ -48,8 +68,12 @@ class DomainClient(Generic[DomainModelT]):
         self._domain_model_api_class = domain_model_api_class
         self.cache: BaseCache = cache
         self._cache_lock: Lock = Lock()
-        self._client = CogniteClientDmV3(config)
+        self.adjacency_index: Optional[AdjacencyIndex] = None
+        self.graph_cache: Optional[BaseCache] = None
+        self._client = client_registry.get_client(config)
         self._client._config.headers["cdf-version"] = "alpha"
+        metrics = getattr(self._client, "metrics", None)
+        self.metrics: Metrics = metrics if isinstance(metrics, Metrics) else Metrics()
         if space_id is None:
             space_id = settings.dm_clients.space
         self.space_id = space_id
@@ -58,50 +82,184 @@ class DomainClient(Generic[DomainModelT]):
         if self.schema_version is None:
             raise NotImplementedError("Please specify the schema version")
             # TODO find latest version of the data model
-        self._api_map: Dict[Type[DomainModelT], str] = {}
-
-        # -------------------------
-        # Todo why are these recreated? they already exists in self._client
-        nodes_api = NodesAPI(
-            self._client.config,
-            self._client._API_VERSION,
-            self._client,
-        )
-        edges_api = EdgesAPI(
-            self._client.config,
-            self._client._API_VERSION,
-            self._client,
-        )
-
-        views_api = ViewsAPI(config, self._client._API_VERSION, self._client)
-        views = {view.externalId: view for view in views_api.list(self.space_id)}
-        # ------------------------
-
-        api_args = {
-            "nodes_api": nodes_api,
-            "edges_api": edges_api,
-            "domain_client": self,
-            "space_id": self.space_id,
-            "schema_version": self.schema_version,
-            "api_version": self._client._API_VERSION,
+        self._api_map: Dict[Type[DomainModelT], str] = {
+            domain_model: api_attr_name for api_attr_name, domain_model in self.schema.types_map.items()
         }
+        self._api_lock = RLock()
+        if view_cache_dir is None and (view_cache_dir := settings.get("dm_clients.view_cache_dir")) is not None:
+            view_cache_dir = Path(view_cache_dir)
+        self._view_cache: Optional[ViewCache] = None
+        if view_cache_dir is not None:
+            self._view_cache = ViewCache(
+                view_cache_dir, self._client.config.project, self.space_id, self._data_model, self.schema_version
+            )
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called when regular attribute lookup fails, i.e. for domain model APIs which were not created yet.
+        schema = self.__dict__.get("schema")
+        if schema is None or name not in schema.types_map:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        return self._create_apis([name])[name]
+
+    def __dir__(self) -> Iterable[str]:
+        return [*super().__dir__(), *self.schema.types_map]
+
+    def _create_apis(self, api_attr_names: Iterable[str]) -> Dict[str, DomainModelAPI]:
+        """
+        Create DomainModelAPI instances and assign them to attributes of self.
+        The views are resolved in a single request, from the view cache if possible.
+        """
+        with self._api_lock:
+            missing = [name for name in api_attr_names if name not in self.__dict__]
+            views = self._resolve_views([self.schema.types_map[name].__name__ for name in missing])
+            for api_attr_name in missing:
+                # dynamically create a subclass of DomainModelAPI and assign it to an attribute of self:
+                domain_model = self.schema.types_map[api_attr_name]
+                domain_model_name: str = domain_model.__name__
+                api_class: Type[DomainModelAPI] = type(f"{domain_model_name}API", (self._domain_model_api_class,), {})
+                api = api_class(
+                    domain_model,
+                    views[domain_model_name],
+                    nodes_api=self._client.nodes,
+                    edges_api=self._client.edges,
+                    domain_client=self,
+                    space_id=self.space_id,
+                    schema_version=self.schema_version,
+                    api_version=self._client._API_VERSION,
+                )
+                setattr(self, api_attr_name, api)
+            return {name: self.__dict__[name] for name in api_attr_names}
+
+    def _resolve_views(self, view_ext_ids: List[str]) -> Dict[str, View]:
+        views: Dict[str, View] = {}
+        if self._view_cache is not None:
+            views = {ext_id: view for ext_id in view_ext_ids if (view := self._view_cache.get(ext_id)) is not None}
+        if missing := [ext_id for ext_id in view_ext_ids if ext_id not in views]:
+            retrieved = self._client.views.retrieve(self.space_id, missing, self.schema_version)
+            views.update({view.externalId: view for view in retrieved})
+            if self._view_cache is not None:
+                self._view_cache.put(retrieved)
+        if not_found := [ext_id for ext_id in view_ext_ids if ext_id not in views]:
+            raise ValueError(
+                f"Views {', '.join(not_found)} (version {self.schema_version}) not found in space {self.space_id}."
+            )
+        return views
+
+    def preload(self) -> None:
+        """
+        Create all DomainModelAPIs now instead of on first use, resolving their views in a single request.
+        Useful before measuring or explaining calls, or to fail early if the data model is not deployed.
+        """
+        self._create_apis(self.schema.types_map)
 
-        for api_attr_name, domain_model in self.schema.types_map.items():
-            # dynamically create a subclass of DomainModelAPI and assign it to an attribute of self:
-            domain_model_name: str = domain_model.__name__
-            api_class: Type[DomainModelAPI] = type(f"{domain_model_name}API", (self._domain_model_api_class,), {})
-            self._api_map[domain_model] = api_attr_name
-            setattr(self, api_attr_name, api_class(domain_model, views[domain_model_name], **api_args))  # type: ignore
+    def clear_view_cache(self) -> None:
+        """Remove cached view definitions from disk, e.g. after re-deploying the same version of the data model."""
+        if self._view_cache is not None:
+            self._view_cache.clear()
+
+    def apply_container_hints(self, dry_run: bool = False) -> List[Container]:
+        """
+        Add indexes and constraints declared on fields of the schema types (`Field(..., index=True)`,
+        `Field(..., unique=True)`) to their containers, see `containers.apply_container_hints()`.
+        Returns the containers which were (or, with `dry_run`, would be) changed.
+        """
+        return apply_container_hints(self._client.containers, self.schema, self.space_id, dry_run=dry_run)
+
+    def migrate(
+        self,
+        from_version: int,
+        to_version: Optional[int] = None,
+        transform: Optional[MigrationTransform] = None,
+        renamed_attrs: Optional[Dict[str, Dict[str, str]]] = None,
+        page_size: int = 1000,
+        chunk_size: int = 100,
+        checkpoint_path: Optional[Path] = None,
+        progress: Optional[Progress] = None,
+    ) -> Progress:
+        """
+        Copy the data of all the schema types from views `from_version` to views `to_version` (by default, the
+        `schema_version` of this client), see `migrate.migrate_view()`:
+          progress = client.migrate(1, transform=lambda type_name, ext_id, props: {**props, "rating": None})
+          print(progress)  # items read, written and skipped, with throughput
+        `transform` returns the properties of a node in the new view (or None to skip the node), `renamed_attrs` maps
+        renamed one-to-many attributes per type, e.g. `{"Movie": {"actors": "cast"}}`.
+        With a `checkpoint_path`, an interrupted migration continues where it stopped when called again.
+        """
+        to_version = to_version or self.schema_version
+        names = [domain_model.__name__ for domain_model in self.schema.types_map.values()]
+        old_views = {view.externalId: view for view in self._client.views.retrieve(self.space_id, names, from_version)}
+        new_views = {view.externalId: view for view in self._client.views.retrieve(self.space_id, names, to_version)}
+        if not_found := [name for name in names if name not in new_views]:
+            raise ValueError(f"Views {', '.join(not_found)} (version {to_version}) not found in space {self.space_id}.")
+        checkpoint = Checkpoint(checkpoint_path)
+        progress = progress or Progress()
+        for name in names:
+            if name not in old_views:
+                continue  # new type
+            migrate_view(
+                self._client.nodes,
+                self._client.edges,
+                old_views[name],
+                new_views[name],
+                transform=transform,
+                renamed_attrs=(renamed_attrs or {}).get(name),
+                page_size=page_size,
+                chunk_size=chunk_size,
+                checkpoint=checkpoint,
+                progress=progress,
+            )
+        # cached items might have been changed by the transform:
+        with self._cache_lock:
+            self.cache.clear()
+        self.clear_graph_cache()
+        return progress
+
+    def purge_space(
+        self, page_size: int = 1000, chunk_size: int = 1000, progress: Optional[Progress] = None
+    ) -> Progress:
+        """
+        Delete all the instances in the space of this client: all the edges, then all the nodes (of any view), see
+        `purge.purge_space()`. The data model and the views are kept. To delete the items of one type (optionally
+        filtered), see `DomainModelAPI.purge()`.
+        """
+        progress = purge_space(
+            self._client.nodes,
+            self._client.edges,
+            self.space_id,
+            page_size=page_size,
+            chunk_size=chunk_size,
+            progress=progress,
+        )
+        if explain.is_dry_run():
+            return progress  # nothing was deleted, so nothing to forget
+        with self._cache_lock:
+            self.cache.clear()
+        self.clear_graph_cache()
+        if self.adjacency_index is not None:
+            self.adjacency_index.clear()
+        for api_attr_name in self.schema.types_map:
+            # only the APIs which were created, see `__getattr__`:
+            if (api := self.__dict__.get(api_attr_name)) is not None and api.local_index is not None:
+                api.local_index.clear()
+        return progress
+
+    def enable_adjacency_index(self) -> AdjacencyIndex:
+        """
+        Opt-in: keep an in-memory adjacency index of edges fetched and created through this client, so that
+        reverse relationship lookups (see `DomainModelAPI.referenced_by`) can be served from memory when repeated.
+        """
+        if self.adjacency_index is None:
+            self.adjacency_index = AdjacencyIndex()
+        return self.adjacency_index
 
     def get_api_for_item(self, item: DomainModelT) -> DomainModelAPI[DomainModelT]:
         return self.get_api_for_domain_model(type(item))
 
     def get_api_for_domain_model(self, domain_model: Type[DomainModelT]) -> DomainModelAPI[DomainModelT]:
-        for registered_domain_model, self_attr_name in self._api_map.items():
-            if registered_domain_model == domain_model:
-                domain_model_api: DomainModelAPI[DomainModelT] = getattr(self, self_attr_name)
-                return domain_model_api
-        raise ValueError(f"No DomainModelAPI registered for {domain_model}")
+        if (self_attr_name := self._api_map.get(domain_model)) is None:
+            raise ValueError(f"No DomainModelAPI registered for {domain_model}")
+        domain_model_api: DomainModelAPI[DomainModelT] = getattr(self, self_attr_name)
+        return domain_model_api
 
     def apply(self, items: Iterable[DomainModelT], ext_id_prefix: str = "") -> List[DomainModelT]:
         """
@@ -135,14 +293,167 @@ class DomainClient(Generic[DomainModelT]):
         domain_model_api = self.get_api_for_item(items[0])
         domain_model_api.delete(items, delete_related_items)
 
-    def graph(self, query: str):
-        return self._client.graph(self.space_id, self._data_model, str(self.schema_version), query)
+    def session(self, chunk_size: int = 1000) -> Session:
+        """
+        Unit of work: the writes (apply, connect, delete) made through this client inside the context are collected,
+        and sent when it exits, in a few deduplicated and chunked requests (see `domain_modeling.session`):
+          with client.session():
+              client.movie.apply(movies)
+              client.movie.connect.actors("movie1", ["person1", "person2"])
+        """
+        return Session(self, chunk_size)
+
+    def write_behind(
+        self,
+        max_batch: int = 1000,
+        max_latency: float = 1.0,
+        max_pending: int = 10_000,
+        on_error: Optional[WriteErrorCallback] = None,
+    ) -> WriteBehindWriter:
+        """
+        Opt-in: a writer which queues items (from any thread) and applies them on a background thread, in batches of
+        coalesced items, see `cognite.dm_clients.domain_modeling.writer`. Close it (or use it as a context manager) to
+        write the remaining items:
+          with client.write_behind(max_latency=0.5) as writer:
+              for event in events:
+                  writer.apply([to_item(event)])
+        """
+        return WriteBehindWriter(self, max_batch, max_latency, max_pending, on_error)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the collected metrics: requests per endpoint, latency, payload size and items per request
+        histograms, retries, cache hits and misses, and thread pool queue depth.
+        Metrics are only collected when enabled, see `cognite.dm_clients.metrics`.
+        Metrics are kept per `ClientConfig`: domain clients created with the same config share a `CogniteClientDmV3`
+        (see `client_registry`) and its metrics, so their stats include the requests and operations of all of them.
+        """
+        return self.metrics.snapshot()
+
+    @contextmanager
+    def explain(self, dry_run: bool = False) -> Iterator[ExplainReport]:
+        """
+        Record the tree of API calls made inside the context: endpoint, number of items, payload size, nesting depth and
+        wall time of every call. With `dry_run`, writes are recorded but not sent. See `cognite.dm_clients.explain`.
+          with client.explain(dry_run=True) as report:
+              client.movie.apply(movies)
+          print(report)
+        """
+        with explain.explain(dry_run=dry_run) as report:
+            yield report
+
+    def graph(
+        self,
+        query: Union[str, Selection[DomainModelT]],
+        limit: Optional[int] = None,
+        variables: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        """
+        Run a GraphQL query against the data model.
+        With a query string, return the response as is. With a `Selection` (generated by `dm topython`, e.g.
+        `MovieSelection("title").director()`), list (up to `limit`) items of its type with the selected fields and
+        related items in a single request, and return them as DomainModel items. Items with all their fields
+        selected are also cached, so that `retrieve()` can return them without calling the API.
+        Responses are cached if enabled, see `enable_graph_cache()`.
+        """
+        if isinstance(query, str):
+            return self._graph_request(query, variables)
+        response = self._graph_request(query.list_query(limit), variables)
+        return self._hydrate_graph_items(query, self._graph_data(response)[query.query_name]["items"])
+
+    def iter_graph(
+        self,
+        query: Union[str, Selection[DomainModelT]],
+        page_size: int = 1000,
+        variables: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Any]:
+        """
+        Iterate over all the items of a GraphQL connection, following its `pageInfo` cursor. Each page is requested
+        when iteration reaches it.
+        With a `Selection`, items are listed `page_size` at a time, and hydrated (and cached) like by `graph()`.
+        A query string must take an `$after: String` variable, and select `items` and
+        `pageInfo { hasNextPage endCursor }` of a single top-level field, its items are yielded as they are.
+        Relationships of the items are not paginated.
+        """
+        if isinstance(query, str):
+            query_str, selection = query, None
+        else:
+            query_str, selection = query.list_query(page_size, paginate=True), query
+        variables = {**(variables or {}), "after": None}
+        while True:
+            (connection,) = self._graph_data(self._graph_request(query_str, variables)).values()
+            if selection is None:
+                yield from connection["items"]
+            else:
+                yield from self._hydrate_graph_items(selection, connection["items"])
+            page_info = connection.get("pageInfo") or {}
+            if not page_info.get("hasNextPage") or not page_info.get("endCursor"):
+                return
+            variables = {**variables, "after": page_info["endCursor"]}
+
+    def graph_many(
+        self, queries: Iterable[Union[str, Selection[DomainModelT]]], limit: Optional[int] = None
+    ) -> List[Any]:
+        """Run several `graph()` queries concurrently, and return their results in the same order."""
+        with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+            futures = [self.metrics.submit(pool, self.graph, query, limit) for query in queries]
+        return [future.result() for future in futures]
+
+    def enable_graph_cache(self, ttl: int = 60, max_size: int = 1000) -> BaseCache:
+        """
+        Opt-in: cache successful GraphQL responses for `ttl` seconds (at most `max_size` of them), keyed by the query
+        (with normalized whitespace) and variables. Cleared on writes through this client, but not when data is
+        changed by other clients.
+        """
+        if self.graph_cache is None:
+            self.graph_cache = SimpleCache(threshold=max_size, default_timeout=ttl)
+        return self.graph_cache
+
+    def clear_graph_cache(self) -> None:
+        if self.graph_cache is not None:
+            self.graph_cache.clear()
+
+    def _graph_request(self, query: str, variables: Optional[Dict[str, Any]] = None) -> dict:
+        if self.graph_cache is None:
+            return self._client.graph(self.space_id, self._data_model, str(self.schema_version), query, variables)
+        key = json.dumps([" ".join(query.split()), variables or {}], sort_keys=True)
+        if (response := self.graph_cache.get(key)) is None:
+            response = self._client.graph(self.space_id, self._data_model, str(self.schema_version), query, variables)
+            if not response.get("errors"):
+                self.graph_cache.set(key, response)
+        return response
+
+    @staticmethod
+    def _graph_data(response: dict) -> Dict[str, Any]:
+        if errors := response.get("errors"):
+            raise ValueError(f"GraphQL query failed: {errors}")
+        return response["data"]
+
+    def _hydrate_graph_items(self, selection: Selection[DomainModelT], data: List[dict]) -> List[DomainModelT]:
+        items = [selection.hydrate(item_data) for item_data in data]
+        self._cache_graph_items(selection, items)
+        return items
+
+    def _cache_graph_items(self, selection: Selection[DomainModelT], items: List[DomainModelT]) -> None:
+        """Cache complete items, like `DomainModelAPI` does: with references (dicts) in place of related items."""
+        with self._cache_lock:
+            for item_selection, item in (pair for top_item in items for pair in selection.walk(top_item)):
+                if not item_selection.is_complete_item(item):
+                    continue
+                refs: Dict[str, Any] = {}
+                for attr in item.get_one_to_many_attrs():
+                    refs[attr] = [self._ref(related) for related in getattr(item, attr, None) or []]
+                for attr in item.get_one_to_one_attrs():
+                    refs[attr] = None if (related := getattr(item, attr, None)) is None else self._ref(related)
+                self.cache.set(item.externalId, item.copy(update=refs))
+
+    def _ref(self, item: DomainModel) -> Dict[str, Any]:
+        return {"space": self.space_id, "externalId": item.externalId}
 
 
 def get_empty_domain_client():
     from cachelib import SimpleCache
 
-    from cognite.dm_clients.cdf.get_client import get_client_config
     from cognite.dm_clients.config import settings
     from cognite.dm_clients.domain_modeling.domain_model_api import DomainModelAPI
     from cognite.dm_clients.domain_modeling.schema import Schema
@@ -151,7 +462,7 @@ def get_empty_domain_client():
         schema=Schema(),
         domain_model_api_class=DomainModelAPI,
         cache=SimpleCache(),
-        config=get_client_config(),
+        config=client_registry.get_client_config(),
         space_id=settings.dm_clients.space,
         data_model=settings.dm_clients.datamodel,
         schema_version=settings.dm_clients.schema_version,
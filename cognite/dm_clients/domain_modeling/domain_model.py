@@ -1,9 +1,8 @@
 from __future__ import annotations
 
 import logging
-from typing import Dict, Optional, Type, get_args
+from typing import Dict, List, Optional, Type, get_args
 
-import strawberry
 from pydantic import Extra, PrivateAttr
 from typing_extensions import Self
 
@@ -27,10 +26,10 @@ class DomainModel(DataModelBase):
     Even this is confusing... A data model in DM is a collection of domain models.
     """
 
-    externalId: strawberry.Private[Optional[str]] = None
-    _reference: strawberry.Private[bool] = PrivateAttr(False)
-    # strawberry.Private ^ means the field will not be exposed in GraphQL schema
-    # Used on externalID because actual objects (returned from the API) have these fields. These are "implicit" field.
+    externalId: Optional[str] = None
+    _reference: bool = PrivateAttr(False)
+    # externalId is not exposed in GraphQL schema (see `_strawberry._do_register`), actual objects (returned from the
+    # API) have this field. It is an "implicit" field.
     # PrivateAttr is telling pydantic to allow the use of this as a regular (non-pydantic) attribute.
 
     class Config:
@@ -90,6 +89,16 @@ class DomainModel(DataModelBase):
                 attrs[field_name] = field_type
         return attrs
 
+    @classmethod
+    def get_indexed_attrs(cls) -> List[str]:
+        """Fields declared with `Field(..., index=True)`, to be indexed in the container of this type."""
+        return [name for name, field in cls.__fields__.items() if field.field_info.extra.get("index")]
+
+    @classmethod
+    def get_unique_attrs(cls) -> List[str]:
+        """Fields declared with `Field(..., unique=True)`, to have a uniqueness constraint in the container."""
+        return [name for name, field in cls.__fields__.items() if field.field_info.extra.get("unique")]
+
     @classmethod
     def get_type_for_attr(cls, attr: str) -> Type[DomainModel]:
         """Given an attribute, return a DomainModel subclass to which the attribute refers to."""
@@ -3,15 +3,44 @@ from __future__ import annotations
 import logging
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Dict, Generic, Iterable, List, Optional, Set, Tuple, Type, TypeVar, get_args
+from functools import partial
+from itertools import chain, islice
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    get_args,
+)
 from uuid import uuid4
 
+from cognite.dm_clients import explain
 from cognite.dm_clients.cdf.client_dm_v3 import EdgesAPI, NodesAPI
-from cognite.dm_clients.cdf.data_classes_dm_v3 import Node, View
+from cognite.dm_clients.cdf.data_classes_dm_v3 import Edge, Node, View
+from cognite.dm_clients.config import settings
+from cognite.dm_clients.metrics import timed_operation
+from cognite.dm_clients.misc import chunked
 
+from .bulk import Checkpoint, Progress, set_content_external_ids, write_chunks
 from .domain_client import DomainClient
 from .domain_model import DomainModel
+from .filters import Filter
+from .local_index import LocalIndex
+from .purge import purge_view
+from .read_only_model import ReadOnlyModel
 from .relationship_api import RelationshipAPI, RelationshipProxy
+from .session import active_session
 
 __all__ = [
     "DomainModelAPI",
@@ -22,6 +51,9 @@ _PendingEdgeT = Tuple[str, str, str]  # attr, start_ext_id, end_ext_id
 
 logger = logging.getLogger(__name__)
 
+_FILTER_BATCH_SIZE = int(settings.get("dm_clients.filter_batch_size", 100))
+_MAX_WORKERS = settings.get("dm_clients.max_workers")  # None = default of ThreadPoolExecutor
+
 
 DomainModelT = TypeVar("DomainModelT", bound=DomainModel)
 
@@ -63,6 +95,12 @@ class DomainModelAPI(Generic[DomainModelT]):
         self.api_version = api_version
 
         self.model_external_id: str = f"{domain_model.__name__}_{schema_version}"
+        self.local_index: Optional[LocalIndex[DomainModelT]] = None
+        # fast (de)serializers, generated on the domain model by `dm topython`:
+        self._to_node_properties: Optional[Callable[[DomainModelT, str], Dict[str, Any]]]
+        self._to_node_properties = getattr(domain_model, "to_node_properties", None)
+        self._from_node_properties: Optional[Callable[[str, Dict[str, Any]], DomainModelT]]
+        self._from_node_properties = getattr(domain_model, "from_node_properties", None)
 
     def _prepare_items(self, items: Iterable[DomainModelT], ext_id_prefix: str = "") -> List[DomainModelT]:
         if not items:
@@ -84,6 +122,7 @@ class DomainModelAPI(Generic[DomainModelT]):
 
         return list(items)
 
+    @timed_operation("apply")
     def apply(self, items: Iterable[DomainModelT], ext_id_prefix: str = "") -> List[DomainModelT]:
         """
         Send provided nodes to the API.
@@ -104,51 +143,120 @@ class DomainModelAPI(Generic[DomainModelT]):
         if not items:
             return []
 
-        with self.domain_client._cache_lock:
-            self.domain_client.cache.delete_many(*[item.externalId for item in items if item.externalId])
-
         items = self._create_related_o2o_nodes(items)
         items, pending_edges = self._create_related_o2m_items(items)
 
-        def _strip_items(item_data: dict) -> dict:
-            o2m_attr = self.domain_model.get_one_to_many_attrs()
-            return {key: val for key, val in item_data.items() if val is not None and key not in o2m_attr}
-
-        def _make_ref(item_data: dict) -> dict:
-            """Represents one-to-one relationships in CDF DM."""
-            return {
-                "space": self.space_id,  # TODO item.space_id ?
-                "externalId": item_data["externalId"],
-            }
-
-        def _properties_data(data: dict) -> dict:
-            """strip out reserved keys"""
-            reserved_keys = {"externalId"}
-            return {
-                key: _make_ref(val) if key in self.domain_model.get_one_to_one_attrs() else val
-                for key, val in data.items()
-                if key not in reserved_keys
-            }
-
-        def _make_node(data: dict) -> Node:
-            return Node(
-                version=str(self.schema_version),
-                space=self.space_id,
-                externalId=data["externalId"],
-                properties={
-                    self.space_id: {
-                        f"{self.view.externalId}/{self.view.version}": _properties_data(data),
-                    },
-                },
-            )
+        created_nodes = [self._make_node(item) for item in items]
+        if (session := active_session(self.domain_client)) is not None:
+            # sent (and cached) when the session is flushed, the edges are recorded in the session too:
+            session.add_nodes(self, items, created_nodes)
+            self._create_related_o2m_edges(pending_edges)
+            return items
+        try:
+            self.nodes_api.apply(self.view, nodes=created_nodes)
+
+            self._create_related_o2m_edges(pending_edges)
+        finally:
+            # cached versions are outdated, also when the write failed part-way:
+            if not explain.is_dry_run():
+                with self.domain_client._cache_lock:
+                    self.domain_client.cache.delete_many(*[item.externalId for item in items if item.externalId])
+                self.domain_client.clear_graph_cache()
+
+        if explain.is_dry_run():
+            # nothing was written, so nothing to evict or cache
+            return items
+        self._cache_created_items(items)
+        if self.local_index is not None:
+            self.local_index.add(items)
+        return items
 
-        created_nodes = [_make_node(_strip_items(item.dict(by_alias=True, exclude_defaults=False))) for item in items]
-        self.nodes_api.apply(self.view, nodes=created_nodes)
+    @timed_operation("bulk_load")
+    def bulk_load(
+        self,
+        items: Iterable[DomainModelT],
+        batch_size: int = 1000,
+        chunk_size: int = 1000,
+        checkpoint_path: Optional[Path] = None,
+        checkpoint_key: Optional[str] = None,
+        total: Optional[int] = None,
+        content_ids: bool = True,
+        progress: Optional[Progress] = None,
+    ) -> Progress:
+        """
+        Apply a large number of items, e.g. from a generator, in bounded memory: items are read `batch_size` at a time
+        (the next batch is read while the current one is written), and each batch is written in a session, i.e. nodes
+        and edges in parallel chunks of `chunk_size` (see `DomainClient.session`). Inside an active session, each batch
+        is written by flushing that session (which sends its other pending writes too).
+        With a `checkpoint_path`, the number of loaded items is saved after each batch under `checkpoint_key` (e.g. the
+        name of the source file, required with a checkpoint), and loading again with the same key skips that many
+        items; the checkpoint is removed when the load completes. The input must therefore yield the same items in the
+        same order on every run, use another key for a changed input. With `content_ids`, items without an externalId
+        get one derived from their content (see `bulk.content_external_id`) instead of a random one, so that reruns do
+        not create duplicates. With the `total` number of items, the progress includes the ETA:
+          progress = client.movie.bulk_load(
+              read_movies(), total=1_000_000, checkpoint_path=Path("movies.json"), checkpoint_key="movies.csv"
+          )
+        """
+        if checkpoint_path is not None and checkpoint_key is None:
+            raise ValueError("A checkpoint_key is required with a checkpoint_path, to tell inputs apart.")
+        progress = progress or Progress()
+        checkpoint = Checkpoint(checkpoint_path)
+        key = f"bulk_load {self.domain_model.__name__} {checkpoint_key}"
+        done = checkpoint.get(key, 0)
+        if total is not None:
+            progress.totals.setdefault("items loaded", max(total - done, 0))
+        batches = chunked(islice(items, done, None), batch_size)
+        with ThreadPoolExecutor(max_workers=1) as reader:
+            next_batch = reader.submit(next, batches, None)
+            while (batch := next_batch.result()) is not None:
+                next_batch = reader.submit(next, batches, None)
+                if content_ids:
+                    for item in batch:
+                        set_content_external_ids(item)
+                if (session := active_session(self.domain_client)) is not None:
+                    self.apply(batch)
+                    session.flush()
+                else:
+                    with self.domain_client.session(chunk_size):
+                        self.apply(batch)
+                done += len(batch)
+                checkpoint.set(key, done)
+                progress.add("items loaded", len(batch))
+        checkpoint.delete(key)
+        return progress
+
+    def _make_node(self, item: DomainModelT) -> Node:
+        return Node(
+            version=str(self.schema_version),
+            space=self.space_id,
+            externalId=item.externalId,
+            properties={
+                self.space_id: {
+                    f"{self.view.externalId}/{self.view.version}": self._node_properties(item),
+                },
+            },
+        )
 
-        self._create_related_o2m_edges(pending_edges)
+    def _node_properties(self, item: DomainModelT) -> Dict[str, Any]:
+        """
+        Node properties of an item: one-to-one relationships as direct relations, without one-to-many relationships
+        (these are edges) and None values.
+        Uses `to_node_properties` generated on the domain model (by the schema template of `dm topython`), if present.
+        """
+        if self._to_node_properties is not None:
+            return self._to_node_properties(item, self.space_id)
+        return self._generic_node_properties(item)
 
-        self._cache_created_items(items)
-        return items
+    def _generic_node_properties(self, item: DomainModelT) -> Dict[str, Any]:
+        o2m_attrs = self.domain_model.get_one_to_many_attrs()
+        o2o_attrs = self.domain_model.get_one_to_one_attrs()
+        reserved_keys = {"externalId"}
+        return {
+            key: {"space": self.space_id, "externalId": val["externalId"]} if key in o2o_attrs else val
+            for key, val in item.dict(by_alias=True, exclude_defaults=False).items()
+            if val is not None and key not in o2m_attrs and key not in reserved_keys
+        }
 
     def _create_related_o2o_nodes(self, items: List[DomainModelT]) -> List[DomainModelT]:
         """
@@ -283,48 +391,268 @@ class DomainModelAPI(Generic[DomainModelT]):
                     cached_items.append(cached_instance)
             else:
                 uncached_external_ids.add(external_id)
+        if self.domain_client.metrics.enabled:
+            self.domain_client.metrics.record_cache(hits=len(cached_items), misses=len(uncached_external_ids))
         return cached_items, list(uncached_external_ids)
 
-    def list(self, limit=25, resolve_relationships=True) -> List[DomainModelT]:
-        nodes = self.nodes_api.list(self.view, limit=limit)
+    @timed_operation("list")
+    def list(
+        self,
+        limit=25,
+        resolve_relationships=True,
+        read_only=False,
+        filter_: Optional[Union[Filter, dict]] = None,
+    ) -> Union[List[DomainModelT], List[ReadOnlyModel]]:
+        """
+        With `read_only`, return lightweight `ReadOnlyModel` items (see there), without resolving relationships and
+        without caching. Meant for reading large numbers of items.
+        With `filter_`, only list the items matching the filter, which is evaluated by the API. Build filters from
+        the generated `...Fields` classes, e.g. `filter_=MovieFields.release >= "1950-01-01T00:00:00Z"`, or pass a
+        filter in DM format.
+        """
+        nodes = self.nodes_api.list(self.view, limit=limit, filter_=self._dump_filter(filter_))
+        return self._make_items(nodes, resolve_relationships, read_only)
+
+    def iter_list(
+        self,
+        filter_: Optional[Union[Filter, dict]] = None,
+        chunk_size: int = 1000,
+        resolve_relationships=True,
+        read_only=False,
+    ) -> Iterator[Union[DomainModelT, ReadOnlyModel]]:
+        """
+        Iterate over all the items (matching `filter_`, see `list`), fetching `chunk_size` nodes at a time.
+        Only one chunk of items is held in memory at a time, and the next chunk is only requested when needed.
+        """
+        for nodes in self.nodes_api.iter_list(self.view, chunk_size=chunk_size, filter_=self._dump_filter(filter_)):
+            yield from self._make_items(nodes, resolve_relationships, read_only)
+
+    def _dump_filter(self, filter_: Optional[Union[Filter, dict]]) -> Optional[dict]:
+        if not isinstance(filter_, Filter):
+            return filter_
+        o2m_attrs = self.domain_model.get_one_to_many_attrs()
+        for name in filter_.field_names():
+            if name not in self.domain_model.__fields__ or name == "externalId":
+                raise ValueError(f"{self.domain_model.__name__} has no field {name!r} to filter on")
+            if name in o2m_attrs:
+                raise ValueError(f"Filtering on one-to-many field {self.domain_model.__name__}.{name} is not supported")
+        return filter_.dump(self.view, self.space_id)
+
+    def _make_items(
+        self, nodes: List[Node], resolve_relationships: bool, read_only: bool
+    ) -> Union[List[DomainModelT], List[ReadOnlyModel]]:
+        if read_only:
+            return self._make_read_only_items(nodes)
         if resolve_relationships:
-            items = self._retrieve_full(nodes)
-        else:
-            items = self._retrieve_wo_rels(nodes)
-        return items
+            return self._retrieve_full(nodes)
+        return self._retrieve_wo_rels(nodes)
 
+    @timed_operation("retrieve")
     def retrieve(self, external_ids: Iterable[str]) -> List[DomainModelT]:
         cached_items, uncached_external_ids = self._get_from_cache(external_ids)
         retrieved_nodes = self.nodes_api.retrieve(self.view, uncached_external_ids)
         retrieved_instances = self._retrieve_full(retrieved_nodes)
         return [*cached_items, *retrieved_instances]  # TODO maintain order according to external_ids
 
-    # TODO maybe implement delete_by_ext_ids? Note delete_related_items.
+    @timed_operation("referenced_by")
+    def referenced_by(
+        self, external_ids: Iterable[str], source_type: Type[DomainModel], attribute: str, use_cache: bool = True
+    ) -> List[DomainModel]:
+        """
+        Reverse ("inwards") relationship lookup: find items of `source_type` which refer to any of the given items (of
+        this API's type) through `attribute`. For example, movies in which person5 acted:
+          client.person.referenced_by(["person5"], Movie, "actors")
+        Works for both one-to-many (edges, queried by `endNode`) and one-to-one (direct relation) attributes.
+        The given externalIds are queried in batches, in parallel.
+        Edge lookups are served from the adjacency index if it is enabled (see `DomainClient.enable_adjacency_index`)
+        and `use_cache` is set.
+        """
+        _ext_ids = list(dict.fromkeys(external_ids))
+        if source_type.get_type_for_attr(attribute) is not self.domain_model:
+            raise ValueError(f"{source_type.__name__}.{attribute} does not refer to {self.domain_model.__name__}")
+        if not _ext_ids:
+            return []
+        source_api = self.domain_client.get_api_for_domain_model(source_type)
+        if attribute in source_type.get_one_to_many_attrs():
+            source_ext_ids = source_api.relationships.referencing(attribute, _ext_ids, use_cache=use_cache)
+            return source_api.retrieve(source_ext_ids)
+        return source_api._retrieve_full(source_api._list_nodes_referencing(attribute, _ext_ids))
+
+    def _list_nodes_referencing(self, attribute: str, external_ids: List[str]) -> List[Node]:
+        """List all nodes which point to any of the `external_ids` through the one-to-one `attribute`."""
+        property_ref = [self.view.space, f"{self.view.externalId}/{self.view.version}", attribute]
+
+        def _list_batch(batch: List[str]) -> List[Node]:
+            values = [{"space": self.space_id, "externalId": ext_id} for ext_id in batch]
+            return self.nodes_api.list(
+                self.view, limit=None, filter_={"in": {"property": property_ref, "values": values}}
+            )
+
+        with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+            futures = [
+                self.domain_client.metrics.submit(pool, _list_batch, batch)
+                for batch in chunked(external_ids, _FILTER_BATCH_SIZE)
+            ]
+        return [node for future in futures for node in future.result()]
 
+    @timed_operation("delete")
     def delete(self, items: Iterable[DomainModelT], delete_related_items: bool = False) -> None:
-        if not items:
+        """Delete the items and the edges that start on them (and related items, recursively), see `delete_by_ids`."""
+        self.delete_by_ids([item.externalId for item in items if item.externalId], cascade=delete_related_items)
+
+    @timed_operation("delete_by_ids")
+    def delete_by_ids(self, external_ids: Sequence[str], cascade: bool = False, chunk_size: int = 1000) -> None:
+        """
+        Delete items by externalId (without retrieving them) and the edges that start on them.
+        Note: edges that _end_ on these nodes will remain unaffected!
+        With `cascade`, the related items (one-to-one and one-to-many, recursively) are deleted too. They are found in
+        breadth-first waves: the relationships of all the items of a wave are looked up in parallel batches (edges by
+        `startNode`, direct relations by retrieving the nodes), then the edges and nodes of the wave are deleted in
+        chunks, so a cascade takes a round of requests per level of depth, not per item.
+        """
+        if (session := active_session(self.domain_client)) is not None:
+            session.delete(self, external_ids, cascade)
             return
-        # Delete all edges that start on items.
-        # Note: edges that _end_ on this node will remain unaffected!
-        edges = self.relationships.list(from_ext_ids=[item.externalId for item in items if item.externalId])
-        self.relationships.delete(edges)
-
-        if delete_related_items:
-            for attr in self.domain_model.get_one_to_one_attrs():
-                self.domain_client.delete(
-                    [subitem for item in items if (subitem := getattr(item, attr) is not None)],
-                    delete_related_items=True,
+        wave: Dict[DomainModelAPI, List[str]] = {self: list(dict.fromkeys(external_ids))}
+        seen = set(wave[self])
+        with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+            while wave:
+                lookups = [
+                    self.domain_client.metrics.submit(pool, api._find_related, batch, cascade)
+                    for api, api_ext_ids in wave.items()
+                    for batch in chunked(api_ext_ids, _FILTER_BATCH_SIZE)
+                ]
+                edges: List[Edge] = []
+                next_wave: Dict[DomainModelAPI, List[str]] = defaultdict(list)
+                for future in lookups:
+                    batch_edges, related = future.result()
+                    edges.extend(batch_edges)
+                    for domain_model, ext_id in related:
+                        if ext_id not in seen:
+                            seen.add(ext_id)
+                            next_wave[self.domain_client.get_api_for_domain_model(domain_model)].append(ext_id)
+
+                delete_edges = partial(self.relationships.edges_api.delete, self.space_id)
+                write_chunks(pool, delete_edges, list(dict.fromkeys(edge.externalId for edge in edges)), chunk_size)
+                wave_ext_ids = [ext_id for api_ext_ids in wave.values() for ext_id in api_ext_ids]
+                write_chunks(pool, partial(self.nodes_api.delete, self.space_id), wave_ext_ids, chunk_size)
+                if not explain.is_dry_run():  # nothing was deleted, so nothing to forget
+                    if (adjacency_index := self.domain_client.adjacency_index) is not None:
+                        adjacency_index.remove_edges(edges)
+                    for api, api_ext_ids in wave.items():
+                        api._forget(api_ext_ids)
+                wave = next_wave
+        if not explain.is_dry_run():
+            self.domain_client.clear_graph_cache()
+
+    def _find_related(
+        self, external_ids: List[str], cascade: bool
+    ) -> Tuple[List[Edge], List[Tuple[Type[DomainModel], str]]]:
+        """The edges that start on the items, and (with `cascade`) the types and externalIds of their related items."""
+        o2m_attrs = self.domain_model.get_one_to_many_attrs()
+        edges = self.relationships.edges_api.list(self.view, list(o2m_attrs), external_ids, limit=None)
+        if not cascade:
+            return edges, []
+        edge_types = {self.relationships.edge_type_ext_id(attr): model for attr, model in o2m_attrs.items()}
+        related = [(edge_types[edge.type.externalId], edge.endNode.externalId) for edge in edges]
+        if o2o_attrs := self.domain_model.get_one_to_one_attrs():
+            for node in self.nodes_api.retrieve(self.view, external_ids):
+                properties = node.get_properties(self.view)
+                related.extend(
+                    (model, ref["externalId"]) for attr, model in o2o_attrs.items() if (ref := properties.get(attr))
                 )
-            for attr in self.domain_model.get_one_to_many_attrs():
-                subitems: List[DomainModel] = []
-                for item in items:
-                    subitems.extend(subitem for subitem in getattr(item, attr, []) if subitem is not None)
-                self.domain_client.delete(subitems, delete_related_items=True)
-
-        external_ids = list({item.externalId for item in items if item.externalId})
-        self.nodes_api.delete(self.space_id, external_ids)
+        return edges, related
+
+    @timed_operation("purge")
+    def purge(
+        self,
+        filter_: Optional[Union[Filter, dict]] = None,
+        page_size: int = 1000,
+        chunk_size: int = 1000,
+        progress: Optional[Progress] = None,
+    ) -> Progress:
+        """
+        Delete all the items (matching `filter_`, see `list`) and the edges that start on them, fast: only externalIds
+        are streamed, and edges and nodes are deleted in parallel chunks (see `purge.purge_view()`). Related items are
+        not deleted. Returns the counts of deleted nodes and edges, with throughput:
+          print(client.movie.purge(MovieFields.release < "1950-01-01T00:00:00Z"))
+        """
+        return purge_view(
+            self.nodes_api,
+            self.relationships.edges_api,
+            self.view,
+            list(self.domain_model.get_one_to_many_attrs()),
+            filter_=self._dump_filter(filter_),
+            page_size=page_size,
+            chunk_size=chunk_size,
+            progress=progress,
+            on_deleted=self._on_purged,
+        )
+
+    def _on_purged(self, external_ids: List[str], edges: List[Edge]) -> None:
+        if explain.is_dry_run():
+            return  # nothing was deleted, so nothing to forget
+        if (adjacency_index := self.domain_client.adjacency_index) is not None:
+            adjacency_index.remove_edges(edges)
+        self._forget(external_ids)
+        self.domain_client.clear_graph_cache()
+
+    def _forget(self, external_ids: List[str]) -> None:
+        """Drop deleted items from the cache and the local index."""
         with self.domain_client._cache_lock:
             self.domain_client.cache.delete_many(*external_ids)
+        if self.local_index is not None:
+            self.local_index.remove(external_ids)
+
+    def create_local_index(
+        self,
+        hash_fields: Sequence[str] = (),
+        sorted_fields: Sequence[str] = (),
+        inverted_fields: Sequence[str] = (),
+        populate: bool = True,
+        limit: Optional[int] = None,
+    ) -> LocalIndex[DomainModelT]:
+        """
+        Opt-in: keep in-memory secondary indexes over items of this type, see `local_query()`.
+         * hash_fields: fields used in equality lookups,
+         * sorted_fields: fields used in range lookups (numbers, `Timestamp`s),
+         * inverted_fields: list fields used in membership lookups (e.g. `genres`).
+        The index is maintained on `apply()`, `delete()` and whenever items are retrieved or listed (`list()`,
+        `iter_list()`) with their relationships resolved. Items listed with `resolve_relationships=False` or
+        `read_only=True` are not indexed. With `populate`, the index is filled right away (see `refresh_local_index()`).
+        """
+        self.local_index = LocalIndex(self.domain_model, hash_fields, sorted_fields, inverted_fields)
+        if populate:
+            self.refresh_local_index(limit=limit)
+        return self.local_index
+
+    def refresh_local_index(self, limit: Optional[int] = None, chunk_size: int = 1000) -> None:
+        """
+        Rebuild the local index from all the items (or the first `limit` items), read `chunk_size` nodes at a time.
+        Relationships are not resolved, related items are references (see `_make_items_with_references()`).
+        The index is rebuilt aside and replaces the old one in a single step, lookups during a refresh see the old one.
+        """
+        if self.local_index is None:
+            raise ValueError(f"No local index on {type(self).__name__}, call create_local_index() first.")
+        rebuilt = self.local_index.empty_copy()
+        nodes = chain.from_iterable(self.nodes_api.iter_list(self.view, chunk_size=chunk_size))
+        for nodes_chunk in chunked(islice(nodes, limit), chunk_size):
+            rebuilt.add(self._make_items_with_references(nodes_chunk, rebuilt.fields))
+        self.local_index.replace_with(rebuilt)
+
+    def drop_local_index(self) -> None:
+        self.local_index = None
+
+    def local_query(self, **conditions: Any) -> List[DomainModelT]:
+        """
+        Query the local index, without calling the API. Conditions are `field=value` or `field__operator=value`, e.g:
+          client.movie.local_query(genres__contains="action", release__gte="2010-01-01T00:00:00Z")
+        See `LocalIndex.query()` for supported operators.
+        Only items which have passed through this API (or were loaded by `refresh_local_index()`) are considered.
+        """
+        if self.local_index is None:
+            raise ValueError(f"No local index on {type(self).__name__}, call create_local_index() first.")
+        return self.local_index.query(**conditions)
 
     def _retrieve_full(self, nodes: Iterable[Node]) -> List[DomainModelT]:
         """
@@ -343,6 +671,7 @@ class DomainModelAPI(Generic[DomainModelT]):
 
         o2m_edge_attrs = self.domain_model.get_one_to_many_attrs()
         o2o_edge_attrs = self.domain_model.get_one_to_one_attrs()
+        metrics = self.domain_client.metrics
 
         def _fetch_o2m_attr(attr_: str, related_domain_model_: Type[DomainModel], node_: Node) -> Any:
             edges = self.relationships.list([attr_], from_ext_ids=[node_.externalId])
@@ -356,6 +685,8 @@ class DomainModelAPI(Generic[DomainModelT]):
                         related_items.append(cached_item_)
                     else:
                         uncached_ext_ids.append(related_ext_id)
+                if metrics.enabled:
+                    metrics.record_cache(hits=len(related_items), misses=len(uncached_ext_ids))
                 domain_model_api_ = self.domain_client.get_api_for_domain_model(related_domain_model_)
                 related_items.extend(domain_model_api_.retrieve(uncached_ext_ids))
             return related_items
@@ -374,13 +705,15 @@ class DomainModelAPI(Generic[DomainModelT]):
 
         # retrieve all related attributes in parallel:
         futures = []
-        with ThreadPoolExecutor() as pool:
+        with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
             for attr, related_domain_model in o2m_edge_attrs.items():
                 for node in uncached_nodes:
-                    futures.append((node, attr, pool.submit(_fetch_o2m_attr, attr, related_domain_model, node)))
+                    future = metrics.submit(pool, _fetch_o2m_attr, attr, related_domain_model, node)
+                    futures.append((node, attr, future))
             for attr, related_domain_model in o2o_edge_attrs.items():
                 for node in uncached_nodes:
-                    futures.append((node, attr, pool.submit(_fetch_o2o_attr, attr, related_domain_model, node)))
+                    future = metrics.submit(pool, _fetch_o2o_attr, attr, related_domain_model, node)
+                    futures.append((node, attr, future))
         for node, attr, future in futures:
             node.update_properties(self.view, {attr: future.result()})
 
@@ -393,6 +726,8 @@ class DomainModelAPI(Generic[DomainModelT]):
         items = list(full_items.values())
         with self.domain_client._cache_lock:
             self._cache_created_items(items)
+        if self.local_index is not None:
+            self.local_index.add(items)
         return items
 
     def _retrieve_wo_rels(self, nodes: Iterable[Node]) -> List[DomainModelT]:
@@ -405,8 +740,52 @@ class DomainModelAPI(Generic[DomainModelT]):
         null_update = {attr: None for attr in [*o2o_edge_attrs, *o2m_edge_attrs]}
         return [self._make_item_from_node(node, null_update) for node in nodes]
 
+    def _make_items_with_references(self, nodes: List[Node], indexed_fields: Set[str]) -> List[DomainModelT]:
+        """
+        For every node make DomainModel item with related items as references (`DomainModel.ref()`), without
+        retrieving them. One-to-one relationships are read from the nodes, one-to-many relationships are only read
+        (from edges, listed in batches) for the `indexed_fields`, and set to None otherwise.
+        """
+        o2o_edge_attrs = self.domain_model.get_one_to_one_attrs()
+        o2m_edge_attrs = self.domain_model.get_one_to_many_attrs()
+        indexed_o2m_attrs = [attr for attr in o2m_edge_attrs if attr in indexed_fields]
+        related: Dict[str, Dict[str, List[DomainModel]]] = defaultdict(lambda: defaultdict(list))
+        if indexed_o2m_attrs and nodes:
+            attrs_by_type = {self.relationships.edge_type_ext_id(attr): attr for attr in indexed_o2m_attrs}
+            with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+                futures = [
+                    self.domain_client.metrics.submit(pool, self.relationships.list, indexed_o2m_attrs, batch, None)
+                    for batch in chunked([node.externalId for node in nodes], _FILTER_BATCH_SIZE)
+                ]
+            for edge in (edge for future in futures for edge in future.result()):
+                attr = attrs_by_type[edge.type.externalId]
+                related[edge.startNode.externalId][attr].append(o2m_edge_attrs[attr].ref(edge.endNode.externalId))
+        items = []
+        for node in nodes:
+            props = node.get_properties(self.view)
+            update: Dict[str, Any] = {attr: related[node.externalId][attr] for attr in indexed_o2m_attrs}
+            update.update({attr: None for attr in o2m_edge_attrs if attr not in update})
+            for attr, related_domain_model in o2o_edge_attrs.items():
+                update[attr] = None if (ref := props.get(attr)) is None else related_domain_model.ref(ref["externalId"])
+            items.append(self._make_item_from_node(node, update))
+        return items
+
+    def _make_read_only_items(self, nodes: Iterable[Node]) -> List[ReadOnlyModel]:
+        read_only_type = self.domain_client.schema.get_read_only_type(self.domain_model)
+        o2o_attrs = list(self.domain_model.get_one_to_one_attrs())
+        items = []
+        for node in nodes:
+            props = node.get_properties(self.view)
+            if o2o_attrs:
+                props = {**props, **{attr: ref["externalId"] for attr in o2o_attrs if (ref := props.get(attr))}}
+            items.append(read_only_type._from_properties(node.externalId, props))
+        return items
+
     def _make_item_from_node(self, node: Node, properties_update: Optional[Dict[str, Any]] = None) -> DomainModelT:
+        """Uses `from_node_properties` generated on the domain model (skipping validation), if present."""
         props = node.get_properties(self.view)
         if properties_update is not None:
             props.update(properties_update)
+        if self._from_node_properties is not None:
+            return self._from_node_properties(node.externalId, props)
         return self.domain_model(externalId=node.externalId, **props)
@@ -0,0 +1,170 @@
+"""
+Export of all the instances of a space to a gzip-compressed NDJSON file, and import of such a file, in bounded memory
+(`dm export` and `dm import`). For backups, cloning environments, and seeding test environments.
+
+The first line describes the export, then there is one line per node (with its properties in one view, nodes with
+properties in several views have a line per view), then one line per edge:
+
+    {"format": "dm-export", "version": 1, "space": "my_space"}
+    {"instanceType": "node", "space": "my_space", "externalId": "movie1", "view": {...}, "properties": {...}}
+    {"instanceType": "edge", "space": "my_space", "externalId": "...", "type": {...}, "startNode": {...}, ...}
+
+Instances are streamed page by page from the API, and imported in batches of lines (nodes before edges, as they are
+in the file), each written in parallel chunks. A checkpoint of the number of imported lines is saved after each batch,
+so that an interrupted import continues where it stopped. The checkpoint is per file (name, size and modification time)
+and target space, and is removed when the import completes.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from cognite.dm_clients.cdf.client_dm_v3 import CogniteClientDmV3
+from cognite.dm_clients.cdf.data_classes_dm_v3 import Edge, Node, View
+from cognite.dm_clients.config import settings
+from cognite.dm_clients.misc import chunked
+
+from .bulk import Checkpoint, Progress, write_chunks
+
+__all__ = [
+    "export_space",
+    "import_space",
+    "iter_export",
+]
+
+_MAX_WORKERS = settings.get("dm_clients.max_workers")  # None = default of ThreadPoolExecutor
+
+_FORMAT = "dm-export"
+_FORMAT_VERSION = 1
+_EDGE_KEYS = {"instanceType", "space", "externalId", "type", "startNode", "endNode"}
+
+
+def export_space(
+    client: CogniteClientDmV3,
+    space_id: str,
+    path: Path,
+    version: Optional[int] = None,
+    page_size: int = 1000,
+    progress: Optional[Progress] = None,
+) -> Progress:
+    """
+    Write the nodes of all the views in `space_id` (only views of `version`, if given), and the edges of their
+    relationships, to `path`.
+    """
+    progress = progress or Progress()
+    views = client.views.list(space_id, version)
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        file.write(json.dumps({"format": _FORMAT, "version": _FORMAT_VERSION, "space": space_id}) + "\n")
+        for view in views:
+            view_ref = {"space": view.space, "externalId": view.externalId, "version": view.version}
+            for nodes in client.nodes.iter_list(view, page_size):
+                for node in nodes:
+                    line = {
+                        "instanceType": "node",
+                        "space": node.space,
+                        "externalId": node.externalId,
+                        "view": view_ref,
+                        "properties": node.get_properties(view),
+                    }
+                    file.write(json.dumps(line) + "\n")
+                progress.add("nodes exported", len(nodes))
+
+        edge_types = set()  # views can share relationships (e.g. views of several versions)
+        for view in views:
+            attributes = []
+            for attr, prop in view.properties.items():
+                if prop.get("direction") == "outwards" and (edge_type := prop["type"]["externalId"]) not in edge_types:
+                    edge_types.add(edge_type)
+                    attributes.append(attr)
+            for edges in client.edges.iter_list(view, attributes, page_size):
+                for edge in edges:
+                    file.write(json.dumps(edge.dict(include=_EDGE_KEYS)) + "\n")
+                progress.add("edges exported", len(edges))
+    return progress
+
+
+def import_space(
+    client: CogniteClientDmV3,
+    path: Path,
+    space_id: Optional[str] = None,
+    batch_size: int = 1000,
+    chunk_size: int = 100,
+    checkpoint: Optional[Checkpoint] = None,
+    progress: Optional[Progress] = None,
+) -> Progress:
+    """
+    Write the instances in `path` (created by `export_space()`) to CDF. With `space_id`, the instances, views and
+    references in the exported space are imported to `space_id` instead. The views must already be deployed.
+    """
+    checkpoint = checkpoint or Checkpoint()
+    progress = progress or Progress()
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        header = json.loads(next(file))
+        if header.get("format") != _FORMAT:
+            raise ValueError(f"{path} is not a DM export.")
+        source_space = header["space"]
+        key = _checkpoint_key(path, space_id or source_space)
+        done = checkpoint.get(key, 0)
+        lines = islice(file, done, None)
+        with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+            for batch in chunked(lines, batch_size):
+                items = [json.loads(line) for line in batch]
+                if space_id is not None and space_id != source_space:
+                    items = [_move(item, source_space, space_id) for item in items]
+                nodes_by_view, edges = _parse_batch(items)
+                for view, nodes in nodes_by_view.values():
+                    write = partial(client.nodes.apply, view)
+                    progress.add("nodes imported", write_chunks(pool, write, nodes, chunk_size))
+                progress.add("edges imported", write_chunks(pool, client.edges.apply, edges, chunk_size))
+                done += len(batch)
+                checkpoint.set(key, done)
+    checkpoint.delete(key)
+    return progress
+
+
+def _checkpoint_key(path: Path, space_id: str) -> str:
+    """Another export with the same name, or an import of the same file to another space, starts from the beginning."""
+    stat = path.stat()
+    return f"import {path.name} ({stat.st_size} bytes, modified {stat.st_mtime_ns}) to {space_id}"
+
+
+def _parse_batch(items: List[Dict[str, Any]]) -> Tuple[Dict[Tuple[str, ...], Tuple[View, List[Node]]], List[Edge]]:
+    nodes_by_view: Dict[Tuple[str, ...], Tuple[View, List[Node]]] = {}
+    edges = []
+    for item in items:
+        if item["instanceType"] == "edge":
+            edges.append(Edge.parse_obj(item))
+            continue
+        view_ref = item["view"]
+        view_key = (view_ref["space"], view_ref["externalId"], view_ref["version"])
+        if view_key not in nodes_by_view:
+            nodes_by_view[view_key] = (View(**view_ref, properties={}), [])
+        view, nodes = nodes_by_view[view_key]
+        properties = {view.space: {view.externalId: item["properties"]}}
+        nodes.append(Node(space=item["space"], externalId=item["externalId"], properties=properties))
+    return nodes_by_view, edges
+
+
+def _move(value: Any, source_space: str, target_space: str) -> Any:
+    """Replace `source_space` with `target_space` in all (nested) references, i.e. dicts with a "space"."""
+    if isinstance(value, dict):
+        moved = {key: _move(item, source_space, target_space) for key, item in value.items()}
+        if moved.get("space") == source_space:
+            moved["space"] = target_space
+        return moved
+    if isinstance(value, list):
+        return [_move(item, source_space, target_space) for item in value]
+    return value
+
+
+def iter_export(path: Path) -> Iterator[Dict[str, Any]]:
+    """The lines of an export, after the header, e.g. to inspect or filter an export."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        next(file)
+        for line in file:
+            yield json.loads(line)
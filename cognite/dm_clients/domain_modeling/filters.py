@@ -0,0 +1,150 @@
+"""
+Typed references to DomainModel fields, which compile into DM instance filters that are evaluated by the API:
+
+>>> title = FieldRef("title")
+>>> release = FieldRef("release")
+>>> f = (title == "Casablanca") | ((release >= "1942-01-01T00:00:00Z") & ~title.prefix("The"))
+>>> f.field_names() == {"title", "release"}
+True
+
+`dm topython` generates a `...Fields` class with a `FieldRef` per filterable field of each type (e.g. `MovieFields`), to
+pass filters to `DomainModelAPI.list()` and `DomainModelAPI.iter_list()`.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from cognite.dm_clients.cdf.data_classes_dm_v3 import View
+
+from .domain_model import DomainModel
+
+__all__ = [
+    "FieldRef",
+    "Filter",
+]
+
+
+class Filter:
+    """
+    A filter on one field (created by `FieldRef` operators), or a combination of filters: `f1 & f2`, `f1 | f2`, `~f`.
+    Converted to the DM filter format by `dump()`.
+    """
+
+    def __init__(
+        self,
+        operator: str,
+        field: Optional[FieldRef] = None,
+        operands: Iterable[Filter] = (),
+        **arguments: Any,
+    ):
+        self.operator = operator
+        self.field = field
+        self.operands = list(operands)
+        self.arguments = arguments
+
+    def __and__(self, other: Filter) -> Filter:
+        return Filter("and", operands=[*self._flatten("and"), *other._flatten("and")])
+
+    def __or__(self, other: Filter) -> Filter:
+        return Filter("or", operands=[*self._flatten("or"), *other._flatten("or")])
+
+    def __invert__(self) -> Filter:
+        return Filter("not", operands=[self])
+
+    def _flatten(self, operator: str) -> List[Filter]:
+        """`(a & b) & c` is sent as a single "and" of three filters."""
+        return self.operands if self.operator == operator else [self]
+
+    def field_names(self) -> Set[str]:
+        """Names of all the fields this filter refers to."""
+        names = {self.field.name} if self.field is not None else set()
+        return names.union(*(operand.field_names() for operand in self.operands))
+
+    def dump(self, view: View, space_id: str) -> Dict[str, Any]:
+        """
+        The filter in DM format, for nodes with properties in `view`.
+        Related items (and externalIds, for one-to-one fields) are converted to references to nodes in `space_id`.
+        """
+        if self.operator == "not":
+            return {"not": self.operands[0].dump(view, space_id)}
+        if self.operator in ("and", "or"):
+            return {self.operator: [operand.dump(view, space_id) for operand in self.operands]}
+        assert self.field is not None
+        body: Dict[str, Any] = {"property": [view.space, f"{view.externalId}/{view.version}", self.field.name]}
+        for key, value in self.arguments.items():
+            if key == "values":
+                body[key] = [self.field._dump_value(item, space_id) for item in value]
+            else:
+                body[key] = self.field._dump_value(value, space_id)
+        return {self.operator: body}
+
+    def __repr__(self) -> str:
+        if self.field is None:
+            return f"{self.operator}({', '.join(map(repr, self.operands))})"
+        arguments = ", ".join(f"{key}={value!r}" for key, value in self.arguments.items())
+        return f"{self.operator}({self.field.name}{', ' if arguments else ''}{arguments})"
+
+
+class FieldRef:
+    """
+    Reference to a (scalar or one-to-one) field, comparison operators and methods create `Filter`s on the field.
+    One-to-many fields are stored as edges, and can not be filtered on.
+    """
+
+    def __init__(self, name: str, direct_relation: bool = False):
+        self.name = name
+        self.direct_relation = direct_relation
+
+    def __eq__(self, value: Any) -> Filter:  # type: ignore[override]
+        return Filter("equals", self, value=value)
+
+    def __ne__(self, value: Any) -> Filter:  # type: ignore[override]
+        return ~(self == value)
+
+    __hash__ = object.__hash__
+
+    def __lt__(self, value: Any) -> Filter:
+        return Filter("range", self, lt=value)
+
+    def __le__(self, value: Any) -> Filter:
+        return Filter("range", self, lte=value)
+
+    def __gt__(self, value: Any) -> Filter:
+        return Filter("range", self, gt=value)
+
+    def __ge__(self, value: Any) -> Filter:
+        return Filter("range", self, gte=value)
+
+    def in_(self, values: Iterable[Any]) -> Filter:
+        return Filter("in", self, values=list(values))
+
+    def prefix(self, value: str) -> Filter:
+        return Filter("prefix", self, value=value)
+
+    def exists(self) -> Filter:
+        return Filter("exists", self)
+
+    def contains(self, value: Any) -> Filter:
+        """For list fields: the list contains `value`."""
+        return self.contains_any([value])
+
+    def contains_any(self, values: Iterable[Any]) -> Filter:
+        """For list fields: the list contains at least one of `values`."""
+        return Filter("containsAny", self, values=list(values))
+
+    def contains_all(self, values: Iterable[Any]) -> Filter:
+        """For list fields: the list contains all of `values`."""
+        return Filter("containsAll", self, values=list(values))
+
+    def _dump_value(self, value: Any, space_id: str) -> Any:
+        if isinstance(value, DomainModel):
+            return {"space": space_id, "externalId": value.externalId}
+        if self.direct_relation and isinstance(value, str):
+            return {"space": space_id, "externalId": value}
+        if isinstance(value, datetime):
+            return value.isoformat(timespec="milliseconds")
+        return value
+
+    def __repr__(self) -> str:
+        return f"FieldRef({self.name!r})"
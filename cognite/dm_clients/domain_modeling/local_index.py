@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import logging
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from threading import RLock
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Sequence, Set, Tuple, Type, TypeVar, get_args
+
+from cognite.dm_clients.custom_types import Timestamp
+
+from .domain_model import DomainModel
+
+__all__ = [
+    "LocalIndex",
+]
+
+logger = logging.getLogger(__name__)
+
+
+DomainModelT = TypeVar("DomainModelT", bound=DomainModel)
+
+_RANGE_OPERATORS = ("gt", "gte", "lt", "lte")
+_OPERATORS = ("eq", "in", "contains", "contains_any", *_RANGE_OPERATORS)
+
+
+def _normalize(value: Any) -> Any:
+    """
+    Make a value usable as an index key:
+     * related items (and reference dicts) are represented by their externalId,
+     * `Timestamp`s and `datetime`s are converted to timezone-aware datetimes (naive ones are assumed to be UTC), so
+       that they compare correctly regardless of their string representation.
+    """
+    if isinstance(value, DomainModel):
+        return value.externalId
+    if isinstance(value, dict) and "externalId" in value:
+        return value["externalId"]
+    if isinstance(value, Timestamp):
+        value = value.datetime()
+    if isinstance(value, datetime):
+        return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class _SortedIndex:
+    """Sorted list of `(key, externalId)` pairs, with a parallel list of keys for bisecting."""
+
+    def __init__(self) -> None:
+        self.keys: List[Any] = []
+        self.entries: List[Tuple[Any, str]] = []
+
+    def add(self, entries: Sequence[Tuple[Any, str]]) -> None:
+        """Add a batch of entries: appended and sorted once (merging sorted runs), instead of inserting one by one."""
+        if not entries:
+            return
+        self.entries.extend(entries)
+        self.entries.sort()
+        self.keys = [key for key, _ in self.entries]
+
+    def remove(self, entries: Set[Tuple[Any, str]]) -> None:
+        if len(entries) == 1:
+            (entry,) = entries
+            idx = bisect_left(self.entries, entry)
+            if idx < len(self.entries) and self.entries[idx] == entry:
+                del self.entries[idx]
+                del self.keys[idx]
+        elif entries:
+            self.entries = [entry for entry in self.entries if entry not in entries]
+            self.keys = [key for key, _ in self.entries]
+
+    def range(self, operator: str, bound: Any) -> Set[str]:
+        if operator == "gt":
+            entries = self.entries[bisect_right(self.keys, bound) :]
+        elif operator == "gte":
+            entries = self.entries[bisect_left(self.keys, bound) :]
+        elif operator == "lt":
+            entries = self.entries[: bisect_left(self.keys, bound)]
+        else:  # lte
+            entries = self.entries[: bisect_right(self.keys, bound)]
+        return {ext_id for _, ext_id in entries}
+
+
+class LocalIndex(Generic[DomainModelT]):
+    """
+    In-memory secondary indexes over items of a single DomainModel, for answering queries without calling the API.
+
+    Three kinds of indexes are supported:
+     * hash indexes, for equality lookups (`title="Thor"`, `director__in=["person1", "person4"]`),
+     * sorted indexes, for range lookups on numeric, `Timestamp` and other comparable fields
+       (`release__gte="2010-01-01T00:00:00Z"`),
+     * inverted indexes, for membership lookups on list fields (`genres__contains="action"`).
+
+    Conditions on fields without a suitable index are evaluated by scanning the items selected by other conditions
+    (or all the indexed items).
+    This class is considered "internal", use it through `DomainModelAPI.create_local_index()` and
+    `DomainModelAPI.local_query()`.
+    """
+
+    def __init__(
+        self,
+        domain_model: Type[DomainModelT],
+        hash_fields: Sequence[str] = (),
+        sorted_fields: Sequence[str] = (),
+        inverted_fields: Sequence[str] = (),
+    ):
+        if unknown_fields := {*hash_fields, *sorted_fields, *inverted_fields} - set(domain_model.__fields__):
+            raise ValueError(f"Cannot index unknown fields of {domain_model.__name__}: {sorted(unknown_fields)}")
+        self.domain_model = domain_model
+        self._lock = RLock()
+        self._items: Dict[str, DomainModelT] = {}
+        self._keys: Dict[str, Dict[str, Any]] = {}  # externalId -> field -> normalized value (as indexed)
+        self._hash: Dict[str, Dict[Any, Set[str]]] = {field: {} for field in hash_fields}
+        self._sorted: Dict[str, _SortedIndex] = {field: _SortedIndex() for field in sorted_fields}
+        self._inverted: Dict[str, Dict[Any, Set[str]]] = {field: {} for field in inverted_fields}
+
+    @property
+    def fields(self) -> Set[str]:
+        return {*self._hash, *self._sorted, *self._inverted}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, items: Iterable[DomainModelT]) -> None:
+        """Add items to the index, replacing any previously indexed items with the same externalId."""
+        batch = {item.externalId: item for item in items if item.externalId and not item._reference}
+        with self._lock:
+            self._remove_all(batch)
+            added: Dict[str, List[Tuple[Any, str]]] = {field: [] for field in self._sorted}
+            for item in batch.values():
+                self._add(item, added)
+            for field, entries in added.items():
+                self._sorted[field].add(entries)
+
+    def remove(self, external_ids: Iterable[str]) -> None:
+        with self._lock:
+            self._remove_all(external_ids)
+
+    def add_related(self, external_id: str, attribute: str, related_ext_ids: Iterable[str]) -> None:
+        """Keep an inverted index up to date when new one-to-many relationships are added to an indexed item."""
+        with self._lock:
+            if external_id not in self._items or attribute not in self._inverted:
+                return
+            keys = self._keys[external_id].setdefault(attribute, [])
+            for related_ext_id in related_ext_ids:
+                if related_ext_id not in keys:
+                    keys.append(related_ext_id)
+                    self._inverted[attribute].setdefault(related_ext_id, set()).add(external_id)
+
+    def set_related(self, external_id: str, attribute: str, related_ext_ids: Iterable[str]) -> None:
+        """Keep an inverted index up to date when the one-to-many relationships of an indexed item are replaced."""
+        with self._lock:
+            if external_id not in self._items or attribute not in self._inverted:
+                return
+            for related_ext_id in self._keys[external_id].get(attribute, []):
+                self._discard(self._inverted[attribute], related_ext_id, external_id)
+            self._keys[external_id][attribute] = []
+            self.add_related(external_id, attribute, related_ext_ids)
+
+    def empty_copy(self) -> LocalIndex[DomainModelT]:
+        """A new, empty index over the same fields, e.g. to be filled and passed to `replace_with()`."""
+        return LocalIndex(self.domain_model, list(self._hash), list(self._sorted), list(self._inverted))
+
+    def replace_with(self, other: LocalIndex[DomainModelT]) -> None:
+        """Replace all the indexed items with those of `other` (an `empty_copy()` of this index) in a single step."""
+        with self._lock, other._lock:
+            self._items, self._keys = other._items, other._keys
+            self._hash, self._sorted, self._inverted = other._hash, other._sorted, other._inverted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._keys.clear()
+            for hash_index in self._hash.values():
+                hash_index.clear()
+            for field in self._sorted:
+                self._sorted[field] = _SortedIndex()
+            for inverted_index in self._inverted.values():
+                inverted_index.clear()
+
+    def query(self, **conditions: Any) -> List[DomainModelT]:
+        """
+        Find indexed items matching all the conditions.
+        Conditions are given as `field=value` or `field__operator=value`, where operator is one of:
+         * `eq` (default), `in`: equality, membership of the value in a collection of values,
+         * `gt`, `gte`, `lt`, `lte`: range comparison,
+         * `contains`, `contains_any`: for list fields, the list contains the value, or any of the values.
+        """
+        parsed = [self._parse_condition(key, value) for key, value in conditions.items()]
+        with self._lock:
+            candidates: Optional[Set[str]] = None
+            predicates: List[Callable[[str], bool]] = []
+            for field, operator, value in parsed:
+                matches = self._lookup(field, operator, value)
+                if matches is None:
+                    predicates.append(self._make_predicate(field, operator, value))
+                    continue
+                candidates = matches if candidates is None else candidates & matches
+                if not candidates:
+                    return []
+            if candidates is None:
+                candidates = set(self._items)
+            return [
+                self._items[ext_id]
+                for ext_id in sorted(candidates)
+                if all(predicate(ext_id) for predicate in predicates)
+            ]
+
+    def _add(self, item: DomainModelT, added: Dict[str, List[Tuple[Any, str]]]) -> None:
+        """Index an item, sorted index entries are collected in `added` (per field) to be added as a batch."""
+        external_id = item.externalId
+        assert external_id is not None
+        self._items[external_id] = item
+        keys: Dict[str, Any] = {}
+        for field, hash_index in self._hash.items():
+            key = _normalize(getattr(item, field, None))
+            try:
+                hash_index.setdefault(key, set()).add(external_id)
+            except TypeError:
+                logger.debug(f"Value of {field} on {external_id} is not hashable, not indexed.")
+                continue
+            keys[field] = key
+        for field in self._sorted:
+            key = _normalize(getattr(item, field, None))
+            if key is not None:
+                added[field].append((key, external_id))
+            keys[field] = key
+        for field, inverted_index in self._inverted.items():
+            values = [_normalize(value) for value in getattr(item, field, None) or [] if value is not None]
+            for value in values:
+                inverted_index.setdefault(value, set()).add(external_id)
+            keys[field] = values
+        self._keys[external_id] = keys
+
+    def _remove_all(self, external_ids: Iterable[str]) -> None:
+        removed: Dict[str, Set[Tuple[Any, str]]] = {field: set() for field in self._sorted}
+        for external_id in external_ids:
+            self._remove(external_id, removed)
+        for field, entries in removed.items():
+            self._sorted[field].remove(entries)
+
+    def _remove(self, external_id: str, removed: Dict[str, Set[Tuple[Any, str]]]) -> None:
+        """Unindex an item, sorted index entries are collected in `removed` (per field) to be removed as a batch."""
+        if self._items.pop(external_id, None) is None:
+            return
+        keys = self._keys.pop(external_id)
+        for field, hash_index in self._hash.items():
+            if field in keys:
+                self._discard(hash_index, keys[field], external_id)
+        for field in self._sorted:
+            if keys.get(field) is not None:
+                removed[field].add((keys[field], external_id))
+        for field, inverted_index in self._inverted.items():
+            for value in keys.get(field, []):
+                self._discard(inverted_index, value, external_id)
+
+    @staticmethod
+    def _discard(index: Dict[Any, Set[str]], key: Any, external_id: str) -> None:
+        ext_ids = index.get(key)
+        if ext_ids is not None:
+            ext_ids.discard(external_id)
+            if not ext_ids:
+                del index[key]
+
+    def _parse_condition(self, key: str, value: Any) -> Tuple[str, str, Any]:
+        field, _, operator = key.partition("__")
+        operator = operator or "eq"
+        if operator not in _OPERATORS:
+            raise ValueError(f"Unsupported operator in local query: {key}")
+        if field not in self.domain_model.__fields__:
+            raise ValueError(f"Unknown field in local query: {key}")
+        if operator in {"in", "contains_any"}:
+            return field, operator, [self._normalize_value(field, val) for val in value]
+        return field, operator, self._normalize_value(field, value)
+
+    def _normalize_value(self, field: str, value: Any) -> Any:
+        """Values of `Timestamp` fields can be passed as strings, those are parsed and compared as datetimes."""
+        field_type = self.domain_model.__fields__[field].type_
+        while type_args := get_args(field_type):
+            field_type = type_args[0]
+        if field_type is Timestamp and isinstance(value, str):
+            value = Timestamp.validate(value)
+        return _normalize(value)
+
+    def _lookup(self, field: str, operator: str, value: Any) -> Optional[Set[str]]:
+        """Use an index to find matching externalIds, return None if there is no suitable index."""
+        if operator in {"eq", "in"} and field in self._hash:
+            values = [value] if operator == "eq" else value
+            return set().union(*(self._hash[field].get(val, set()) for val in values))
+        if operator in _RANGE_OPERATORS and field in self._sorted:
+            return self._sorted[field].range(operator, value)
+        if operator in {"contains", "contains_any"} and field in self._inverted:
+            values = [value] if operator == "contains" else value
+            return set().union(*(self._inverted[field].get(val, set()) for val in values))
+        return None
+
+    def _make_predicate(self, field: str, operator: str, value: Any) -> Callable[[str], bool]:
+        def _predicate(external_id: str) -> bool:
+            attr_value = getattr(self._items[external_id], field)
+            if operator in {"contains", "contains_any"}:
+                values = {_normalize(val) for val in attr_value or []}
+                return value in values if operator == "contains" else bool(values.intersection(value))
+            attr_value = _normalize(attr_value)
+            if operator == "eq":
+                return attr_value == value
+            if operator == "in":
+                return attr_value in value
+            if attr_value is None:
+                return False
+            return {
+                "gt": attr_value > value,
+                "gte": attr_value >= value,
+                "lt": attr_value < value,
+                "lte": attr_value <= value,
+            }[operator]
+
+        return _predicate
@@ -0,0 +1,142 @@
+"""
+Copying data from one version of the views of a data model to another, e.g. after bumping `schema_version`, see
+`DomainClient.migrate()`.
+
+Nodes are streamed page by page from the old view, transformed, and written through the new view in parallel chunks.
+The next page is read while the current one is written, and a checkpoint is saved after each page (per type and pair
+of view versions), so that an interrupted migration continues where it stopped.
+
+Edges are not versioned, they are visible through any view with the same edge type. Only edges of relationships whose
+edge type differs in the new view (e.g. renamed attributes) are copied, to new edges of the new type. Old edges are
+kept, like the properties of the nodes in the old view.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from cognite.dm_clients.cdf.client_dm_v3 import EdgesAPI, NodesAPI
+from cognite.dm_clients.cdf.data_classes_dm_v3 import Edge, Node, RelationReference, View
+from cognite.dm_clients.config import settings
+
+from .bulk import Checkpoint, Progress, prefetch_pages, write_chunks
+
+__all__ = [
+    "MigrationTransform",
+    "migrate_view",
+]
+
+_MAX_WORKERS = settings.get("dm_clients.max_workers")  # None = default of ThreadPoolExecutor
+
+# (type name, externalId, properties in the old view) -> properties in the new view, or None to skip the node:
+MigrationTransform = Callable[[str, str, Dict[str, Any]], Optional[Dict[str, Any]]]
+
+_DONE = "done"
+
+
+def migrate_view(
+    nodes_api: NodesAPI,
+    edges_api: EdgesAPI,
+    old_view: View,
+    new_view: View,
+    transform: Optional[MigrationTransform] = None,
+    renamed_attrs: Optional[Dict[str, str]] = None,
+    page_size: int = 1000,
+    chunk_size: int = 100,
+    checkpoint: Optional[Checkpoint] = None,
+    progress: Optional[Progress] = None,
+) -> None:
+    """
+    Copy the nodes (and edges, see the module docstring) of `old_view` to `new_view`. Without a `transform`, the
+    properties which are also in the new view are copied as they are. `renamed_attrs` maps one-to-many attributes of
+    the old view to their names in the new view.
+    """
+    checkpoint = checkpoint or Checkpoint()
+    progress = progress or Progress()
+    type_name = new_view.externalId
+    key = f"{type_name} {old_view.version}->{new_view.version}"
+    new_properties = set(new_view.properties)
+
+    def to_new_node(node: Node) -> Optional[Node]:
+        properties = node.get_properties(old_view)
+        if transform is not None:
+            new_props = transform(type_name, node.externalId, properties)
+        else:
+            new_props = {key: value for key, value in properties.items() if key in new_properties}
+        if new_props is None:
+            return None
+        return Node(space=node.space, externalId=node.externalId, properties={new_view.space: {type_name: new_props}})
+
+    def write_nodes(pool: ThreadPoolExecutor, nodes: List[Node]) -> None:
+        new_nodes = [new_node for node in nodes if (new_node := to_new_node(node)) is not None]
+        progress.add("nodes skipped", len(nodes) - len(new_nodes))
+        written = write_chunks(pool, lambda chunk: nodes_api.apply(new_view, chunk), new_nodes, chunk_size)
+        progress.add("nodes written", written)
+
+    _stream_pages(
+        lambda cursor: nodes_api.list_page(old_view, page_size, cursor),
+        write_nodes,
+        checkpoint,
+        f"{key}/nodes",
+        progress,
+        "nodes read",
+    )
+
+    # edges of one-to-many attributes whose edge type changed:
+    renamed_attrs = renamed_attrs or {}
+    new_types: Dict[str, str] = {}  # old edge type -> new attribute
+    for attr, prop in old_view.properties.items():
+        if prop.get("direction") != "outwards":
+            continue
+        new_attr = renamed_attrs.get(attr, attr)
+        new_prop = new_view.properties.get(new_attr) or {}
+        new_type = (new_prop.get("type") or {}).get("externalId")
+        if new_type is not None and new_type != prop["type"]["externalId"]:
+            new_types[prop["type"]["externalId"]] = new_attr
+    if not new_types:
+        return
+
+    def to_new_edge(edge: Edge) -> Edge:
+        new_attr = new_types[edge.type.externalId]
+        new_type = new_view.properties[new_attr]["type"]["externalId"]
+        return Edge(
+            externalId=f"{edge.startNode.externalId}.{new_attr}__{edge.endNode.externalId}",
+            space=edge.space,
+            type=RelationReference(space=new_view.space, externalId=new_type),
+            startNode=edge.startNode,
+            endNode=edge.endNode,
+        )
+
+    def write_edges(pool: ThreadPoolExecutor, edges: List[Edge]) -> None:
+        written = write_chunks(pool, edges_api.apply, [to_new_edge(edge) for edge in edges], chunk_size)
+        progress.add("edges written", written)
+
+    old_attrs = [
+        attr for attr, prop in old_view.properties.items() if (prop.get("type") or {}).get("externalId") in new_types
+    ]
+    _stream_pages(
+        lambda cursor: edges_api.list_page(old_view, old_attrs, page_size, cursor),
+        write_edges,
+        checkpoint,
+        f"{key}/edges",
+        progress,
+        "edges read",
+    )
+
+
+def _stream_pages(
+    read_page: Callable[[Optional[str]], Any],
+    write_page: Callable[[ThreadPoolExecutor, List[Any]], None],
+    checkpoint: Checkpoint,
+    key: str,
+    progress: Progress,
+    read_name: str,
+) -> None:
+    """Read pages from the cursor in `checkpoint`, read the next page while writing the current one."""
+    if (start := checkpoint.get(key)) == _DONE:
+        return
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+        for items, cursor in prefetch_pages(pool, read_page, start):
+            progress.add(read_name, len(items))
+            write_page(pool, items)
+            checkpoint.set(key, cursor or _DONE)
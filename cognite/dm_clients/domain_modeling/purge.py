@@ -0,0 +1,90 @@
+"""
+Deleting many instances fast, see `DomainModelAPI.purge()` and `DomainClient.purge_space()`.
+
+Instances are streamed page by page, only their externalIds are used (no domain model items are built). The next page
+is read while the current one is deleted, in parallel chunks. Edges are deleted before the nodes they start on, so that
+an interrupted purge does not leave edges of deleted nodes behind; calling it again continues with what is left.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, List, Optional, Sequence
+
+from cognite.dm_clients.cdf.client_dm_v3 import EdgesAPI, NodesAPI
+from cognite.dm_clients.cdf.data_classes_dm_v3 import Edge, View
+from cognite.dm_clients.config import settings
+from cognite.dm_clients.misc import chunked
+
+from .bulk import Progress, prefetch_pages, write_chunks
+
+__all__ = [
+    "purge_space",
+    "purge_view",
+]
+
+_FILTER_BATCH_SIZE = int(settings.get("dm_clients.filter_batch_size", 100))
+_MAX_WORKERS = settings.get("dm_clients.max_workers")  # None = default of ThreadPoolExecutor
+
+
+def purge_view(
+    nodes_api: NodesAPI,
+    edges_api: EdgesAPI,
+    view: View,
+    attributes: Sequence[str],
+    filter_: Optional[dict] = None,
+    page_size: int = 1000,
+    chunk_size: int = 1000,
+    progress: Optional[Progress] = None,
+    on_deleted: Optional[Callable[[List[str], List[Edge]], None]] = None,
+) -> Progress:
+    """
+    Delete the nodes of `view` (matching `filter_`, if given) and their edges of `attributes`. `on_deleted` is called
+    with the externalIds of the nodes and the edges deleted from each page, e.g. to update caches.
+    """
+    progress = progress or Progress()
+    read_page = partial(nodes_api.list_page, view, page_size, filter_=filter_)
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+        for nodes, _ in prefetch_pages(pool, read_page):
+            external_ids = [node.externalId for node in nodes]
+            edges: List[Edge] = []
+            if attributes:
+                list_edges = partial(edges_api.list, view, attributes, limit=None)
+                lookups = [
+                    edges_api.metrics.submit(pool, list_edges, batch)
+                    for batch in chunked(external_ids, _FILTER_BATCH_SIZE)
+                ]
+                for lookup in lookups:
+                    edges.extend(lookup.result())
+                delete_edges = partial(edges_api.delete, view.space)
+                deleted = write_chunks(pool, delete_edges, [edge.externalId for edge in edges], chunk_size)
+                progress.add("edges deleted", deleted)
+            deleted = write_chunks(pool, partial(nodes_api.delete, view.space), external_ids, chunk_size)
+            progress.add("nodes deleted", deleted)
+            if on_deleted is not None:
+                on_deleted(external_ids, edges)
+    return progress
+
+
+def purge_space(
+    nodes_api: NodesAPI,
+    edges_api: EdgesAPI,
+    space_id: str,
+    page_size: int = 1000,
+    chunk_size: int = 1000,
+    progress: Optional[Progress] = None,
+) -> Progress:
+    """Delete all the edges, then all the nodes, in `space_id` (of any view, also views not in the schema)."""
+    progress = progress or Progress()
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+        read_edges = partial(edges_api.list_space_page, space_id, page_size)
+        delete_edges = partial(edges_api.delete, space_id)
+        for edges, _ in prefetch_pages(pool, read_edges):
+            deleted = write_chunks(pool, delete_edges, [edge.externalId for edge in edges], chunk_size)
+            progress.add("edges deleted", deleted)
+        read_nodes = partial(nodes_api.list_space_page, space_id, page_size)
+        delete_nodes = partial(nodes_api.delete, space_id)
+        for nodes, _ in prefetch_pages(pool, read_nodes):
+            deleted = write_chunks(pool, delete_nodes, [node.externalId for node in nodes], chunk_size)
+            progress.add("nodes deleted", deleted)
+    return progress
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Tuple, Type
+
+from .domain_model import DomainModel
+
+__all__ = [
+    "ReadOnlyModel",
+    "make_read_only_type",
+]
+
+
+class ReadOnlyModel:
+    """
+    Base class for lightweight, read-only companions of DomainModel classes, returned by
+    `DomainModelAPI.list(read_only=True)` for reading large numbers of items.
+
+    Attributes are stored in `__slots__` (no per-instance `__dict__`, no validation), values are as returned by the API:
+     * timestamps are strings,
+     * one-to-one relationships are the externalId of the related item,
+     * one-to-many relationships are not fetched (None).
+
+    Subclasses are generated with `dm topython --read-only-models`, or created on the fly by
+    `make_read_only_type()` for DomainModels without a generated companion.
+    """
+
+    __slots__ = ("externalId",)
+    _fields: Tuple[str, ...] = ()  # all slots except externalId, set in `__init_subclass__`
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        slots = [slot for klass in reversed(cls.__mro__) for slot in getattr(klass, "__slots__", ())]
+        cls._fields = tuple(slot for slot in slots if slot != "externalId")
+
+    def __init__(self, externalId: str, **values: Any):  # noqa: N803
+        object.__setattr__(self, "externalId", externalId)
+        for field in self._fields:
+            object.__setattr__(self, field, values.get(field))
+
+    @classmethod
+    def _from_properties(cls, external_id: str, properties: Dict[str, Any]) -> ReadOnlyModel:
+        """Faster than `__init__`, used by `DomainModelAPI` for every item."""
+        item = object.__new__(cls)
+        set_attr = object.__setattr__
+        set_attr(item, "externalId", external_id)
+        for field in cls._fields:
+            set_attr(item, field, properties.get(field))
+        return item
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return type(self)._from_properties, (self.externalId, self.dict())
+
+    def __eq__(self, other: Any) -> bool:
+        return type(other) is type(self) and self.dict() == other.dict()
+
+    __hash__ = None  # type: ignore  # values can be lists and dicts
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{key}={value!r}" for key, value in self.dict().items())
+        return f"{type(self).__name__}({values})"
+
+    def dict(self) -> Dict[str, Any]:
+        return {"externalId": self.externalId, **{field: getattr(self, field) for field in self._fields}}
+
+
+def make_read_only_type(domain_model: Type[DomainModel]) -> Type[ReadOnlyModel]:
+    """Create a ReadOnlyModel subclass with the fields of `domain_model`."""
+    slots = tuple(field for field in domain_model.__fields__ if field != "externalId")
+    return type(f"{domain_model.__name__}ReadOnly", (ReadOnlyModel,), {"__slots__": slots})
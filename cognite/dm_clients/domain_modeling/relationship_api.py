@@ -3,19 +3,27 @@ from __future__ import annotations
 import logging
 from concurrent.futures import ThreadPoolExecutor
 from functools import partial
-from typing import TYPE_CHECKING, Callable, Iterable, List, Sequence, Type, cast
+from typing import TYPE_CHECKING, Callable, Iterable, List, Optional, Sequence, Type, cast
 
+from cognite.dm_clients import explain
 from cognite.dm_clients.cdf.client_dm_v3 import EdgesAPI
 from cognite.dm_clients.cdf.data_classes_dm_v3 import Edge, RelationReference, View
+from cognite.dm_clients.config import settings
+from cognite.dm_clients.misc import chunked
 
 from .domain_model import DomainModel
+from .session import active_session
 
 if TYPE_CHECKING:
     from . import DomainModelAPI
+    from .adjacency_index import AdjacencyIndex
 
 
 logger = logging.getLogger(__name__)
 
+_FILTER_BATCH_SIZE = int(settings.get("dm_clients.filter_batch_size", 100))
+_MAX_WORKERS = settings.get("dm_clients.max_workers")  # None = default of ThreadPoolExecutor
+
 
 class RelationshipAPI:
     """
@@ -43,12 +51,16 @@ class RelationshipAPI:
         self.schema_version = schema_version
         self.space_id = space_id
 
-    def add(self, attribute: str, start_ext_id: str, end_ext_ids: Iterable[str]) -> None:
-        """
-        Create one or more Edge instances on a particular attribute of the `self.model_type` type of instance.
-        """
-        edge_type_ext_id = f"{self.model_type.__name__}.{attribute}"
-        edges = [
+    @property
+    def _adjacency_index(self) -> Optional[AdjacencyIndex]:
+        return self.domain_model_api.domain_client.adjacency_index
+
+    def edge_type_ext_id(self, attribute: str) -> str:
+        return f"{self.model_type.__name__}.{attribute}"
+
+    def make_edges(self, attribute: str, start_ext_id: str, end_ext_ids: Iterable[str]) -> List[Edge]:
+        edge_type_ext_id = self.edge_type_ext_id(attribute)
+        return [
             Edge(
                 externalId=f"{start_ext_id}.{attribute}__{end_ext_id}",
                 space=self.space_id,
@@ -59,13 +71,45 @@ class RelationshipAPI:
             )
             for end_ext_id in end_ext_ids
         ]
+
+    def add(self, attribute: str, start_ext_id: str, end_ext_ids: Iterable[str]) -> None:
+        """
+        Create one or more Edge instances on a particular attribute of the `self.model_type` type of instance.
+        """
+        if (session := active_session(self.domain_model_api.domain_client)) is not None:
+            session.add_edges(self, attribute, start_ext_id, end_ext_ids)
+            return
+        end_ext_ids = list(end_ext_ids)
+        edges = self.make_edges(attribute, start_ext_id, end_ext_ids)
         self.edges_api.apply(edges)
+        if explain.is_dry_run():
+            return
+        self.domain_model_api.domain_client.clear_graph_cache()
+        if (adjacency_index := self._adjacency_index) is not None:
+            adjacency_index.add_edges(edges)
+        self._add_to_related(attribute, start_ext_id, end_ext_ids)
+
+    def _add_to_related(self, attribute: str, start_ext_id: str, end_ext_ids: List[str]) -> None:
+        """Add new related items of the start item to the cached item and the local index."""
         with self.domain_model_api.domain_client._cache_lock:
             start_item = self.domain_model_api.domain_client.cache.get(start_ext_id)
             if start_item is not None:
                 value = getattr(start_item, attribute, [])
                 value.extend([{"space": self.space_id, "externalId": end_ext_id} for end_ext_id in end_ext_ids])
                 self.domain_model_api.domain_client.cache.set(start_ext_id, start_item)
+        if (local_index := self.domain_model_api.local_index) is not None:
+            local_index.add_related(start_ext_id, attribute, end_ext_ids)
+
+    def _replace_related(self, attribute: str, start_ext_id: str, end_ext_ids: List[str]) -> None:
+        """Replace the related items of the start item on the cached item and in the local index."""
+        with self.domain_model_api.domain_client._cache_lock:
+            start_item = self.domain_model_api.domain_client.cache.get(start_ext_id)
+            if start_item is not None:
+                value = [{"space": self.space_id, "externalId": end_ext_id} for end_ext_id in end_ext_ids]
+                setattr(start_item, attribute, value)
+                self.domain_model_api.domain_client.cache.set(start_ext_id, start_item)
+        if (local_index := self.domain_model_api.local_index) is not None:
+            local_index.set_related(start_ext_id, attribute, end_ext_ids)
 
     def apply(self, attribute: str, start_ext_id: str, end_ext_ids: Iterable[str]) -> None:
         """
@@ -74,18 +118,11 @@ class RelationshipAPI:
          * delete obsolete edges
          * don't create duplicate edges (if some exist from before)
         """
-        edge_type_ext_id = f"{self.model_type.__name__}.{attribute}"
-        edges = [
-            Edge(
-                externalId=f"{start_ext_id}.{attribute}__{end_ext_id}",
-                space=self.space_id,
-                version=str(self.schema_version),
-                type=RelationReference(space=self.space_id, externalId=edge_type_ext_id),
-                startNode=RelationReference(space=self.space_id, externalId=start_ext_id),
-                endNode=RelationReference(space=self.space_id, externalId=end_ext_id),
-            )
-            for end_ext_id in end_ext_ids
-        ]
+        if (session := active_session(self.domain_model_api.domain_client)) is not None:
+            session.set_relationship(self, attribute, start_ext_id, end_ext_ids)
+            return
+        end_ext_ids = list(end_ext_ids)
+        edges = self.make_edges(attribute, start_ext_id, end_ext_ids)
 
         existing_edges = self.edges_api.list(self.view, [attribute], [start_ext_id])
         existing_end_ext_ids = [edge.endNode.externalId for edge in existing_edges]
@@ -93,8 +130,21 @@ class RelationshipAPI:
         edges_to_create = [edge for edge in edges if edge.endNode.externalId not in existing_end_ext_ids]
 
         with ThreadPoolExecutor(max_workers=2) as pool:
-            pool.submit(self.delete, edges_to_delete)
-            pool.submit(self.edges_api.apply, edges_to_create)
+            futures = [
+                self.edges_api.metrics.submit(
+                    pool, self.edges_api.delete, self.space_id, [edge.externalId for edge in edges_to_delete]
+                ),
+                self.edges_api.metrics.submit(pool, self.edges_api.apply, edges_to_create),
+            ]
+        for future in futures:
+            future.result()  # raises if the write failed
+        if explain.is_dry_run():
+            return
+        self.domain_model_api.domain_client.clear_graph_cache()
+        if (adjacency_index := self._adjacency_index) is not None:
+            adjacency_index.add_edges([*existing_edges, *edges_to_create])
+            adjacency_index.remove_edges(edges_to_delete)
+        self._replace_related(attribute, start_ext_id, end_ext_ids)
 
     def list(self, attributes: Sequence[str] = (), from_ext_ids: Sequence[str] = (), limit=1000) -> List[Edge]:
         """
@@ -113,10 +163,57 @@ class RelationshipAPI:
             limit=limit,
         )
         edges.extend(retrieved_edges)
+        if (adjacency_index := self._adjacency_index) is not None:
+            adjacency_index.add_edges(edges)
+        return edges
+
+    def list_inwards(self, attributes: Sequence[str] = (), to_ext_ids: Sequence[str] = ()) -> List[Edge]:
+        """
+        List all the edges for an attribute (or all attributes if empty) which end on any of the `to_ext_ids` nodes.
+        Nodes are queried in batches (using `endNode` "in" filters), batches are queried in parallel.
+        """
+        if len(attributes) == 0:
+            attributes = list(self.model_type.get_one_to_many_attrs())
+        _to_ext_ids = list(dict.fromkeys(to_ext_ids))
+        with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+            futures = [
+                self.edges_api.metrics.submit(pool, self.edges_api.list, self.view, attributes, None, None, batch)
+                for batch in chunked(_to_ext_ids, _FILTER_BATCH_SIZE)
+            ]
+        edges = [edge for future in futures for edge in future.result()]
+        if (adjacency_index := self._adjacency_index) is not None:
+            adjacency_index.add_edges(edges)
+            for attribute in attributes:
+                adjacency_index.mark_complete_inwards(self.edge_type_ext_id(attribute), _to_ext_ids)
         return edges
 
+    def referencing(self, attribute: str, to_ext_ids: Sequence[str], use_cache: bool = True) -> List[str]:
+        """
+        ExternalIds of nodes which refer to any of the `to_ext_ids` nodes through the `attribute` one-to-many
+        relationship. When the adjacency index is enabled, lookups that were done before are served from the index.
+        """
+        adjacency_index = self._adjacency_index
+        edge_type_ext_id = self.edge_type_ext_id(attribute)
+        if adjacency_index is None:
+            edges = self.list_inwards([attribute], to_ext_ids)
+            return list(dict.fromkeys(edge.startNode.externalId for edge in edges))
+        uncached_ext_ids = [
+            ext_id
+            for ext_id in to_ext_ids
+            if not use_cache or not adjacency_index.is_complete_inwards(edge_type_ext_id, ext_id)
+        ]
+        if uncached_ext_ids:
+            self.list_inwards([attribute], uncached_ext_ids)
+        return adjacency_index.starts(edge_type_ext_id, to_ext_ids)
+
     def delete(self, items: Iterable[Edge]) -> None:
-        self.edges_api.delete(self.space_id, list({edge.externalId for edge in items}))
+        edges = list(items)
+        self.edges_api.delete(self.space_id, list({edge.externalId for edge in edges}))
+        if explain.is_dry_run():
+            return
+        self.domain_model_api.domain_client.clear_graph_cache()
+        if (adjacency_index := self._adjacency_index) is not None:
+            adjacency_index.remove_edges(edges)
 
 
 ProxyAddRelationshipT = Callable[[str, Iterable[str]], None]
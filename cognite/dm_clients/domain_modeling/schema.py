@@ -1,17 +1,15 @@
 from __future__ import annotations
 
 import logging
-from typing import Dict, Generic, List, Optional, Type, TypeVar, Union, cast, get_args, get_type_hints
-
-import strawberry
-from strawberry.experimental.pydantic import UnregisteredTypeException
-from strawberry.schema.config import StrawberryConfig
+from typing import TYPE_CHECKING, Dict, Generic, List, Optional, Set, Type, TypeVar, Union, cast
 
+from cognite.dm_clients.domain_modeling._graphql import render_types
 from cognite.dm_clients.domain_modeling.domain_model import DomainModel
+from cognite.dm_clients.domain_modeling.read_only_model import ReadOnlyModel, make_read_only_type
 from cognite.dm_clients.misc import to_snake
 
-from ..custom_types import SCALARS
-from ..custom_types._scalars import *  # noqa
+if TYPE_CHECKING:
+    import strawberry
 
 DomainModelT = TypeVar("DomainModelT", bound=DomainModel)
 
@@ -28,14 +26,25 @@ class Schema(Generic[DomainModelT]):
         self.types_map: Dict[str, Type[DomainModelT]] = {}
         self._root_type: Optional[type] = None
         self._root_type_cls: Optional[Type[DomainModelT]] = None
-        self._processed_names: List[str] = []
+        self._processed_names: Set[str] = set()
+        self.read_only_types: Dict[Type[DomainModelT], Type[ReadOnlyModel]] = {}
 
     def _strawberry_schema(self) -> strawberry.Schema:
-        if self._root_type is None:
-            raise ValueError("define one of the schema types with @schema.register_type(root_type=True)")
-        return strawberry.Schema(query=self._root_type, config=StrawberryConfig(auto_camel_case=False))
+        """Types are registered with Strawberry only when needed, i.e. when rendering the GraphQL schema."""
+        from ._strawberry import strawberry_schema
+
+        return strawberry_schema(self)
 
     def as_str(self) -> str:
+        """
+        Render the schema as DM GraphQL. Rendered natively (see `_graphql.py`) when possible, otherwise with Strawberry.
+        """
+        types_str = render_types(self)
+        if types_str is None:
+            return self._as_str_with_strawberry()
+        return f"{AUTO_GENERATED_COMMENT}\n{types_str}"
+
+    def _as_str_with_strawberry(self) -> str:
         """
         Removing things that DM does not need:
          * `schema { query: ... }`
@@ -74,7 +83,7 @@ class Schema(Generic[DomainModelT]):
         Note: We are still using the Strawberry & Pydantic according to how it is documented in
         https://strawberry.rocks/docs/integrations/pydantic , only with parts of it being dynamic instead of explicit.
         Specifically:
-         - Strawberry type classes are dynamically generated here
+         - Strawberry type classes are dynamically generated (in `_strawberry.py`)
         """
 
         def _register_type(cls: Type[DomainModelT]) -> Type[DomainModelT]:
@@ -103,65 +112,32 @@ class Schema(Generic[DomainModelT]):
 
         return _register_type
 
-    def _do_register(self, name: str, cls: Type[DomainModelT]) -> None:
-        """Actually register a DomainModel with Strawberry."""
-
-        # this method could be called recursively, so avoid duplicate work:
-        if name in self._processed_names:
-            return
-        self._processed_names.append(name)
-
-        # all field names on our DomainModel:
-        field_names = [key for key in cls.__fields__ if key not in {"externalId"}]
-        cls_annotations = get_type_hints(cls)
-
-        # find any custom scalar fields (e.g: Timestamp, JSONObject), they need special consideration:
-        scalar_fields = {}
-        for field_name in field_names:
-            field_type = cls_annotations[field_name]
-            # find out if there is a custom scalar in this field's annotation:
-            while type_args := get_args(field_type):
-                field_type = type_args[0]
-
-            type_name = field_type.__name__
-            scalar_name = f"{type_name}Scalar"
-            # if there is, make a corresponding strawberry scalar (only once), and
-            if scalar_name in SCALARS:
-                scalar_fields[field_name] = cls.__annotations__[field_name].replace(type_name, scalar_name)
-
-        # dynamically create a strawberry type class:
-        cls_dict = {"__annotations__": {field_name: strawberry.auto for field_name in field_names}}
-        cls_dict["__annotations__"].update(scalar_fields)
-        strawberry_type = type(cls.__name__, (), cls_dict)
-
-        # pass the class to strawberry type decorator:
-        try:
-            registered_strawberry_type = strawberry.experimental.pydantic.type(model=cls)(strawberry_type)
-        except UnregisteredTypeException:
-            # Order matters when using `strawberry.experimental.pydantic.type` (unlike `strawberry.type`).
-            # It's a trap! https://github.com/strawberry-graphql/strawberry/issues/769
-            # So when types are out of order, just run one more `_close()` to work on other types, then
-            # try again when it returns. List of names in `self._processed_names` guards against duplicates.
-            self._close()
-            registered_strawberry_type = strawberry.experimental.pydantic.type(model=cls)(strawberry_type)
-
-        # keep a reference to the schema "root":
-        if self._root_type_cls == cls:
-            self._root_type = registered_strawberry_type
+    def register_read_only(self, domain_model: Type[DomainModelT]):
+        """Class decorator for (generated) read-only companions of schema types, see `ReadOnlyModel`."""
+
+        def _register_read_only(cls: Type[ReadOnlyModel]) -> Type[ReadOnlyModel]:
+            if not issubclass(cls, ReadOnlyModel):
+                raise ValueError(f"Classes used with @register_read_only must inherit from ReadOnlyModel: {cls}")
+            self.read_only_types[domain_model] = cls
+            return cls
+
+        return _register_read_only
+
+    def get_read_only_type(self, domain_model: Type[DomainModelT]) -> Type[ReadOnlyModel]:
+        """The registered read-only companion of `domain_model`, created on first use if there is none."""
+        if domain_model not in self.read_only_types:
+            self.read_only_types[domain_model] = make_read_only_type(domain_model)
+        return self.read_only_types[domain_model]
 
     def close(self):
         """
         Process all registered types.
         Call this after all DomainModel classes have been decorated with self.register_type.
+        Registration with Strawberry is deferred until the GraphQL schema is rendered, see `as_str()`.
         """
         self._update_forward_refs()
-        self._close()
 
     def _update_forward_refs(self):
         """Resolve pydantic forward references."""
         for klass in self.types_map.values():
             klass.update_forward_refs()
-
-    def _close(self):
-        for name, cls in self.types_map.items():
-            self._do_register(name, cls)
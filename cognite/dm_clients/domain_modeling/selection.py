@@ -0,0 +1,141 @@
+"""
+Typed builders of GraphQL queries, and hydration of their results into DomainModel items.
+
+`dm topython` generates a `...Selection` class per type, e.g. `MovieSelection`, with the scalar fields to select as
+arguments, and a method per relationship to select fields of related items:
+
+    movies = client.graph(MovieSelection("title", "release").director(PersonSelection("name")), limit=100)
+
+See `DomainClient.graph()`.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Generic, Iterator, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import ValidationError
+from typing_extensions import Self
+
+from .domain_model import DomainModel
+
+__all__ = [
+    "Selection",
+]
+
+DomainModelT = TypeVar("DomainModelT", bound=DomainModel)
+
+
+class Selection(Generic[DomainModelT]):
+    """
+    Fields of `domain_model` (set on subclasses) to select in a GraphQL query. The `externalId` is always selected.
+    Without any `fields`, all scalar fields are selected. Relationships are selected with `_select()`, which generated
+    subclasses call from a method per relationship.
+    """
+
+    domain_model: Type[DomainModelT]
+
+    def __init__(self, *fields: str):
+        scalar_fields = self._scalar_fields()
+        if unknown := [field for field in fields if field not in scalar_fields]:
+            raise ValueError(f"{self.domain_model.__name__} has no scalar field(s) {', '.join(unknown)}")
+        self._fields: List[str] = list(fields) or scalar_fields
+        # attribute -> (selection of the related type, number of items for one-to-many relationships)
+        self._relations: Dict[str, Tuple[Selection, Optional[int]]] = {}
+
+    @classmethod
+    def _scalar_fields(cls) -> List[str]:
+        relations = {*cls.domain_model.get_one_to_one_attrs(), *cls.domain_model.get_one_to_many_attrs()}
+        return [field for field in cls.domain_model.__fields__ if field != "externalId" and field not in relations]
+
+    def _select(self, attr: str, selection: Optional[Selection] = None, first: Optional[int] = None) -> Self:
+        """Select the related item(s) of `attr`, with the fields in `selection` (by default, all scalar fields)."""
+        related_type = self.domain_model.get_type_for_attr(attr)
+        if selection is None:
+            selection = type("Selection", (Selection,), {"domain_model": related_type})()
+        elif selection.domain_model is not related_type:
+            raise ValueError(f"{self.domain_model.__name__}.{attr} refers to {related_type.__name__}")
+        self._relations[attr] = (selection, first)
+        return self
+
+    @property
+    def query_name(self) -> str:
+        return f"list{self.domain_model.__name__}"
+
+    @property
+    def is_complete(self) -> bool:
+        """All fields of this type are selected (the fields of related items might not be)."""
+        relations = {*self.domain_model.get_one_to_one_attrs(), *self.domain_model.get_one_to_many_attrs()}
+        return set(self._fields) == set(self._scalar_fields()) and set(self._relations) == relations
+
+    def is_complete_item(self, item: DomainModelT) -> bool:
+        """`is_complete`, and none of the one-to-many relationships of `item` were cut short by `first`."""
+        return self.is_complete and all(
+            first is None or len(getattr(item, attr, None) or []) < first
+            for attr, (_, first) in self._relations.items()
+        )
+
+    def selection_set(self, indent: int = 0) -> str:
+        """This selection in GraphQL syntax (between braces)."""
+        pad = "  " * (indent + 1)
+        o2m_attrs = self.domain_model.get_one_to_many_attrs()
+        lines = [f"{pad}externalId", *(f"{pad}{field}" for field in self._fields)]
+        for attr, (selection, first) in self._relations.items():
+            if attr in o2m_attrs:
+                arguments = f"(first: {first})" if first is not None else ""
+                lines.append(f"{pad}{attr}{arguments} {{\n{pad}  items {selection.selection_set(indent + 2)}\n{pad}}}")
+            else:
+                lines.append(f"{pad}{attr} {selection.selection_set(indent + 1)}")
+        return "{\n" + "\n".join(lines) + "\n" + "  " * indent + "}"
+
+    def list_query(self, limit: Optional[int] = None, paginate: bool = False) -> str:
+        """
+        GraphQL query listing (up to `limit`) items of this type, with the selected fields.
+        With `paginate`, the query takes an `$after` cursor and selects `pageInfo`, to follow the cursor to the next
+        page.
+        """
+        arguments = [f"first: {limit}"] if limit is not None else []
+        page_info = ""
+        if paginate:
+            arguments.append("after: $after")
+            page_info = "\n    pageInfo {\n      hasNextPage\n      endCursor\n    }"
+        query_arguments = f"({', '.join(arguments)})" if arguments else ""
+        return (
+            f"query{' ($after: String)' if paginate else ''} {{\n"
+            f"  {self.query_name}{query_arguments} {{\n    items {self.selection_set(2)}{page_info}\n  }}\n}}"
+        )
+
+    def hydrate(self, data: Dict[str, Any]) -> DomainModelT:
+        """
+        Make an item from its GraphQL result. Fields which are not selected are left at their defaults (None if
+        required), then the item is created without validating all the fields (only the selected scalar fields are
+        validated, one by one).
+        """
+        model = self.domain_model
+        o2m_attrs = model.get_one_to_many_attrs()
+        values: Dict[str, Any] = {field: data[field] for field in self._fields if field in data}
+        for attr, (selection, _) in self._relations.items():
+            related = data.get(attr)
+            if attr in o2m_attrs:
+                values[attr] = [selection.hydrate(item) for item in (related or {}).get("items", [])]
+            else:
+                values[attr] = None if related is None else selection.hydrate(related)
+
+        from_node_properties = getattr(model, "from_node_properties", None)
+        if from_node_properties is not None and self.is_complete:
+            return from_node_properties(data["externalId"], values)
+        for field in self._fields:
+            if field in values:
+                values[field], errors = model.__fields__[field].validate(values[field], values, loc=field, cls=model)
+                if errors:
+                    raise ValidationError([errors], model)
+        # required fields which are not selected are None:
+        unselected = {name: field.get_default() for name, field in model.__fields__.items() if name not in values}
+        return model.construct(**{**unselected, **values, "externalId": data["externalId"]})
+
+    def walk(self, item: DomainModelT) -> Iterator[Tuple[Selection, DomainModel]]:
+        """All (selection, item) pairs of a hydrated `item` and its (selected) related items."""
+        yield self, item
+        for attr, (selection, _) in self._relations.items():
+            related = getattr(item, attr, None)
+            for related_item in related if isinstance(related, list) else [related]:
+                if related_item is not None:
+                    yield from selection.walk(related_item)
@@ -0,0 +1,229 @@
+"""
+Unit of work: collect the writes made through a `DomainClient` inside the context, and send them when it exits, as a
+small number of chunked requests:
+
+    with my_client.session():
+        my_client.movie.apply(movies)
+        my_client.person.apply(persons)
+        my_client.movie.connect.actors("movie1", ["person1", "person2"])
+        my_client.person.delete_by_ids(["person3"])
+
+Node upserts (also nested items) of all types, edge additions (`connect`, `relationships.add`), relationship
+replacements (one-to-many attributes of applied items) and deletes are recorded in the current context (thread or task)
+and deduplicated: the last write of a node wins, a delete drops earlier writes of the node and of its edges, a write
+after a delete drops the delete. When the context exits, the writes are flushed in order:
+  1. deletes, in one cascade of `DomainModelAPI.delete_by_ids` per type,
+  2. nodes of all types, in mixed-view requests of up to `chunk_size` nodes, in parallel,
+  3. edges: the existing edges of replaced relationships are listed in batches, obsolete ones are deleted, and only
+     missing edges are created, in parallel chunks.
+Then the cache, indexes and graph cache are updated as after the individual calls. If the context exits with an
+exception, nothing is sent. Reads inside the context do not see the pending writes.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from functools import partial
+from itertools import chain
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from cognite.dm_clients import explain
+from cognite.dm_clients.cdf.data_classes_dm_v3 import Edge, Node
+from cognite.dm_clients.config import settings
+from cognite.dm_clients.misc import chunked
+
+from .bulk import write_chunks
+from .domain_model import DomainModel
+
+if TYPE_CHECKING:
+    from .domain_client import DomainClient
+    from .domain_model_api import DomainModelAPI
+    from .relationship_api import RelationshipAPI
+
+__all__ = [
+    "Session",
+    "active_session",
+]
+
+_FILTER_BATCH_SIZE = int(settings.get("dm_clients.filter_batch_size", 100))
+_MAX_WORKERS = settings.get("dm_clients.max_workers")  # None = default of ThreadPoolExecutor
+
+_EdgeKeyT = Tuple[str, str]  # edge type, start externalId
+
+_session: ContextVar[Optional[Session]] = ContextVar("dm_session", default=None)
+
+
+def active_session(domain_client: DomainClient) -> Optional[Session]:
+    """The session of `domain_client` in the current context, if any. Writes are recorded in it instead of sent."""
+    session = _session.get()
+    return session if session is not None and session.domain_client is domain_client else None
+
+
+class Session:
+    """Pending writes of a unit of work, see the module docstring. Use it through `DomainClient.session()`."""
+
+    def __init__(self, domain_client: DomainClient, chunk_size: int = 1000):
+        self.domain_client = domain_client
+        self.chunk_size = chunk_size
+        self._lock = Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self._nodes: Dict[str, Tuple[DomainModelAPI, DomainModel, Node]] = {}
+        # one-to-many relationships set by applied items, edge type and start -> end externalIds:
+        self._relationships: Dict[_EdgeKeyT, Tuple[RelationshipAPI, str, List[str]]] = {}
+        # edges added to relationships which are not replaced, edge type and start -> end externalIds:
+        self._added: Dict[_EdgeKeyT, Tuple[RelationshipAPI, str, List[str]]] = {}
+        self._deleted: Dict[str, Tuple[DomainModelAPI, bool]] = {}
+
+    def __enter__(self) -> Session:
+        if _session.get() is not None:
+            raise RuntimeError("Sessions cannot be nested.")
+        self._token = _session.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        _session.reset(self._token)
+        if exc_type is None:
+            self.flush()
+        else:
+            with self._lock:
+                self._clear()
+
+    @property
+    def pending(self) -> Dict[str, int]:
+        """Numbers of pending writes."""
+        with self._lock:
+            return {
+                "nodes": len(self._nodes),
+                "relationships": len(self._relationships),
+                "edges": sum(len(end_ext_ids) for _, _, end_ext_ids in self._added.values()),
+                "deletes": len(self._deleted),
+            }
+
+    def add_nodes(self, api: DomainModelAPI, items: Iterable[DomainModel], nodes: Iterable[Node]) -> None:
+        with self._lock:
+            for item, node in zip(items, nodes):
+                self._deleted.pop(node.externalId, None)
+                self._nodes[node.externalId] = (api, item, node)
+
+    def set_relationship(
+        self, relationships: RelationshipAPI, attribute: str, start_ext_id: str, end_ext_ids: Iterable[str]
+    ) -> None:
+        key = (relationships.edge_type_ext_id(attribute), start_ext_id)
+        with self._lock:
+            self._added.pop(key, None)  # replaced
+            self._relationships[key] = (relationships, attribute, list(dict.fromkeys(end_ext_ids)))
+
+    def add_edges(
+        self, relationships: RelationshipAPI, attribute: str, start_ext_id: str, end_ext_ids: Iterable[str]
+    ) -> None:
+        key = (relationships.edge_type_ext_id(attribute), start_ext_id)
+        with self._lock:
+            pending = self._relationships.get(key) or self._added.setdefault(key, (relationships, attribute, []))
+            pending[2].extend(end_ext_id for end_ext_id in end_ext_ids if end_ext_id not in pending[2])
+
+    def delete(self, api: DomainModelAPI, external_ids: Iterable[str], cascade: bool) -> None:
+        _ext_ids = set(external_ids)
+        with self._lock:
+            for ext_id in _ext_ids:
+                self._nodes.pop(ext_id, None)
+                previous_cascade = self._deleted.get(ext_id, (api, False))[1]
+                self._deleted[ext_id] = (api, cascade or previous_cascade)
+            # edges that start on deleted nodes are deleted too:
+            for pending in (self._relationships, self._added):
+                for key in [key for key in pending if key[1] in _ext_ids]:
+                    del pending[key]
+
+    def flush(self) -> None:
+        """Send the pending writes, see the module docstring. Called when the context exits."""
+        token = _session.set(None)  # the writes of the flush are sent
+        try:
+            with self._lock:
+                nodes, relationships, added, deleted = self._nodes, self._relationships, self._added, self._deleted
+                self._clear()
+            with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+                self._flush_deletes(deleted)
+                self._flush_nodes(pool, nodes)
+                self._flush_edges(pool, relationships, added)
+            self.domain_client.clear_graph_cache()
+        finally:
+            _session.reset(token)
+
+    def _flush_deletes(self, deleted: Dict[str, Tuple[DomainModelAPI, bool]]) -> None:
+        by_api: Dict[Tuple[DomainModelAPI, bool], List[str]] = defaultdict(list)
+        for ext_id, api_cascade in deleted.items():
+            by_api[api_cascade].append(ext_id)
+        for (api, cascade), ext_ids in by_api.items():
+            api.delete_by_ids(ext_ids, cascade=cascade, chunk_size=self.chunk_size)
+
+    def _flush_nodes(
+        self, pool: ThreadPoolExecutor, nodes: Dict[str, Tuple[DomainModelAPI, DomainModel, Node]]
+    ) -> None:
+        if not nodes:
+            return
+        nodes_api = self.domain_client._client.nodes
+        view_nodes = [(api.view, node) for api, _, node in nodes.values()]
+        write_chunks(pool, nodes_api.apply_many, view_nodes, self.chunk_size)
+        if explain.is_dry_run():
+            return  # nothing was written, so nothing to cache
+        items_by_api: Dict[DomainModelAPI, List[DomainModel]] = defaultdict(list)
+        for api, item, _ in nodes.values():
+            items_by_api[api].append(item)
+        for api, items in items_by_api.items():
+            api._cache_created_items(items)
+            if api.local_index is not None:
+                api.local_index.add(items)
+
+    def _flush_edges(
+        self,
+        pool: ThreadPoolExecutor,
+        relationships: Dict[_EdgeKeyT, Tuple[RelationshipAPI, str, List[str]]],
+        added: Dict[_EdgeKeyT, Tuple[RelationshipAPI, str, List[str]]],
+    ) -> None:
+        # existing edges of the replaced relationships, in batches of start nodes per attribute:
+        starts: Dict[Tuple[RelationshipAPI, str], List[str]] = defaultdict(list)
+        for (_, start_ext_id), (relationships_api, attribute, _) in relationships.items():
+            starts[(relationships_api, attribute)].append(start_ext_id)
+        lookups = [
+            self.domain_client.metrics.submit(
+                pool, relationships_api.edges_api.list, relationships_api.view, [attribute], batch, limit=None
+            )
+            for (relationships_api, attribute), start_ext_ids in starts.items()
+            for batch in chunked(start_ext_ids, _FILTER_BATCH_SIZE)
+        ]
+        existing = [edge for future in lookups for edge in future.result()]
+        existing_keys = {
+            (edge.type.externalId, edge.startNode.externalId, edge.endNode.externalId) for edge in existing
+        }
+        obsolete = [
+            edge
+            for edge in existing
+            if edge.endNode.externalId not in relationships[(edge.type.externalId, edge.startNode.externalId)][2]
+        ]
+
+        to_create: List[Edge] = []
+        for (edge_type, start_ext_id), (relationships_api, attribute, end_ext_ids) in chain(
+            relationships.items(), added.items()
+        ):
+            new_end_ext_ids = [
+                end_ext_id for end_ext_id in end_ext_ids if (edge_type, start_ext_id, end_ext_id) not in existing_keys
+            ]
+            to_create.extend(relationships_api.make_edges(attribute, start_ext_id, new_end_ext_ids))
+        if not obsolete and not to_create:
+            return
+        edges_api = self.domain_client._client.edges
+        delete_edges = partial(edges_api.delete, self.domain_client.space_id)
+        write_chunks(pool, delete_edges, [edge.externalId for edge in obsolete], self.chunk_size)
+        write_chunks(pool, edges_api.apply, to_create, self.chunk_size)
+        if explain.is_dry_run():
+            return
+        if (adjacency_index := self.domain_client.adjacency_index) is not None:
+            adjacency_index.add_edges([*existing, *to_create])
+            adjacency_index.remove_edges(obsolete)
+        for (_, start_ext_id), (relationships_api, attribute, end_ext_ids) in relationships.items():
+            relationships_api._replace_related(attribute, start_ext_id, end_ext_ids)
+        for (_, start_ext_id), (relationships_api, attribute, end_ext_ids) in added.items():
+            relationships_api._add_to_related(attribute, start_ext_id, end_ext_ids)
@@ -1,6 +1,6 @@
 from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Any, Literal, Type
+from typing import Any, Literal, Optional, Type, Union
 from unittest.mock import MagicMock
 from urllib.parse import urlparse
 
@@ -11,9 +11,12 @@ from cognite.client.testing import monkeypatch_cognite_client
 from pydantic import BaseModel, Field
 from requests.models import Response
 
+from cognite.dm_clients.cdf.client_dm_v3 import CogniteClientDmV3, ContainersAPI, EdgesAPI, NodesAPI, ViewsAPI
+from cognite.dm_clients.cdf.client_registry import client_registry
 from cognite.dm_clients.cdf.data_classes_dm_v3 import View
 from cognite.dm_clients.domain_modeling import DomainClient, DomainModelAPI, Schema
 from cognite.dm_clients.domain_modeling.schema import DomainModelT
+from cognite.dm_clients.metrics import Metrics
 from cognite.dm_clients.misc import to_camel
 
 
@@ -48,7 +51,7 @@ class ApplyResponse(BaseModel):
 def create_test_client_factory(
     ClientClass: Type[DomainClient],  # noqa: N803
     cine_schema: Schema[DomainModelT],
-    return_jsons: list[list[dict[str, Any]]] = None,
+    return_jsons: list[Union[list[dict[str, Any]], dict[str, Any]]] = None,
 ) -> Type[DomainClient]:
     return_jsons = return_jsons or []
     with monkeypatch_cognite_client() as client:
@@ -56,6 +59,7 @@ def create_test_client_factory(
             client_name=Config.client_name, project=Config.project, credentials=MagicMock(spec_set=CredentialProvider)
         )
         client._config = config
+        client.metrics = Metrics()
 
         def _mock_get(url: str, params: dict[str, Any] = None, headers: dict[str, Any] = None) -> Response:
             url = urlparse(url)
@@ -63,31 +67,42 @@ def create_test_client_factory(
             response.status_code = 200
 
             if url.path == f"{Config.base_url}/views":
-                return_value = []
-                for _, class_ in cine_schema.types_map.items():
-                    view = View(
-                        space=Config.space,
-                        externalId=class_.__name__,
-                        version=str(Config.version),
-                        name=class_.__name__,
-                        properties={},
-                    )
-                    return_value.append(view.dict())
-                response.json.return_value = {"items": return_value}
+                response.json.return_value = {"items": _views()}
 
             return response
 
+        def _views(external_ids: Optional[set[str]] = None) -> list[dict[str, Any]]:
+            return [
+                View(
+                    space=Config.space,
+                    externalId=class_.__name__,
+                    version=str(Config.version),
+                    name=class_.__name__,
+                    properties={},
+                ).dict()
+                for class_ in cine_schema.types_map.values()
+                if external_ids is None or class_.__name__ in external_ids
+            ]
+
         def mock_post(
             url: str, json: dict[str, Any], params: dict[str, Any] = None, headers: dict[str, Any] = None
         ) -> Response:
             response = MagicMock(spec=Response)
             response.status_code = 200
-            if return_jsons:
-                response.json.return_value = {"items": return_jsons.pop(0)}
+            if urlparse(url).path == f"{Config.base_url}/views/byids":
+                response.json.return_value = {"items": _views({item["externalId"] for item in json["items"]})}
+            elif return_jsons:
+                # a list of items, or an entire response (e.g. with "nextCursor"):
+                return_json = return_jsons.pop(0)
+                response.json.return_value = return_json if isinstance(return_json, dict) else {"items": return_json}
             return response
 
         client.get = _mock_get
         client.post = mock_post
+        client.containers = ContainersAPI(config, api_version=CogniteClientDmV3._API_VERSION, cognite_client=client)
+        client.views = ViewsAPI(config, api_version=CogniteClientDmV3._API_VERSION, cognite_client=client)
+        client.nodes = NodesAPI(config, api_version=CogniteClientDmV3._API_VERSION, cognite_client=client)
+        client.edges = EdgesAPI(config, api_version=CogniteClientDmV3._API_VERSION, cognite_client=client)
 
         dm_client = ClientClass(
             schema=cine_schema,
@@ -99,4 +114,7 @@ def create_test_client_factory(
             schema_version=Config.version,
         )
         dm_client.cognite_client = client
-        yield dm_client
+        try:
+            yield dm_client
+        finally:
+            client_registry.discard(config)
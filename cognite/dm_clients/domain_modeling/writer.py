@@ -0,0 +1,175 @@
+"""
+Write-behind: items are queued by `WriteBehindWriter.apply()` (from any thread) and written on a background thread, in
+batches, see `DomainClient.write_behind()`. For streaming consumers which apply an item or a few per event:
+
+    with my_client.write_behind(max_latency=0.5, on_error=report) as writer:
+        for event in events:
+            writer.apply([to_item(event)])
+
+Pending items are coalesced by type and externalId (the last write of an item wins). A batch of all the pending items is
+written when `max_batch` items are pending, when the oldest pending item has waited `max_latency` seconds, or on
+`flush()` and `close()`. Each batch is written in a `session`, i.e. nodes of all types in mixed-type chunked requests.
+When `max_pending` items are pending, `apply()` blocks until a batch is taken (backpressure). Failed batches are passed
+to `on_error` (or logged), the writer continues with the next batch.
+"""
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from threading import Condition, Thread
+from time import monotonic
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from .bulk import Progress
+from .domain_model import DomainModel
+
+if TYPE_CHECKING:
+    from .domain_client import DomainClient
+
+__all__ = [
+    "WriteBehindWriter",
+    "WriteErrorCallback",
+]
+
+logger = logging.getLogger(__name__)
+
+# (items of the failed batch, exception):
+WriteErrorCallback = Callable[[List[DomainModel], BaseException], None]
+
+
+class WriteBehindWriter:
+    """Queue of items written on a background thread, see the module docstring."""
+
+    def __init__(
+        self,
+        domain_client: DomainClient,
+        max_batch: int = 1000,
+        max_latency: float = 1.0,
+        max_pending: int = 10_000,
+        on_error: Optional[WriteErrorCallback] = None,
+    ):
+        self.domain_client = domain_client
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.max_pending = max(max_pending, max_batch)
+        self.on_error = on_error
+        self.progress = Progress()
+        self._pending: Dict[Tuple[Type[DomainModel], str], DomainModel] = {}
+        self._oldest_pending: Optional[float] = None
+        self._batches_taken = 0
+        self._batches_done = 0
+        self._flush_requested = False
+        self._closed = False
+        self._condition = Condition()
+        self._thread = Thread(target=self._run, name="dm-write-behind", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> WriteBehindWriter:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @property
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def apply(self, items: Iterable[DomainModel], timeout: Optional[float] = None) -> None:
+        """
+        Queue items to be written. Blocks while `max_pending` items are pending, raises `TimeoutError` if there is
+        still no room after `timeout` seconds. Items without an externalId get one, like in `DomainModelAPI.apply`.
+        """
+        items = list(items)
+        if ref_items := [item for item in items if item._reference]:
+            raise ValueError(
+                f"References passed into {type(self).__name__}.apply(): {[i.externalId for i in ref_items]}"
+            )
+        for item in items:
+            if not item.externalId:
+                self.domain_client.get_api_for_item(item)._prepare_items([item])
+        with self._condition:
+            for item in items:
+                key = (type(item), item.externalId)
+                if key not in self._pending:
+                    has_room = self._condition.wait_for(
+                        lambda: len(self._pending) < self.max_pending or self._closed, timeout
+                    )
+                    if not has_room:
+                        raise TimeoutError(f"No room in the write-behind queue after {timeout} seconds.")
+                if self._closed:
+                    raise RuntimeError("The writer is closed.")
+                self._pending[key] = item
+                if self._oldest_pending is None:
+                    self._oldest_pending = monotonic()
+            self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Write the pending items now, and wait until all the items queued before the call are written."""
+        with self._condition:
+            target = self._batches_taken + (1 if self._pending else 0)
+            self._flush_requested = True
+            self._condition.notify_all()
+            if not self._condition.wait_for(lambda: self._batches_done >= target, timeout):
+                raise TimeoutError(f"Pending items were not written in {timeout} seconds.")
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Write the pending items and stop the background thread. Further `apply()` calls raise `RuntimeError`."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while (batch := self._take_batch()) is not None:
+            self._write(batch)
+            with self._condition:
+                self._batches_done += 1
+                self._condition.notify_all()
+
+    def _take_batch(self) -> Optional[List[DomainModel]]:
+        """Wait until a batch is due, and take all the pending items. None when the writer is closed and drained."""
+        with self._condition:
+            while True:
+                if self._pending:
+                    waited = monotonic() - (self._oldest_pending or 0.0)
+                    if (
+                        len(self._pending) >= self.max_batch
+                        or waited >= self.max_latency
+                        or self._flush_requested
+                        or self._closed
+                    ):
+                        break
+                    self._condition.wait(self.max_latency - waited)
+                elif self._closed:
+                    return None
+                else:
+                    self._flush_requested = False
+                    self._condition.wait()
+            batch = list(self._pending.values())
+            self._pending = {}
+            self._oldest_pending = None
+            self._flush_requested = False
+            self._batches_taken += 1
+            self._condition.notify_all()  # room for blocked `apply()` calls
+            return batch
+
+    def _write(self, batch: List[DomainModel]) -> None:
+        by_type: Dict[Type[DomainModel], List[DomainModel]] = defaultdict(list)
+        for item in batch:
+            by_type[type(item)].append(item)
+        try:
+            with self.domain_client.session():
+                for domain_model, items in by_type.items():
+                    self.domain_client.get_api_for_domain_model(domain_model).apply(items)
+        except Exception as exc:
+            self.progress.add("items failed", len(batch))
+            if self.on_error is None:
+                logger.exception(f"Writing a batch of {len(batch)} items failed.")
+                return
+            try:
+                self.on_error(batch, exc)
+            except Exception:
+                logger.exception("The on_error callback of the write-behind writer failed.")
+        else:
+            self.progress.add("items written", len(batch))
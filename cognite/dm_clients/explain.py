@@ -0,0 +1,176 @@
+"""
+"Explain" mode: record the tree of API calls made by a single operation, e.g. one `DomainModelAPI.apply()` call, which
+recursively applies related items and their edges.
+
+    with my_client.explain(dry_run=True) as report:
+        my_client.movie.apply(movies)
+    print(report)
+
+In dry-run mode, requests which would write to DM (apply, delete) are recorded but not sent. Reads are still made,
+since later steps of an operation can depend on them.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from threading import Lock
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional
+
+__all__ = [
+    "ExplainNode",
+    "ExplainReport",
+    "explain",
+]
+
+logger = logging.getLogger(__name__)
+
+_READ_ENDPOINT_SUFFIXES = ("/list", "/byids", "/graphql")
+
+
+@dataclass
+class ExplainNode:
+    """
+    A single recorded call: either an "operation" (a `DomainModelAPI` method) or a "request" (a single HTTP request).
+    For operations, `items` is the number of items passed in or returned, for requests it is the number of items in
+    the request payload (or in the response, for reads).
+    """
+
+    name: str
+    kind: str
+    depth: int
+    items: int = 0
+    payload_bytes: int = 0
+    seconds: float = 0.0
+    skipped: bool = False
+    children: List[ExplainNode] = field(default_factory=list)
+
+    def walk(self) -> Iterator[ExplainNode]:
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    @property
+    def request_count(self) -> int:
+        """Number of HTTP requests made (or planned) by this call, including nested calls."""
+        return sum(1 for node in self.walk() if node.kind == "request")
+
+
+class ExplainReport:
+    """Tree of recorded calls. `str(report)` renders the tree, `by_endpoint()` summarizes the requests."""
+
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+        self.root = ExplainNode("explain", "root", depth=0)
+        self._lock = Lock()
+
+    @property
+    def requests(self) -> List[ExplainNode]:
+        return [node for node in self.root.walk() if node.kind == "request"]
+
+    @property
+    def max_depth(self) -> int:
+        return max(node.depth for node in self.root.walk())
+
+    def by_endpoint(self) -> Dict[str, Dict[str, Any]]:
+        """Number of calls, total and maximal items (i.e. the largest batch) and total payload bytes per endpoint."""
+        summary: Dict[str, Dict[str, Any]] = {}
+        for node in self.requests:
+            endpoint = summary.setdefault(node.name, {"calls": 0, "items": 0, "max_items": 0, "payload_bytes": 0})
+            endpoint["calls"] += 1
+            endpoint["items"] += node.items
+            endpoint["max_items"] = max(endpoint["max_items"], node.items)
+            endpoint["payload_bytes"] += node.payload_bytes
+        return summary
+
+    def hot_spots(self, limit: int = 5) -> List[ExplainNode]:
+        """Operations with the most requests, nested requests included."""
+        operations = [node for node in self.root.walk() if node.kind == "operation"]
+        return sorted(operations, key=lambda node: node.request_count, reverse=True)[:limit]
+
+    def _add(self, parent: ExplainNode, node: ExplainNode) -> None:
+        with self._lock:
+            parent.children.append(node)
+
+    def __str__(self) -> str:
+        lines = [f"{len(self.requests)} request(s){' (dry run)' if self.dry_run else ''}:"]
+        for node in self.root.walk():
+            if node is self.root:
+                continue
+            details = f"items={node.items} bytes={node.payload_bytes} {node.seconds:.3f}s"
+            if node.kind == "operation":
+                details = f"requests={node.request_count} {details}"
+            skipped = " [not sent]" if node.skipped else ""
+            lines.append(f"{'  ' * node.depth}{node.name} {details}{skipped}")
+        return "\n".join(lines)
+
+
+_report: ContextVar[Optional[ExplainReport]] = ContextVar("explain_report", default=None)
+_parent: ContextVar[Optional[ExplainNode]] = ContextVar("explain_parent", default=None)
+
+
+@contextmanager
+def explain(dry_run: bool = False) -> Iterator[ExplainReport]:
+    """Record all the calls made inside the context, see the module docstring."""
+    report = ExplainReport(dry_run=dry_run)
+    report_token = _report.set(report)
+    parent_token = _parent.set(report.root)
+    start = perf_counter()
+    try:
+        yield report
+    finally:
+        report.root.seconds = perf_counter() - start
+        _parent.reset(parent_token)
+        _report.reset(report_token)
+
+
+def is_active() -> bool:
+    return _report.get() is not None
+
+
+def is_dry_run() -> bool:
+    return (report := _report.get()) is not None and report.dry_run
+
+
+@contextmanager
+def operation(name: str, items: int = 0) -> Iterator[Optional[ExplainNode]]:
+    """Record a nested operation, if explain mode is active."""
+    report, parent = _report.get(), _parent.get()
+    if report is None or parent is None:
+        yield None
+        return
+    node = ExplainNode(name, "operation", depth=parent.depth + 1, items=items)
+    report._add(parent, node)
+    token = _parent.set(node)
+    start = perf_counter()
+    try:
+        yield node
+    finally:
+        node.seconds = perf_counter() - start
+        _parent.reset(token)
+
+
+def should_send(method: str, endpoint: str) -> bool:
+    """In dry-run mode, only reads are sent to the API."""
+    return not is_dry_run() or method == "GET" or endpoint.endswith(_READ_ENDPOINT_SUFFIXES)
+
+
+def record_request(method: str, endpoint: str, data: Dict[str, Any], result: Any, seconds: float, sent: bool) -> None:
+    """Record a single request, if explain mode is active."""
+    report, parent = _report.get(), _parent.get()
+    if report is None or parent is None:
+        return
+    items = len(data.get("items", [])) or (len(result.get("items", [])) if isinstance(result, dict) else 0)
+    node = ExplainNode(
+        f"{method} {endpoint}",
+        "request",
+        depth=parent.depth + 1,
+        items=items,
+        payload_bytes=len(json.dumps(data, default=str)),
+        seconds=seconds,
+        skipped=not sent,
+    )
+    report._add(parent, node)
@@ -0,0 +1,309 @@
+"""
+Opt-in instrumentation of DM API usage: request counts, latencies, payload sizes, retries, cache hits and thread pool
+queue depth.
+
+Metrics are disabled by default, and when disabled, instrumented code only checks the `Metrics.enabled` flag.
+Enable with `metrics_enabled = true` in the `[dm_clients]` section of `settings.toml`, or at runtime with
+`my_domain_client.metrics.enable()`.
+Metrics are kept per `CogniteClientDmV3`, which is shared by all the domain clients created with the same
+`ClientConfig` (see `cognite.dm_clients.cdf.client_registry`), so they are collected (and enabled) for all of them.
+"""
+from __future__ import annotations
+
+import abc
+import logging
+from bisect import bisect_left
+from concurrent.futures import Executor, Future
+from contextvars import copy_context
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from cognite.dm_clients import explain
+from cognite.dm_clients.config import settings
+
+try:
+    from opentelemetry import metrics as otel_metrics
+except ImportError:
+    _has_opentelemetry = False
+    otel_metrics = None
+else:
+    _has_opentelemetry = True
+
+__all__ = [
+    "Histogram",
+    "Metrics",
+    "MetricsExporter",
+    "OpenTelemetryExporter",
+    "timed_operation",
+]
+
+logger = logging.getLogger(__name__)
+
+_METRICS_ENABLED = bool(settings.get("dm_clients.metrics_enabled", False))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7)
+ITEMS_BUCKETS = (1, 10, 100, 1000, 10000)
+
+_LabelsT = Tuple[Tuple[str, str], ...]
+_FuncT = TypeVar("_FuncT", bound=Callable[..., Any])
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket upper bounds (like Prometheus histograms)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is the +Inf bucket
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def as_dict(self) -> Dict[str, Any]:
+        cumulative: Dict[str, int] = {}
+        total = 0
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            total += count
+            cumulative[bound] = total
+        return {"count": self.count, "sum": self.sum, "buckets": cumulative}
+
+
+class MetricsExporter(abc.ABC):
+    """
+    Base class for pluggable exporters, see `Metrics.add_exporter()`.
+    Exporters are notified of every single measurement: `name` is the metric name (e.g. "request_latency_seconds"),
+    `labels` describe what was measured (e.g. endpoint and HTTP method).
+    """
+
+    @abc.abstractmethod
+    def record(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        ...
+
+
+class OpenTelemetryExporter(MetricsExporter):
+    """
+    Forward measurements to OpenTelemetry instruments: counters for counts, histograms for everything else.
+    Requires `opentelemetry-api`, the SDK and exporters are configured by the application as usual.
+    """
+
+    _HISTOGRAM_SUFFIXES = ("_seconds", "_bytes", "_items", "_depth")
+
+    def __init__(self, meter: Any = None, prefix: str = "dm_clients"):
+        if not _has_opentelemetry:
+            raise ImportError(
+                "opentelemetry-api is required for this feature, install with `pip install opentelemetry-api`"
+            )
+        self.meter = meter or otel_metrics.get_meter("cognite.dm_clients")
+        self.prefix = prefix
+        self._instruments: Dict[str, Any] = {}
+        self._lock = Lock()
+
+    def _instrument(self, name: str) -> Any:
+        with self._lock:
+            if name not in self._instruments:
+                full_name = f"{self.prefix}_{name}"
+                if name.endswith(self._HISTOGRAM_SUFFIXES):
+                    self._instruments[name] = self.meter.create_histogram(full_name)
+                else:
+                    self._instruments[name] = self.meter.create_counter(full_name)
+            return self._instruments[name]
+
+    def record(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        instrument = self._instrument(name)
+        if name.endswith(self._HISTOGRAM_SUFFIXES):
+            instrument.record(value, attributes=labels)
+        else:
+            instrument.add(value, attributes=labels)
+
+
+class Metrics:
+    """
+    Thread-safe collection of measurements, aggregated per endpoint (for HTTP requests) and per operation (for
+    `DomainModelAPI` methods). See `snapshot()` for the collected data and `prometheus_text()` for a text exposition.
+    """
+
+    def __init__(self, enabled: bool = _METRICS_ENABLED):
+        self.enabled = enabled
+        self._lock = Lock()
+        self._exporters: List[MetricsExporter] = []
+        self.reset()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def add_exporter(self, exporter: MetricsExporter) -> None:
+        self._exporters.append(exporter)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters: Dict[Tuple[str, _LabelsT], float] = {}
+            self._histograms: Dict[Tuple[str, _LabelsT], Histogram] = {}
+            self._queue_depth = 0
+            self._max_queue_depth = 0
+
+    def record_request(
+        self,
+        method: str,
+        endpoint: str,
+        seconds: float,
+        request_bytes: int,
+        response_bytes: int,
+        items: int,
+    ) -> None:
+        labels = {"method": method, "endpoint": endpoint}
+        self._count("requests", labels)
+        self._observe("request_latency_seconds", seconds, labels, LATENCY_BUCKETS)
+        self._observe("request_bytes", request_bytes, labels, BYTES_BUCKETS)
+        self._observe("response_bytes", response_bytes, labels, BYTES_BUCKETS)
+        self._observe("request_items", items, labels, ITEMS_BUCKETS)
+
+    def record_retry(self, method: str, endpoint: str) -> None:
+        """A failed request attempt which is retried (up to `dm_clients.max_tries` attempts in total)."""
+        self._count("retries", {"method": method, "endpoint": endpoint})
+
+    def record_operation(self, operation: str, seconds: float, items: int) -> None:
+        labels = {"operation": operation}
+        self._count("operations", labels)
+        self._observe("operation_latency_seconds", seconds, labels, LATENCY_BUCKETS)
+        self._observe("operation_items", items, labels, ITEMS_BUCKETS)
+
+    def record_cache(self, hits: int, misses: int) -> None:
+        if hits:
+            self._count("cache_hits", {}, hits)
+        if misses:
+            self._count("cache_misses", {}, misses)
+
+    def submit(self, pool: Executor, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Submit work to a thread pool, keeping track of the number of queued and running tasks.
+        The work runs in a copy of the current context, so that nested calls are recorded in explain mode.
+        """
+        if not self.enabled:
+            return pool.submit(copy_context().run, fn, *args, **kwargs)
+        with self._lock:
+            self._queue_depth += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queue_depth)
+            depth = self._queue_depth
+        self._count("thread_pool_tasks", {})
+        self._export("thread_pool_queue_depth", depth, {})
+        future = pool.submit(copy_context().run, fn, *args, **kwargs)
+        future.add_done_callback(self._task_done)
+        return future
+
+    def _task_done(self, _future: Future) -> None:
+        with self._lock:
+            self._queue_depth -= 1
+
+    def _count(self, name: str, labels: Dict[str, str], value: float = 1) -> None:
+        key = (name, tuple(labels.items()))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        self._export(name, value, labels)
+
+    def _observe(self, name: str, value: float, labels: Dict[str, str], buckets: Sequence[float]) -> None:
+        key = (name, tuple(labels.items()))
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram(buckets)
+            self._histograms[key].observe(value)
+        self._export(name, value, labels)
+
+    def _export(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        for exporter in self._exporters:
+            try:
+                exporter.record(name, value, labels)
+            except Exception:
+                logger.exception(f"Metrics exporter {exporter} failed.")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Aggregated metrics as a dict:
+         * "counters" and "histograms": keyed by metric name, then by labels (e.g. "POST models/instances/list"),
+         * "thread_pool": current and maximal number of queued and running tasks.
+        """
+        with self._lock:
+            counters: Dict[str, Dict[str, float]] = {}
+            for (name, labels), value in sorted(self._counters.items()):
+                counters.setdefault(name, {})[" ".join(value_ for _, value_ in labels)] = value
+            histograms: Dict[str, Dict[str, Dict[str, Any]]] = {}
+            for (name, labels), histogram in sorted(self._histograms.items(), key=lambda kv: kv[0]):
+                histograms.setdefault(name, {})[" ".join(value_ for _, value_ in labels)] = histogram.as_dict()
+            return {
+                "enabled": self.enabled,
+                "counters": counters,
+                "histograms": histograms,
+                "thread_pool": {"queue_depth": self._queue_depth, "max_queue_depth": self._max_queue_depth},
+            }
+
+    def prometheus_text(self, prefix: str = "dm_clients") -> str:
+        """Render the collected metrics in Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(((key, hist.as_dict()) for key, hist in self._histograms.items()), key=lambda kv: kv[0])
+            queue_depth = self._queue_depth
+
+        def _labels(labels: _LabelsT, extra: Optional[Tuple[str, str]] = None) -> str:
+            pairs = [*labels, extra] if extra else list(labels)
+            return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in pairs) + "}" if pairs else ""
+
+        declared = set()
+        for (name, labels), value in counters:
+            if name not in declared:
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                declared.add(name)
+            lines.append(f"{prefix}_{name}_total{_labels(labels)} {value}")
+        for (name, labels), histogram in histograms:
+            if name not in declared:
+                lines.append(f"# TYPE {prefix}_{name} histogram")
+                declared.add(name)
+            for bound, count in histogram["buckets"].items():
+                lines.append(f"{prefix}_{name}_bucket{_labels(labels, ('le', bound))} {count}")
+            lines.append(f"{prefix}_{name}_sum{_labels(labels)} {histogram['sum']}")
+            lines.append(f"{prefix}_{name}_count{_labels(labels)} {histogram['count']}")
+        lines.append(f"# TYPE {prefix}_thread_pool_queue_depth gauge")
+        lines.append(f"{prefix}_thread_pool_queue_depth {queue_depth}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    """Escape a label value for the Prometheus text exposition format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def timed_operation(operation: str) -> Callable[[_FuncT], _FuncT]:
+    """
+    Decorator for `DomainModelAPI` methods, records the duration of the call and the number of items passed in or
+    returned (whichever is a list). The call is also recorded in explain mode, see `cognite.dm_clients.explain`.
+    """
+
+    def _decorator(method: _FuncT) -> _FuncT:
+        @wraps(method)
+        def _wrapper(self, *args, **kwargs):
+            metrics: Metrics = self.domain_client.metrics
+            if not metrics.enabled and not explain.is_active():
+                return method(self, *args, **kwargs)
+            name = f"{self.domain_model.__name__}.{operation}"
+            items_in = len(args[0]) if args and isinstance(args[0], list) else 0
+            start = perf_counter()
+            with explain.operation(name, items_in) as node:
+                result = method(self, *args, **kwargs)
+            items = len(result) if isinstance(result, list) else items_in
+            if node is not None:
+                node.items = items
+            if metrics.enabled:
+                metrics.record_operation(name, perf_counter() - start, items)
+            return result
+
+        return _wrapper  # type: ignore[return-value]
+
+    return _decorator
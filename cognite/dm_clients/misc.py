@@ -1,4 +1,8 @@
 import re
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
 
 
 def to_camel(string: str) -> str:
@@ -47,3 +51,18 @@ def to_snake(string: str) -> str:
     """
     words = re.findall(r"[A-Z]?[a-z]+|[A-Z]+(?=[A-Z][a-z]|\d|\W|$)|\d+", string)
     return "_".join(map(str.lower, words))
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    Lazily split an iterable into lists of at most `size` elements.
+    >>> list(chunked(range(5), 2))
+    [[0, 1], [2, 3], [4]]
+    >>> list(chunked([], 2))
+    []
+    """
+    if size < 1:
+        raise ValueError(f"Chunk size must be positive, got {size}")
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -0,0 +1,242 @@
+"""
+Generation of many schemas at once (`dm topython` with several schemas or a glob): in parallel worker processes,
+skipping schemas whose inputs have not changed since the last run (recorded in a manifest of content hashes), and
+optionally watching the schemas for changes.
+"""
+from __future__ import annotations
+
+import dataclasses
+import glob
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from threading import Event
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from cognite.gqlpygen.generator import to_client_sdk
+from cognite.gqlpygen.version import __version__
+
+__all__ = [
+    "GenerationJob",
+    "GenerationResult",
+    "Manifest",
+    "check_output_dirs",
+    "expand_schemas",
+    "generate",
+    "watch",
+]
+
+logger = logging.getLogger(__name__)
+
+_TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+
+@dataclass(frozen=True)
+class GenerationJob:
+    graphql_schema: Path
+    output_dir: Path
+    client_name: str
+    schema_name: str
+    read_only_models: bool = False
+
+    def input_hash(self, schema_raw: str) -> str:
+        """Hash of everything the output depends on: the schema, names, options, generator version and templates."""
+        inputs = [__version__, _templates_hash(), schema_raw, self.client_name, self.schema_name, self.read_only_models]
+        return _hash(json.dumps(inputs))
+
+
+@dataclass
+class GenerationResult:
+    job: GenerationJob
+    written: List[Path] = field(default_factory=list)
+    unchanged: List[Path] = field(default_factory=list)
+    skipped: bool = False  # inputs and outputs unchanged since the last run, nothing was rendered
+    error: Optional[str] = None  # the schema could not be rendered (only with `keep_going`)
+
+
+class Manifest:
+    """
+    JSON file with the hash of the inputs of each schema (see `GenerationJob.input_hash`) and the hashes of the files
+    generated from them, to skip schemas which have not changed (and whose outputs have not been edited since).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._entries: Dict[str, dict] = {}
+        if path.exists():
+            try:
+                self._entries = json.loads(path.read_text())
+            except ValueError:
+                logger.warning(f"Ignoring unreadable manifest {path}.")
+
+    @staticmethod
+    def _key(job: GenerationJob) -> str:
+        return str(job.output_dir.absolute())
+
+    def is_up_to_date(self, job: GenerationJob, input_hash: str) -> bool:
+        entry = self._entries.get(self._key(job))
+        if entry is None or entry["input_hash"] != input_hash:
+            return False
+        return all(
+            Path(output).exists() and _hash(Path(output).read_text()) == output_hash
+            for output, output_hash in entry["outputs"].items()
+        )
+
+    def record(self, job: GenerationJob, input_hash: str, outputs: Dict[Path, str]) -> None:
+        self._entries[self._key(job)] = {
+            "graphql_schema": str(job.graphql_schema),
+            "input_hash": input_hash,
+            "outputs": {str(path.absolute()): _hash(content) for path, content in outputs.items()},
+        }
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # write to a temp file and rename, so that an interrupted run does not leave a partial manifest:
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        with os.fdopen(fd, "w") as tmp_file:
+            json.dump(self._entries, tmp_file, indent=2, sort_keys=True)
+        os.replace(tmp_name, self.path)
+
+
+def expand_schemas(patterns: Iterable[Union[str, Path]]) -> List[Path]:
+    """Paths of the schemas matching `patterns` (paths or globs, e.g. `"domains/**/*.graphql"`), without duplicates."""
+    paths: Dict[Path, None] = {}
+    for pattern in map(str, patterns):
+        if glob.has_magic(pattern):
+            paths.update(dict.fromkeys(Path(match) for match in sorted(glob.glob(pattern, recursive=True))))
+        else:
+            paths[Path(pattern)] = None
+    return list(paths)
+
+
+def check_output_dirs(jobs: Iterable[GenerationJob]) -> None:
+    """Raise ValueError if several jobs have the same output directory, their outputs would overwrite each other."""
+    schemas_by_dir: Dict[Path, List[Path]] = defaultdict(list)
+    for job in jobs:
+        schemas_by_dir[job.output_dir.absolute()].append(job.graphql_schema)
+    for output_dir, schemas in schemas_by_dir.items():
+        if len(schemas) > 1:
+            raise ValueError(
+                f"Schemas {', '.join(map(str, schemas))} would all be generated in {output_dir},"
+                " put them in separate directories."
+            )
+
+
+def generate(
+    jobs: Iterable[GenerationJob],
+    manifest: Optional[Manifest] = None,
+    workers: Optional[int] = None,
+    force: bool = False,
+    keep_going: bool = False,
+) -> List[GenerationResult]:
+    """
+    Generate `client.py` and `schema.py` for each job. Schemas are rendered in up to `workers` processes (by default,
+    one per CPU) if there are several to render. Unchanged schemas (see `Manifest`) are skipped, unless `force` is set,
+    and files are only written if their content changes, so that their modification times are kept.
+    With `keep_going`, a schema which cannot be read or rendered (e.g. a syntax error) does not stop the others, its
+    result has the `error` instead.
+    Raises ValueError if several jobs have the same output directory (see `check_output_dirs`).
+    """
+    jobs = list(jobs)
+    check_output_dirs(jobs)
+    results = {job: GenerationResult(job) for job in jobs}
+    pending: Dict[GenerationJob, str] = {}
+    schemas_raw: Dict[GenerationJob, str] = {}
+    for job in jobs:
+        try:
+            schemas_raw[job] = job.graphql_schema.read_text()
+        except OSError as error:
+            if not keep_going:
+                raise
+            results[job].error = f"{type(error).__name__}: {error}"
+            continue
+        input_hash = job.input_hash(schemas_raw[job])
+        if not force and manifest is not None and manifest.is_up_to_date(job, input_hash):
+            results[job].skipped = True
+        else:
+            pending[job] = input_hash
+
+    render = _render_or_error if keep_going else _render
+    args = [(schemas_raw[job], job.client_name, job.schema_name, job.read_only_models) for job in pending]
+    if len(pending) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = list(pool.map(render, *zip(*args)))
+    else:
+        rendered = [render(*job_args) for job_args in args]
+
+    for (job, input_hash), files in zip(pending.items(), rendered):
+        if isinstance(files, str):
+            results[job].error = files
+            continue
+        job.output_dir.mkdir(parents=True, exist_ok=True)
+        outputs = {job.output_dir / f"{name}.py": content for name, content in files.items()}
+        for output, content in outputs.items():
+            if output.exists() and output.read_text() == content:
+                results[job].unchanged.append(output)
+            else:
+                output.write_text(content)
+                results[job].written.append(output)
+        if manifest is not None:
+            manifest.record(job, input_hash, outputs)
+    if manifest is not None and pending:
+        manifest.save()
+    return [results[job] for job in jobs]
+
+
+def watch(
+    make_jobs: Callable[[], List[GenerationJob]],
+    on_results: Callable[[List[GenerationResult]], None],
+    manifest: Optional[Manifest] = None,
+    workers: Optional[int] = None,
+    interval: float = 1.0,
+    stop: Optional[Event] = None,
+) -> None:
+    """
+    Generate all jobs, then poll the schemas every `interval` seconds and regenerate the ones which changed (or were
+    added, `make_jobs` is called on every poll to pick up new files matching a glob), until `stop` is set.
+    Schemas which cannot be rendered are reported with their `error` and regenerated when they change again.
+    """
+    stop = stop or Event()
+    modified: Dict[GenerationJob, int] = {}
+    while not stop.is_set():
+        jobs = make_jobs()
+        changed = []
+        for job in jobs:
+            mtime = job.graphql_schema.stat().st_mtime_ns if job.graphql_schema.exists() else None
+            if mtime is not None and modified.get(job) != mtime:
+                modified[job] = mtime
+                changed.append(job)
+        if changed:
+            on_results(generate(changed, manifest, workers, keep_going=True))
+        stop.wait(interval)
+
+
+def _render(schema_raw: str, client_name: str, schema_name: str, read_only_models: bool) -> Dict[str, str]:
+    """Runs in worker processes."""
+    return dataclasses.asdict(to_client_sdk(schema_raw, client_name, schema_name, read_only_models=read_only_models))
+
+
+def _render_or_error(
+    schema_raw: str, client_name: str, schema_name: str, read_only_models: bool
+) -> Union[Dict[str, str], str]:
+    """Runs in worker processes, returns the error message (exceptions might not be picklable) if rendering fails."""
+    try:
+        return _render(schema_raw, client_name, schema_name, read_only_models)
+    except Exception as error:
+        return f"{type(error).__name__}: {error}"
+
+
+@lru_cache(maxsize=None)
+def _templates_hash() -> str:
+    return _hash("".join(path.read_text() for path in sorted(_TEMPLATES_DIR.glob("*.txt"))))
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
@@ -15,6 +15,17 @@ BUILTIN_TYPES = {
     "Timestamp",
     "JSONObject",
 }
+# Types of values returned by the API, used on ReadOnlyModels:
+READ_ONLY_TYPES = {
+    "Timestamp": "str",
+    "JSONObject": "Dict[str, Any]",
+}
+# Conversion of values returned by the API to field types, where pydantic would convert them:
+CONVERTERS = {
+    "float": "float",
+    "Timestamp": "Timestamp.validate",
+    "JSONObject": "JSONObject",
+}
 
 
 @dataclass
@@ -24,17 +35,68 @@ class Field:
     is_required: bool = False
     is_list: bool = False
     is_named_type: bool = False
+    is_indexed: bool = False  # `@index` directive
+    is_unique: bool = False  # `@unique` directive
 
     @property
     def type_hint(self) -> str:
         type_hint = self.type
+        default = None
         if self.is_list and not self.is_required:
-            type_hint = f"Optional[List[Optional[{type_hint}]]] = []"
+            type_hint, default = f"Optional[List[Optional[{type_hint}]]]", "[]"
         elif not self.is_required:
-            type_hint = f"Optional[{type_hint}] = None"
+            type_hint, default = f"Optional[{type_hint}]", "None"
         elif self.is_list:
             type_hint = f"List[{type_hint}]"
-        return type_hint
+        if self.has_container_hints:
+            hints = "".join(
+                f", {hint}=True" for hint, is_set in (("index", self.is_indexed), ("unique", self.is_unique)) if is_set
+            )
+            return f"{type_hint} = Field({default or '...'}{hints})"
+        return type_hint if default is None else f"{type_hint} = {default}"
+
+    @property
+    def has_container_hints(self) -> bool:
+        return self.is_indexed or self.is_unique
+
+    @property
+    def read_only_type_hint(self) -> str:
+        """Type of the field on a ReadOnlyModel, where values are as returned by the API."""
+        if self.is_one_to_many:
+            return "Optional[List[str]]"  # not fetched
+        type_hint = READ_ONLY_TYPES.get(self.type, "str" if self.is_one_to_one else self.type)
+        if self.is_list:
+            type_hint = f"List[{type_hint}]" if self.is_required else f"List[Optional[{type_hint}]]"
+        return type_hint if self.is_required else f"Optional[{type_hint}]"
+
+    @property
+    def is_one_to_one(self) -> bool:
+        return self.type not in BUILTIN_TYPES and not self.is_list
+
+    @property
+    def is_one_to_many(self) -> bool:
+        return self.type not in BUILTIN_TYPES and self.is_list
+
+    @property
+    def from_property(self) -> str:
+        """
+        Python expression for the value of this field, given the property value returned by the API (`properties`).
+        Values are converted to the field type like pydantic would, but without validation.
+        """
+        if self.is_required:
+            value = f'properties["{self.name}"]'
+        elif self.is_list:
+            value = f'properties.get("{self.name}", [])'
+        else:
+            value = f'properties.get("{self.name}")'
+        converter = CONVERTERS.get(self.type)
+        if converter is None:
+            return value
+        if self.is_list:
+            converted = f"[None if element is None else {converter}(element) for element in value]"
+        else:
+            converted = f"{converter}(value)"
+        return f"None if (value := {value}) is None else {converted}"
 
     def __repr__(self) -> str:
         return self.name
@@ -50,6 +112,10 @@ class DomainModel:
     def name_snake(self) -> str:
         return to_snake(self.name)
 
+    @property
+    def scalar_fields(self) -> list[Field]:
+        return [field for field in self.fields if field.type in BUILTIN_TYPES]
+
     @property
     def dependencies(self) -> set[str]:
         return {field.type for field in self.fields if field.type not in BUILTIN_TYPES}
@@ -67,10 +133,77 @@ class DomainModels:
 
     @property
     def topological_order(self) -> list[DomainModel]:
-        topological_order = graphlib.TopologicalSorter(
-            {model.name: model.dependencies for model in self.models}
-        ).static_order()
-        return [next(model for model in self.models if model.name == model_name) for model_name in topological_order]
+        """
+        Models ordered so that each model comes after the models it refers to, where possible.
+        Models which refer to each other (directly or through other models) are kept together in their original order,
+        they refer to each other with forward references (resolved by `Schema.close()`).
+        """
+        models_by_name = {model.name: model for model in self.models}
+        graph = {model.name: model.dependencies for model in self.models}
+        for model in self.models:
+            if unknown := {name for name in graph[model.name] if name not in models_by_name}:
+                raise ValueError(f"Unknown type(s) {', '.join(sorted(unknown))} referenced by {model.name}")
+        try:
+            order = list(graphlib.TopologicalSorter(graph).static_order())
+        except graphlib.CycleError:
+            order = _cycle_tolerant_order(graph)
+        return [models_by_name[name] for name in order]
 
     def __iter__(self) -> Iterator[DomainModel]:
         return iter(self.models)
+
+
+def _strongly_connected_components(graph: dict[str, set[str]]) -> list[list[str]]:
+    """
+    Tarjan's algorithm (iterative, for deep graphs). Each component lists its nodes in the order of `graph`.
+    """
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    stack: list[str] = []
+    on_stack: set[str] = set()
+    components: list[list[str]] = []
+    position = {node: i for i, node in enumerate(graph)}
+
+    for root in graph:
+        if root in index:
+            continue
+        work = [(root, iter(sorted(graph[root], key=position.__getitem__)))]
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, neighbours = work[-1]
+            for neighbour in neighbours:
+                if neighbour not in index:
+                    index[neighbour] = low[neighbour] = len(index)
+                    stack.append(neighbour)
+                    on_stack.add(neighbour)
+                    work.append((neighbour, iter(sorted(graph[neighbour], key=position.__getitem__))))
+                    break
+                if neighbour in on_stack:
+                    low[node] = min(low[node], index[neighbour])
+            else:
+                work.pop()
+                if work:
+                    low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component, key=position.__getitem__))
+    return components
+
+
+def _cycle_tolerant_order(graph: dict[str, set[str]]) -> list[str]:
+    """Topological order of the strongly connected components of `graph`, each expanded in the order of `graph`."""
+    components = _strongly_connected_components(graph)
+    component_of = {node: i for i, component in enumerate(components) for node in component}
+    condensed = {
+        i: {component_of[dependency] for node in component for dependency in graph[node]} - {i}
+        for i, component in enumerate(components)
+    }
+    return [node for i in graphlib.TopologicalSorter(condensed).static_order() for node in components[i]]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 
 from jinja2 import Environment, PackageLoader, select_autoescape
 
@@ -14,24 +15,21 @@ class PythonSDK:
     schema: str
 
 
-def to_client_sdk(schema_raw: str, client_name: str, schema_name: str) -> PythonSDK:
+def to_client_sdk(schema_raw: str, client_name: str, schema_name: str, read_only_models: bool = False) -> PythonSDK:
     """
     Converts a GraphQL schema to a client-side SDK.
 
     :param schema_raw: GraphQL schema.
     :param client_name: Name of the client.
     :param schema_name: Name of the schema.
+    :param read_only_models: Also generate a lightweight read-only class (`ReadOnlyModel`) per type.
     :return: Client-side SDK
     """
     # Parsing
     models = parse_graphql(schema_raw)
 
     # Create client.py
-    env = Environment(
-        loader=PackageLoader("cognite.gqlpygen", "templates"),
-        autoescape=select_autoescape(),
-    )
-
+    env = _environment()
     client = env.get_template("client.txt")
     client_py = client.render(
         client_name_snake=to_snake(client_name),
@@ -48,10 +46,21 @@ def to_client_sdk(schema_raw: str, client_name: str, schema_name: str) -> Python
     schema_py = schema_tmp.render(
         schema_name=schema_name,
         models=ordered,
+        read_only_models=read_only_models,
+        container_hints=any(field.has_container_hints for model in models for field in model.fields),
     )
     return PythonSDK(_clean_rendered_template(client_py), _clean_rendered_template(schema_py))
 
 
+@lru_cache(maxsize=None)
+def _environment() -> Environment:
+    """Shared by all calls, so that templates are loaded and compiled only once."""
+    return Environment(
+        loader=PackageLoader("cognite.gqlpygen", "templates"),
+        autoescape=select_autoescape(),
+    )
+
+
 def _clean_rendered_template(rendered_template: str) -> str:
     """
     Clean up, adjust new lines and indent.
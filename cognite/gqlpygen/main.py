@@ -3,9 +3,10 @@ import importlib.util
 import inspect
 import subprocess
 import sys
+import tempfile
 from contextlib import suppress
 from pathlib import Path
-from typing import Optional
+from typing import Any, List, Optional
 
 import click
 import toml
@@ -18,8 +19,6 @@ except ImportError:
 else:
     _has_typer = True
 
-import dataclasses
-
 try:
     from packaging import version
 except ImportError:
@@ -30,8 +29,17 @@ else:
 
 from cognite.dm_clients.config import settings
 from cognite.dm_clients.domain_modeling.schema import Schema
-from cognite.gqlpygen.generator import to_client_sdk
+from cognite.gqlpygen.batch import (
+    GenerationJob,
+    GenerationResult,
+    Manifest,
+    check_output_dirs,
+    expand_schemas,
+    generate,
+)
+from cognite.gqlpygen.batch import watch as watch_schemas
 from cognite.gqlpygen.misc import to_client_name, to_schema_name
+from cognite.gqlpygen.parser import strip_hint_directives
 
 
 def _hide_pw(secret: str, value: Optional[str] = None) -> str:
@@ -52,6 +60,18 @@ def _hide_pw(secret: str, value: Optional[str] = None) -> str:
     return (secret if value is None else value).replace(secret, f"{secret[:3]}*****..." if secret else "")
 
 
+def _option_value(value: Any, default: Any) -> Any:
+    """The value of a command option, or `default` if the command function was called directly (not through typer)."""
+    return default if _has_typer and isinstance(value, typer.models.ParameterInfo) else value
+
+
+def _relative(path: Path) -> Path:
+    with suppress(ValueError):
+        # Will raise a ValueError of path is not relative to cwd.
+        return path.relative_to(Path.cwd())
+    return path
+
+
 def _check_cdf_cli() -> None:
     cdf_version_proc = subprocess.run("cdf --version", shell=True, capture_output=True)
     if cdf_version_proc.returncode:
@@ -73,37 +93,130 @@ def _check_cdf_cli() -> None:
         sys.exit(1)
 
 
+def _load_schema(schema_module: Path, name: Optional[str]) -> Schema:
+    """Import the `schema_module` (a .py file or Python dot notation) and find the Schema in it."""
+    if schema_module.suffix == ".py":
+        click.echo(f"Got file '{schema_module}', trying to import it...")
+        module_name = schema_module.stem
+        spec = importlib.util.spec_from_file_location(module_name, schema_module)
+        module = importlib.util.module_from_spec(spec)  # type:ignore[arg-type]
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)  # type:ignore[union-attr]
+    else:
+        module_name = settings.local.get("schema_module", default=schema_module.stem)
+        click.echo(f"Got module '{schema_module}', trying to import it...")
+        module = importlib.import_module(module_name)
+    click.echo("Import successful")
+
+    if name is None:
+        click.echo("Searching for a schema...")
+        for schema_name, instance in inspect.getmembers(module):
+            if isinstance(instance, Schema):
+                click.echo(f"Found schema '{schema_name}'")
+                break
+        else:
+            click.echo("Failed to find schema, exiting..")
+            exit(1)
+    else:
+        schema_name = to_schema_name(name)
+        click.echo(f"Got schema name '{schema_name}'")
+        try:
+            instance = getattr(module, schema_name)
+        except AttributeError as exc:
+            typer.echo(f"Error: {exc}. Check the --name option and 'schema_module' argument.")
+            sys.exit(1)
+    return instance
+
+
+def _echo_progress(progress: Any) -> None:
+    click.echo(f"\r{progress}", nl=False)
+
+
 if _has_typer:
     app = typer.Typer()
 
-    @app.command("topython", help="Create pydantic schema and Python DM client from a .graphql schema.")
+    @app.command(
+        "topython",
+        help="Create pydantic schema and Python DM client from .graphql schemas."
+        " With several schemas (or a glob), each is generated next to its .graphql file and named after its directory"
+        " (so there can only be one schema per directory).",
+    )
     def to_python(
-        graphql_schema: Path = typer.Argument(
-            settings.get("local.graphql_schema", ...), help="GraphQL schema to convert"
+        graphql_schemas: List[Path] = typer.Argument(
+            [_graphql_schema] if (_graphql_schema := settings.get("local.graphql_schema")) else ...,
+            help="GraphQL schema(s) to convert, paths or globs (e.g. 'domains/**/*.graphql').",
         ),
-        output_dir: Path = typer.Option(
-            Path(_graphql_schema).parent if (_graphql_schema := settings.get("local.graphql_schema")) else Path.cwd(),
-            help="Directory to write schema.py and client.py to.",
+        output_dir: Optional[Path] = typer.Option(
+            None,
+            help="Directory to write schema.py and client.py to (only with a single schema)."
+            " Defaults to the directory of the schema.",
         ),
         name: str = typer.Option(
             settings.get("local.name", ""),
-            help="Name of the client and schema, expected to be in pascal case.",
+            help="Name of the client and schema, expected to be in pascal case (only with a single schema).",
+        ),
+        read_only_models: bool = typer.Option(
+            False,
+            help="Also generate lightweight read-only classes, returned by `list(read_only=True)`.",
         ),
+        manifest: Optional[Path] = typer.Option(
+            settings.get("local.topython_manifest", ".topython_manifest.json"),
+            help="File with content hashes of inputs and outputs, schemas which have not changed are skipped.",
+        ),
+        force: bool = typer.Option(False, help="Regenerate all schemas, even if they have not changed."),
+        jobs: Optional[int] = typer.Option(None, help="Number of worker processes, by default one per CPU."),
+        watch: bool = typer.Option(False, help="Keep running, and regenerate schemas when they change."),
     ):
-        schema_raw = graphql_schema.read_text()
-        client_name = to_client_name(name)
-        schema_name = to_schema_name(name)
-        sdk = to_client_sdk(schema_raw, client_name, schema_name)
-        output_dir = (output_dir or graphql_schema.parent).absolute()
-        output_dir.mkdir(exist_ok=True)
-
-        for name, content in dataclasses.asdict(sdk).items():
-            output = output_dir / f"{name}.py"
-            output.write_text(content)
-            with suppress(ValueError):
-                # Will raise a ValueError of output is not relative to cwd.
-                output = output.relative_to(Path.cwd())
-            click.echo(f"Wrote file '{output}'")
+        # Options are `typer` `OptionInfo`s when this function is called directly (not through the CLI):
+        output_dir = _option_value(output_dir, None)
+        name = _option_value(name, "")
+        read_only_models = _option_value(read_only_models, False)
+        manifest_path = _option_value(manifest, None)
+        force = _option_value(force, False)
+        workers = _option_value(jobs, None)
+
+        if isinstance(graphql_schemas, (str, Path)):
+            graphql_schemas = [graphql_schemas]
+        patterns = list(graphql_schemas)
+
+        def make_jobs() -> List[GenerationJob]:
+            schemas = expand_schemas(patterns)
+            if len(schemas) > 1 and output_dir is not None:
+                raise click.UsageError("--output-dir can only be used with a single schema.")
+            jobs_ = [
+                GenerationJob(
+                    graphql_schema=schema,
+                    output_dir=(output_dir or schema.parent).absolute(),
+                    client_name=to_client_name(name if len(schemas) == 1 else schema.parent.absolute().name),
+                    schema_name=to_schema_name(name if len(schemas) == 1 else schema.parent.absolute().name),
+                    read_only_models=read_only_models is True,
+                )
+                for schema in schemas
+            ]
+            try:
+                check_output_dirs(jobs_)
+            except ValueError as error:
+                raise click.UsageError(str(error)) from error
+            return jobs_
+
+        def echo_results(results: List[GenerationResult]) -> None:
+            for result in results:
+                if result.skipped:
+                    click.echo(f"Skipped '{_relative(result.job.graphql_schema)}' (unchanged)")
+                if result.error is not None:
+                    click.echo(f"Failed to generate '{_relative(result.job.graphql_schema)}': {result.error}", err=True)
+                for output in result.written:
+                    click.echo(f"Wrote file '{_relative(output)}'")
+                for output in result.unchanged:
+                    click.echo(f"Unchanged file '{_relative(output)}'")
+
+        batch_manifest = Manifest(manifest_path) if manifest_path is not None else None
+        if _option_value(watch, False):
+            click.echo("Watching for changes, press Ctrl+C to stop.")
+            with suppress(KeyboardInterrupt):
+                watch_schemas(make_jobs, echo_results, batch_manifest, workers)
+        else:
+            echo_results(generate(make_jobs(), batch_manifest, workers, force=force))
 
     @app.command(
         "settings",
@@ -127,37 +240,7 @@ if _has_typer:
             help="Name of the client and schema, expected to be in pascal case.",
         ),
     ):
-        if schema_module.suffix == ".py":
-            click.echo(f"Got file '{schema_module}', trying to import it...")
-            module_name = schema_module.stem
-            spec = importlib.util.spec_from_file_location(module_name, schema_module)
-            module = importlib.util.module_from_spec(spec)  # type:ignore[arg-type]
-            sys.modules[module_name] = module
-            spec.loader.exec_module(module)  # type:ignore[union-attr]
-        else:
-            module_name = settings.local.get("schema_module", default=schema_module.stem)
-            click.echo(f"Got module '{schema_module}', trying to import it...")
-            module = importlib.import_module(module_name)
-        click.echo("Import successful")
-
-        if name is None:
-            click.echo("Searching for a schema...")
-            for schema_name, instance in inspect.getmembers(module):
-                if isinstance(instance, Schema):
-                    click.echo(f"Found schema '{schema_name}'")
-                    break
-            else:
-                click.echo("Failed to find schema, exiting..")
-                exit(1)
-        else:
-            schema_name = to_schema_name(name)
-            click.echo(f"Got schema name '{schema_name}'")
-            try:
-                instance = getattr(module, schema_name)
-            except AttributeError as exc:
-                typer.echo(f"Error: {exc}. Check the --name option and 'schema_module' argument.")
-                sys.exit(1)
-
+        instance = _load_schema(schema_module, name)
         graphql_schema.write_text(instance.as_str())
         click.echo(f"Wrote file '{graphql_schema}'")
 
@@ -211,6 +294,13 @@ if _has_typer:
         ),
     ):
         _check_cdf_cli()
+        schema_raw = graphql_schema.read_text()
+        stripped_schema = None
+        if (stripped := strip_hint_directives(schema_raw)) != schema_raw:
+            # container hints are applied after publishing, with `DomainClient.apply_container_hints()`:
+            with tempfile.NamedTemporaryFile("w", suffix=".graphql", delete=False) as stripped_file:
+                stripped_file.write(stripped)
+            graphql_schema = stripped_schema = Path(stripped_file.name)
         command = [
             "cdf",
             "data-models",
@@ -221,7 +311,93 @@ if _has_typer:
             f"--version='{schema_version}'",
         ]
         typer.echo(f"Executing:\n{' '.join(command)}")
-        subprocess.run(" ".join(command), shell=True)
+        try:
+            subprocess.run(" ".join(command), shell=True)
+        finally:
+            if stripped_schema is not None:
+                stripped_schema.unlink(missing_ok=True)
+
+    @app.command(
+        "deploy",
+        help="Deploy a pydantic schema to CDF DM through the API: only containers, views and the data model which"
+        " differ from the deployed ones are applied.",
+    )
+    def deploy(
+        schema_module: Path = typer.Argument(
+            settings.get("local.schema_module", ...),
+            help="Pydantic schema to deploy. Path to a .py file or Python dot notation ",
+        ),
+        name: Optional[str] = typer.Option(
+            settings.get("local.name"),
+            help="Name of the client and schema, expected to be in pascal case.",
+        ),
+        space: str = typer.Option(settings.get("dm_clients.space", ...), help="Space ID in CDF Domain Modeling"),
+        data_model: str = typer.Option(
+            settings.get("dm_clients.datamodel", ...),
+            help="ID of Data Model in CDF Domain Modeling",
+        ),
+        schema_version: int = typer.Option(
+            settings.get("dm_clients.schema_version", ...),
+            help="Version of the schema to app or update.",
+        ),
+        dry_run: bool = typer.Option(False, help="Only show what would be applied."),
+    ):
+        from cognite.dm_clients.cdf.client_dm_v3 import get_cognite_client_dm_v3
+        from cognite.dm_clients.domain_modeling.deploy import deploy as deploy_schema
+        from cognite.dm_clients.domain_modeling.deploy import plan_deployment
+
+        schema = _load_schema(schema_module, name)
+        client = get_cognite_client_dm_v3()
+        plan = plan_deployment(client, schema, space, data_model, schema_version)
+        for unchanged in plan.unchanged:
+            click.echo(f"Unchanged {unchanged}")
+        if plan.is_empty:
+            click.echo("Nothing to deploy.")
+            return
+        for change in plan.summary():
+            click.echo(f"{'Would apply' if dry_run else 'Applying'} {change}")
+        if not dry_run:
+            deploy_schema(client, plan)
+            click.echo("Deployed.")
+
+    @app.command("export", help="Export all instances of a space to a gzip-compressed NDJSON file.")
+    def export(
+        output: Path = typer.Argument(..., help="File to write, e.g. 'backup.ndjson.gz'."),
+        space: str = typer.Option(settings.get("dm_clients.space", ...), help="Space ID in CDF Domain Modeling"),
+        schema_version: Optional[int] = typer.Option(
+            None, help="Only export nodes of the views of this version, by default of all views."
+        ),
+        page_size: int = typer.Option(1000, help="Number of instances to read per request."),
+    ):
+        from cognite.dm_clients.cdf.client_dm_v3 import get_cognite_client_dm_v3
+        from cognite.dm_clients.domain_modeling.bulk import Progress
+        from cognite.dm_clients.domain_modeling.export import export_space
+
+        progress = Progress(on_progress=_echo_progress)
+        export_space(get_cognite_client_dm_v3(), space, output, schema_version, page_size, progress)
+        click.echo(f"\rExported {progress} to '{output}'")
+
+    @app.command("import", help="Import instances from a file created by `dm export`, resuming an interrupted import.")
+    def import_(
+        input_file: Path = typer.Argument(..., help="File created by `dm export`."),
+        space: Optional[str] = typer.Option(
+            None, help="Space to import to, by default the space the instances were exported from."
+        ),
+        batch_size: int = typer.Option(1000, help="Number of lines to import at a time, written in parallel chunks."),
+        chunk_size: int = typer.Option(100, help="Number of instances per request."),
+        checkpoint: Path = typer.Option(
+            Path(".dm_import_checkpoint.json"), help="Progress of imports, to continue interrupted imports."
+        ),
+    ):
+        from cognite.dm_clients.cdf.client_dm_v3 import get_cognite_client_dm_v3
+        from cognite.dm_clients.domain_modeling.bulk import Checkpoint, Progress
+        from cognite.dm_clients.domain_modeling.export import import_space
+
+        progress = Progress(on_progress=_echo_progress)
+        import_space(
+            get_cognite_client_dm_v3(), input_file, space, batch_size, chunk_size, Checkpoint(checkpoint), progress
+        )
+        click.echo(f"\rImported {progress} from '{input_file}'")
 
     def main():
         app()
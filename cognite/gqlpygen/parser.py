@@ -12,33 +12,59 @@ GRAPHQL_TO_PYTHON_TYPE_MAP = {
     "Boolean": "bool",
 }
 
+# Field directives read by pygen only (see `Field.is_indexed`, `Field.is_unique`), unknown to the DM API:
+_HINT_DIRECTIVES = {"index", "unique"}
+
+
+def strip_hint_directives(schema_raw: str) -> str:
+    """
+    The schema without the `@index` and `@unique` field directives, to publish it to CDF. The directives are found in
+    the parsed schema and cut out of the source, so the rest (including descriptions which mention them) is unchanged.
+    """
+    spans = [
+        (directive.loc.start, directive.loc.end)
+        for definition in graphql.parse(schema_raw).definitions
+        for field in getattr(definition, "fields", None) or ()
+        for directive in field.directives or ()
+        if directive.name.value in _HINT_DIRECTIVES
+    ]
+    parts: list[str] = []
+    position = 0
+    for start, end in spans:  # in source order
+        parts.append(schema_raw[position:start].rstrip(" \t"))
+        position = end
+    parts.append(schema_raw[position:])
+    return "".join(parts)
+
 
 def parse_graphql(schema_raw: str) -> DomainModels:
-    schema = graphql.parse(schema_raw)
+    # The AST is read directly (not converted with `to_dict()`), and without source locations, for large schemas:
+    schema = graphql.parse(schema_raw, no_location=True)
 
     domain_models = []
-    for definition in schema.to_dict()["definitions"]:
-        fields = [_parse_field(field) for field in definition["fields"]]
-        domain_models.append(DomainModel(to_pascal(definition["name"]["value"]), fields))
+    for definition in schema.definitions:
+        fields = [_parse_field(field) for field in definition.fields]
+        domain_models.append(DomainModel(to_pascal(definition.name.value), fields))
     return DomainModels(domain_models)
 
 
-def _parse_field(field: dict) -> Field:
-    field_name = field["name"]["value"]
+def _parse_field(field: graphql.FieldDefinitionNode) -> Field:
+    field_name = field.name.value
     is_required = False
     is_list = False
-    field_type = field["type"]
+    field_type = field.type
     while True:
-        if field_type["kind"] == "non_null_type":
+        if field_type.kind == "non_null_type":
             is_required = True
-            field_type = field_type["type"]
-        elif field_type["kind"] == "list_type":
+            field_type = field_type.type
+        elif field_type.kind == "list_type":
             is_list = True
-            field_type = field_type["type"]
+            field_type = field_type.type
         else:
             break
-    is_named_type = field_type["kind"] == "named_type"
-    type_name = field_type["name"]["value"]
+    is_named_type = field_type.kind == "named_type"
+    type_name = field_type.name.value
+    directives = {directive.name.value for directive in field.directives or ()}
 
     return Field(
         name=field_name,
@@ -46,4 +72,6 @@ def _parse_field(field: dict) -> Field:
         is_list=is_list,
         is_required=is_required,
         is_named_type=is_named_type,
+        is_indexed="index" in directives,
+        is_unique="unique" in directives,
     )
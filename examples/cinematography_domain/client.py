@@ -1,15 +1,60 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Literal, Optional
 
 from cachelib import BaseCache, SimpleCache
 
-from cognite.dm_clients.cdf.get_client import get_client_config
+from cognite.dm_clients.cdf.client_registry import client_registry
 from cognite.dm_clients.domain_modeling import DomainClient, DomainModelAPI
+from cognite.dm_clients.domain_modeling.filters import FieldRef
+from cognite.dm_clients.domain_modeling.selection import Selection
 
 from .schema import Movie, Person, cine_schema
 
 
+class MovieFields:
+    """Fields of `Movie` to build filters for `DomainModelAPI.list()` and `DomainModelAPI.iter_list()`."""
+
+    title = FieldRef("title")
+    director = FieldRef("director", direct_relation=True)
+    release = FieldRef("release")
+    meta = FieldRef("meta")
+    genres = FieldRef("genres")
+
+
+class PersonFields:
+    """Fields of `Person` to build filters for `DomainModelAPI.list()` and `DomainModelAPI.iter_list()`."""
+
+    name = FieldRef("name")
+
+
+class MovieSelection(Selection[Movie]):
+    """Fields of `Movie` to select in GraphQL queries, see `DomainClient.graph()`."""
+
+    domain_model = Movie
+
+    def __init__(self, *fields: Literal["title", "release", "meta", "genres"]):
+        super().__init__(*fields)
+
+    def director(self, selection: Optional[PersonSelection] = None) -> MovieSelection:
+        return self._select("director", selection)
+
+    def actors(self, selection: Optional[PersonSelection] = None, first: Optional[int] = None) -> MovieSelection:
+        return self._select("actors", selection, first)
+
+    def producers(self, selection: Optional[PersonSelection] = None, first: Optional[int] = None) -> MovieSelection:
+        return self._select("producers", selection, first)
+
+
+class PersonSelection(Selection[Person]):
+    """Fields of `Person` to select in GraphQL queries, see `DomainClient.graph()`."""
+
+    domain_model = Person
+
+    def __init__(self, *fields: Literal["name"]):
+        super().__init__(*fields)
+
+
 class CineClient(DomainClient):
     """
     Domain-specific client class for the entire domain.
@@ -29,5 +74,5 @@ def get_cine_client(
 ) -> CineClient:
     """Quick way of instantiating a CineClient with sensible defaults for development."""
     cache = SimpleCache() if cache is None else cache
-    config = get_client_config()
+    config = client_registry.get_client_config()
     return CineClient(cine_schema, DomainModelAPI, cache, config, space_id, data_model, schema_version)
@@ -6,7 +6,7 @@ from __future__ import annotations
 
 import logging
 import sys
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from cognite.dm_clients.custom_types import JSONObject, Timestamp
 from cognite.dm_clients.domain_modeling import DomainModel, Schema
@@ -20,6 +20,20 @@ cine_schema: Schema[DomainModel] = Schema()
 class Person(DomainModel):
     name: str
 
+    @staticmethod
+    def to_node_properties(item: Person, space_id: str) -> Dict[str, Any]:
+        properties: Dict[str, Any] = {}
+        if item.name is not None:
+            properties["name"] = item.name
+        return properties
+
+    @classmethod
+    def from_node_properties(cls, external_id: str, properties: Dict[str, Any]) -> Person:
+        return cls.construct(
+            externalId=external_id,
+            name=properties["name"],
+        )
+
 
 @cine_schema.register_type(root_type=True)
 class Movie(DomainModel):
@@ -31,6 +45,34 @@ class Movie(DomainModel):
     meta: Optional[JSONObject] = None
     genres: List[str]
 
+    @staticmethod
+    def to_node_properties(item: Movie, space_id: str) -> Dict[str, Any]:
+        properties: Dict[str, Any] = {}
+        if item.title is not None:
+            properties["title"] = item.title
+        if item.director is not None:
+            properties["director"] = {"space": space_id, "externalId": item.director.externalId}
+        if item.release is not None:
+            properties["release"] = item.release
+        if item.meta is not None:
+            properties["meta"] = item.meta
+        if item.genres is not None:
+            properties["genres"] = item.genres
+        return properties
+
+    @classmethod
+    def from_node_properties(cls, external_id: str, properties: Dict[str, Any]) -> Movie:
+        return cls.construct(
+            externalId=external_id,
+            title=properties["title"],
+            director=properties.get("director"),
+            actors=properties.get("actors", []),
+            producers=properties.get("producers", []),
+            release=None if (value := properties.get("release")) is None else Timestamp.validate(value),
+            meta=None if (value := properties.get("meta")) is None else JSONObject(value),
+            genres=properties["genres"],
+        )
+
 
 # Keep at the end of the file:
 cine_schema.close()
@@ -10,8 +10,9 @@ from cognite.dm_clients.custom_types import JSONObject, Timestamp
 
 def _delete_data(client: CineClient) -> None:
     print("Deleting Movie and Person data.")
-    client.person.delete(client.person.list(resolve_relationships=False))
-    client.movie.delete(client.movie.list(resolve_relationships=False))
+    # all the items, not just the first page, without fetching them (and their relationships) first:
+    print(client.movie.purge())
+    print(client.person.purge())
 
 
 def _upload_data(client: CineClient) -> None:
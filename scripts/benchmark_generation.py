@@ -0,0 +1,45 @@
+"""
+Time code generation (`dm topython`) for a synthetic GraphQL schema with many types.
+Every type refers to the previous type and to a type halfway back, every tenth type also refers to the next one,
+so that the schema has cycles.
+
+    PYTHONPATH=. python scripts/benchmark_generation.py [number of types]
+"""
+import sys
+import time
+
+from cognite.gqlpygen.generator import to_client_sdk
+from cognite.gqlpygen.parser import parse_graphql
+
+
+def make_schema(n_types: int) -> str:
+    types = []
+    for i in range(n_types):
+        fields = [f"  name{i}: String!", "  size: Int", "  tags: [String]"]
+        if i:
+            fields += [f"  previous: Type{i - 1}", f"  halfway: [Type{i // 2}]"]
+        if i % 10 == 0 and i + 1 < n_types:
+            fields.append(f"  next: Type{i + 1}")
+        types.append(f"type Type{i} {{\n" + "\n".join(fields) + "\n}")
+    return "\n\n".join(types)
+
+
+def main(n_types: int) -> None:
+    schema_raw = make_schema(n_types)
+
+    start = time.perf_counter()
+    models = parse_graphql(schema_raw)
+    parsed = time.perf_counter()
+    models.topological_order
+    ordered = time.perf_counter()
+    sdk = to_client_sdk(schema_raw, "BenchmarkClient", "benchmark_schema")
+    generated = time.perf_counter()
+
+    print(f"{n_types} types:")
+    print(f"{'parse':>18}: {parsed - start:.3f}s")
+    print(f"{'topological order':>18}: {ordered - parsed:.3f}s")
+    print(f"{'generate (total)':>18}: {generated - ordered:.3f}s, {len(sdk.schema) + len(sdk.client)} characters")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
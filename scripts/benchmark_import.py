@@ -0,0 +1,65 @@
+"""
+Measure the time it takes to import a generated schema module with many types, and to render it as GraphQL.
+
+    python scripts/benchmark_import.py [number of types]
+
+Each measurement runs in a fresh interpreter, so that nothing is imported in advance.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+
+
+def make_schema_module(n_types: int) -> str:
+    lines = [
+        "from __future__ import annotations",
+        "from typing import List, Optional",
+        "from cognite.dm_clients.custom_types import Timestamp",
+        "from cognite.dm_clients.domain_modeling import DomainModel, Schema",
+        "bench_schema: Schema[DomainModel] = Schema()",
+    ]
+    for i in range(n_types):
+        related = f"    related: Optional[List[Optional[Type{i - 1}]]] = []" if i else ""
+        root = "(root_type=True)" if i == n_types - 1 else ""
+        lines.append(
+            textwrap.dedent(
+                f"""
+                @bench_schema.register_type{root}
+                class Type{i}(DomainModel):
+                    name: str
+                    created: Optional[Timestamp] = None
+                """
+            )
+            + related
+        )
+    lines.append("bench_schema.close()")
+    return "\n".join(lines)
+
+
+def measure(code: str, pythonpath: str) -> float:
+    timed = f"import time\nstart = time.perf_counter()\n{code}\nprint(time.perf_counter() - start)"
+    result = subprocess.run(
+        [sys.executable, "-c", timed],
+        capture_output=True,
+        check=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": f"{pythonpath}{os.pathsep}{REPO_ROOT}"},
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main(n_types: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        (Path(tmp_dir) / "bench_schema.py").write_text(make_schema_module(n_types))
+        import_seconds = measure("import bench_schema", tmp_dir)
+        render_seconds = measure("import bench_schema\nbench_schema.bench_schema.as_str()", tmp_dir)
+    print(f"{n_types} types: import {import_seconds:.3f}s, import and render GraphQL {render_seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,40 @@
+"""
+Compare time and memory of reading items as DomainModels (validated and `construct`ed) and as ReadOnlyModels.
+
+    PYTHONPATH=. python scripts/benchmark_read_only.py [number of items]
+"""
+import sys
+import time
+import tracemalloc
+
+from cognite.dm_clients.domain_modeling.read_only_model import make_read_only_type
+from examples.cinematography_domain.schema import Movie
+
+
+def main(n_items: int) -> None:
+    properties = [
+        {"title": f"Movie {i}", "genres": ["drama"], "release": "1942-11-26T00:00:00Z", "meta": {"rank": i}}
+        for i in range(n_items)
+    ]
+    relationships = {"director": None, "actors": None, "producers": None}
+    movie_read_only = make_read_only_type(Movie)
+
+    runs = {
+        "DomainModel": lambda: [Movie(externalId="movie", **props, **relationships) for props in properties],
+        "DomainModel.construct": lambda: [
+            Movie.construct(externalId="movie", **props, **relationships) for props in properties
+        ],
+        "ReadOnlyModel": lambda: [movie_read_only._from_properties("movie", props) for props in properties],
+    }
+    for name, run in runs.items():
+        tracemalloc.start()
+        start = time.perf_counter()
+        items = run()
+        elapsed = time.perf_counter() - start
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:>22}: {elapsed:.3f}s, {size / 2**20:.1f} MiB for {len(items)} items")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,40 @@
+"""
+Compare rendering schemas of increasing size as GraphQL, natively and with Strawberry (and check the output matches).
+
+    python scripts/benchmark_render.py [number of types ...]
+"""
+import sys
+import tempfile
+import time
+from importlib import import_module
+from pathlib import Path
+
+from benchmark_import import make_schema_module
+
+
+def main(sizes: list) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sys.path.insert(0, tmp_dir)
+        for n_types in sizes:
+            module_name = f"bench_schema_{n_types}"
+            (Path(tmp_dir) / f"{module_name}.py").write_text(make_schema_module(n_types))
+            schema = import_module(module_name).bench_schema
+
+            start = time.perf_counter()
+            native = schema.as_str()
+            native_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            try:
+                with_strawberry = schema._as_str_with_strawberry()
+            except (RecursionError, TypeError) as error:  # deeply nested schemas exceed the recursion limit
+                print(f"{n_types:>5} types: native {native_seconds:.3f}s, strawberry failed: {type(error).__name__}")
+                continue
+            strawberry_seconds = time.perf_counter() - start
+
+            if native != with_strawberry:
+                raise SystemExit(f"Output differs for {n_types} types!")
+            print(f"{n_types:>5} types: native {native_seconds:.3f}s, strawberry {strawberry_seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10, 100, 300, 1000])
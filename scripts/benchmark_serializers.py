@@ -0,0 +1,49 @@
+"""
+Compare the generated (`to_node_properties`, `from_node_properties`) and generic serialization of items.
+
+    PYTHONPATH=. python scripts/benchmark_serializers.py [number of items]
+"""
+import sys
+import time
+
+from cognite.dm_clients.domain_modeling.testing import create_test_client_factory
+from examples.cinematography_domain.client import CineClient
+from examples.cinematography_domain.schema import Movie, Person, cine_schema
+
+
+def main(n_items: int) -> None:
+    director = Person(externalId="person1", name="Michael Curtiz")
+    movies = [
+        Movie(
+            externalId=f"movie{i}",
+            title=f"Movie {i}",
+            genres=["drama"],
+            director=director,
+            release="1942-11-26T00:00:00Z",
+            meta={"rank": i},
+        )
+        for i in range(n_items)
+    ]
+    properties = [
+        {"title": f"Movie {i}", "genres": ["drama"], "release": "1942-11-26T00:00:00Z"} for i in range(n_items)
+    ]
+    relationships = {"director": None, "actors": None, "producers": None}
+
+    with create_test_client_factory(CineClient, cine_schema) as client:
+        api = client.movie
+        timings = {
+            "to node, generic": lambda: [api._generic_node_properties(movie) for movie in movies],
+            "to node, generated": lambda: [Movie.to_node_properties(movie, api.space_id) for movie in movies],
+            "from node, generic": lambda: [Movie(externalId="movie", **props, **relationships) for props in properties],
+            "from node, generated": lambda: [
+                Movie.from_node_properties("movie", {**props, **relationships}) for props in properties
+            ],
+        }
+        for name, run in timings.items():
+            start = time.perf_counter()
+            run()
+            print(f"{name:>22}: {time.perf_counter() - start:.3f}s for {n_items} items")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,57 @@
+from cognite.client import global_config
+from cognite.client._http_client import get_global_requests_session
+
+from cognite.dm_clients.cdf.client_registry import ClientRegistry, set_connection_pool_size
+from cognite.dm_clients.cdf.get_client import CogniteConfig
+
+
+def make_cognite_config(**kwargs) -> CogniteConfig:
+    return CogniteConfig(
+        project="proj",
+        cdf_cluster="cluster",
+        tenant_id="tenant",
+        client_id="id",
+        client_secret="secret",
+        **kwargs,
+    )
+
+
+def test_client_config_shared_for_equal_settings():
+    registry = ClientRegistry()
+
+    config = registry.get_client_config(make_cognite_config())
+
+    assert registry.get_client_config(make_cognite_config()) is config
+    assert registry.get_client_config(make_cognite_config(client_name="other")) is not config
+
+
+def test_client_shared_per_config(mocker):
+    mocker.patch("cognite.dm_clients.cdf.client_registry.CogniteClientDmV3", side_effect=lambda _: mocker.Mock())
+    registry = ClientRegistry()
+    config = registry.get_client_config(make_cognite_config())
+
+    client = registry.get_client(config)
+
+    assert registry.get_client(config) is client
+    registry.discard(config)
+    assert registry.get_client(config) is not client
+
+
+def test_set_connection_pool_size():
+    original_size = global_config.max_connection_pool_size
+    try:
+        set_connection_pool_size(7)
+        assert get_global_requests_session().get_adapter("https://x.cognitedata.com")._pool_maxsize == 7
+    finally:
+        set_connection_pool_size(original_size)
+
+
+def test_set_connection_pool_size_without_sdk_session(mocker, caplog):
+    mocker.patch("cognite.dm_clients.cdf.client_registry.get_global_requests_session", None)
+    original_size = global_config.max_connection_pool_size
+    try:
+        set_connection_pool_size(7)
+        assert global_config.max_connection_pool_size == 7
+        assert "connection pool size only applies to sessions created from now on" in caplog.text
+    finally:
+        global_config.max_connection_pool_size = original_size
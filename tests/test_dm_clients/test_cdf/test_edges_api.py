@@ -0,0 +1,52 @@
+import pytest
+
+from cognite.dm_clients.cdf.client_dm_v3 import EdgesAPI
+from tests.test_dm_clients.test_cdf._utils import *  # noqa
+
+
+@pytest.fixture
+def mock_view(mocker):
+    return mocker.Mock(
+        space="mockerspace",
+        externalId="Movie",
+        version="1",
+        properties={
+            "actors": {"type": {"space": "mockerspace", "externalId": "Movie.actors"}, "direction": "outwards"}
+        },
+    )
+
+
+@pytest.fixture
+def make_api(mocker, make_cognite_client):
+    def _make_api(responses):
+        return EdgesAPI(
+            config=mocker.MagicMock(project="mock_proj"),
+            api_version="mock_api_version",
+            cognite_client=make_cognite_client(responses),
+        )
+
+    return _make_api
+
+
+def test_list_inwards(mock_view, make_api):
+    mock_api = make_api([{"items": []}])
+    value = mock_api.list(mock_view, ["actors"], end_external_ids=["person5"], limit=None)
+    assert value == []
+    mock_api._cognite_client.post.assert_called_once_with(
+        "/api/v1/projects/mock_proj/models/instances/list",
+        json={
+            "instanceType": "edge",
+            "filter": {
+                "and": [
+                    {"in": {"property": ["edge", "type"], "values": [["mockerspace", "Movie.actors"]]}},
+                    {"in": {"property": ["edge", "endNode"], "values": [["mockerspace", "person5"]]}},
+                ],
+            },
+        },
+    )
+
+
+def test_list_inwards_empty(mock_view, make_api):
+    mock_api = make_api([])
+    assert mock_api.list(mock_view, ["actors"], end_external_ids=[]) == []
+    mock_api._cognite_client.post.assert_not_called()
@@ -0,0 +1,73 @@
+import time
+
+from cognite.client.credentials import OAuthClientCredentials
+
+from cognite.dm_clients.cdf.get_client import CogniteConfig, PrefetchingCredentials, TokenFileCache, get_client_config
+
+
+def make_oauth_credentials(mocker, lifetime: float = 3600):
+    tokens = iter(f"token{i}" for i in range(100))
+    credentials = mocker.Mock(token_url="https://token.url", client_id="id", scopes=["scope"])
+    credentials._refresh_access_token.side_effect = lambda: (next(tokens), time.time() + lifetime)
+    return credentials
+
+
+def test_token_fetched_once(mocker):
+    oauth_credentials = make_oauth_credentials(mocker)
+    credentials = PrefetchingCredentials(oauth_credentials, prefetch_seconds=0)
+
+    assert credentials.authorization_header() == ("Authorization", "Bearer token0")
+    assert credentials.authorization_header() == ("Authorization", "Bearer token0")
+    oauth_credentials._refresh_access_token.assert_called_once()
+
+
+def test_token_prefetched_in_background(mocker):
+    oauth_credentials = make_oauth_credentials(mocker, lifetime=0.2)
+    credentials = PrefetchingCredentials(oauth_credentials, prefetch_seconds=300)
+    try:
+        time.sleep(0.5)  # short-lived tokens are refreshed half-way through their lifetime
+        assert oauth_credentials._refresh_access_token.call_count >= 3
+        assert credentials.authorization_header()[1] != "Bearer token0"
+    finally:
+        credentials.close()
+
+
+def test_token_shared_through_file_cache(mocker, tmp_path):
+    first = make_oauth_credentials(mocker)
+    second = make_oauth_credentials(mocker)
+    token_cache = TokenFileCache(tmp_path / "tokens.json")
+
+    PrefetchingCredentials(first, prefetch_seconds=0, token_cache=token_cache).authorization_header()
+    header = PrefetchingCredentials(second, prefetch_seconds=0, token_cache=token_cache).authorization_header()
+
+    assert header == ("Authorization", "Bearer token0")
+    second._refresh_access_token.assert_not_called()
+    assert oct((tmp_path / "tokens.json").stat().st_mode & 0o777) == "0o600"
+
+
+def test_prefetching_is_opt_in(tmp_path):
+    settings = dict(project="proj", cdf_cluster="cluster", tenant_id="tenant", client_id="id", client_secret="secret")
+
+    assert type(get_client_config(CogniteConfig(**settings)).credentials) is OAuthClientCredentials
+    credentials = get_client_config(
+        CogniteConfig(**settings, shared_token_cache_path=tmp_path / "tokens.json")
+    ).credentials
+    assert isinstance(credentials, PrefetchingCredentials)
+    assert credentials.prefetch_seconds == 0 and credentials._timer is None
+    assert credentials.token_cache.path == tmp_path / "tokens.json"
+
+
+def test_prefetching_falls_back_without_sdk_support(mocker, tmp_path, caplog):
+    mocker.patch.object(PrefetchingCredentials, "is_supported", return_value=False)
+    settings = dict(project="proj", cdf_cluster="cluster", tenant_id="tenant", client_id="id", client_secret="secret")
+
+    config = get_client_config(CogniteConfig(**settings, token_prefetch_seconds=300))
+
+    assert type(config.credentials) is OAuthClientCredentials
+    assert "does not support token prefetching" in caplog.text
+    assert PrefetchingCredentials.is_supported.call_count == 1
+
+
+def test_prefetching_supported_by_sdk():
+    credentials = OAuthClientCredentials(token_url="https://token.url", client_id="id", client_secret="s", scopes=[])
+    assert PrefetchingCredentials.is_supported(credentials)
@@ -0,0 +1,53 @@
+from typing import Any, Callable, Dict, Iterable, Optional
+from unittest.mock import MagicMock
+from urllib.parse import urlparse
+
+import pytest
+from requests.models import Response
+
+from cognite.dm_clients.cdf.data_classes_dm_v3 import View
+from cognite.dm_clients.domain_modeling import DomainClient
+
+RouteT = Callable[[str, Dict[str, Any]], dict]  # (path, payload) -> result
+
+
+def make_response(result: dict) -> Response:
+    response = MagicMock(spec=Response)
+    response.status_code = 200
+    response.json.return_value = result
+    return response
+
+
+class FakeTransport:
+    """
+    Fake DM API transport of a test client. Views are looked up in `views` (by externalId and version), or by the
+    transport of the test client if no views are given. Other POST requests are passed to `route` with their path and
+    payload, which returns the result (or raises, to simulate a failure).
+    """
+
+    def __init__(self, test_client: DomainClient, route: RouteT, views: Optional[Iterable[View]] = None):
+        client = test_client.cognite_client
+        self.route = route
+        self.views = None if views is None else {(view.externalId, view.version): view for view in views}
+        self._get, self._post = client.get, client.post
+        client.get, client.post = self.get, self.post
+
+    def get(self, url: str, **kwargs: Any) -> Response:
+        if self.views is None:
+            return self._get(url, **kwargs)
+        return make_response({"items": [view.dict() for view in self.views.values()]})
+
+    def post(self, url: str, json: Dict[str, Any], **kwargs: Any) -> Response:
+        path = urlparse(url).path
+        if not path.endswith("/views/byids"):
+            return make_response(self.route(path, json))
+        if self.views is None:
+            return self._post(url, json, **kwargs)
+        refs = [(item["externalId"], item["version"]) for item in json["items"]]
+        return make_response({"items": [self.views[ref].dict() for ref in refs if ref in self.views]})
+
+
+@pytest.fixture
+def fake_transport() -> Callable[..., FakeTransport]:
+    """Install a fake transport on a test client: `fake_transport(test_client, route, views)`, see `FakeTransport`."""
+    return FakeTransport
@@ -0,0 +1,101 @@
+import pytest
+
+from cognite.dm_clients import explain
+from cognite.dm_clients.cdf.data_classes_dm_v3 import Edge, RelationReference
+from cognite.dm_clients.domain_modeling.adjacency_index import AdjacencyIndex
+from cognite.dm_clients.domain_modeling.local_index import LocalIndex
+from cognite.dm_clients.domain_modeling.relationship_api import RelationshipAPI
+from cognite.dm_clients.metrics import Metrics
+from examples.cinematography_domain.schema import Movie, Person
+
+
+def make_edge(start: str, end: str, attribute: str = "actors") -> Edge:
+    return Edge(
+        externalId=f"{start}.{attribute}__{end}",
+        space="cine",
+        type=RelationReference(space="cine", externalId=f"Movie.{attribute}"),
+        startNode=RelationReference(space="cine", externalId=start),
+        endNode=RelationReference(space="cine", externalId=end),
+    )
+
+
+@pytest.fixture
+def relationship_api(mocker):
+    domain_model_api = mocker.MagicMock(local_index=None)
+    domain_model_api.domain_client.adjacency_index = AdjacencyIndex()
+    domain_model_api.domain_client.cache.get.return_value = None
+    edges_api = mocker.Mock(metrics=Metrics())
+    edges_api.list.return_value = [make_edge("movie2", "person5"), make_edge("movie3", "person5")]
+    return RelationshipAPI(edges_api, Movie, domain_model_api, mocker.Mock(), 1, "cine")
+
+
+def test_adjacency_index():
+    index = AdjacencyIndex()
+    index.add_edges([make_edge("movie2", "person5"), make_edge("movie3", "person5"), make_edge("movie3", "person7")])
+    assert index.starts("Movie.actors", ["person5"]) == ["movie2", "movie3"]
+    assert index.ends("Movie.actors", ["movie3"]) == ["person5", "person7"]
+    assert index.starts("Movie.producers", ["person5"]) == []
+
+    index.remove_edges([make_edge("movie2", "person5")])
+    assert index.starts("Movie.actors", ["person5"]) == ["movie3"]
+
+
+def test_referencing_served_from_index(relationship_api):
+    assert relationship_api.referencing("actors", ["person5"]) == ["movie2", "movie3"]
+    assert relationship_api.referencing("actors", ["person5"]) == ["movie2", "movie3"]
+    relationship_api.edges_api.list.assert_called_once()
+
+    relationship_api.referencing("actors", ["person5"], use_cache=False)
+    assert relationship_api.edges_api.list.call_count == 2
+
+
+def test_referencing_sees_new_edges(relationship_api):
+    relationship_api.referencing("actors", ["person5"])
+    relationship_api.add("actors", "movie4", ["person5"])
+    relationship_api.domain_model_api.domain_client.clear_graph_cache.assert_called_once()
+    assert relationship_api.referencing("actors", ["person5"]) == ["movie2", "movie3", "movie4"]
+    relationship_api.edges_api.list.assert_called_once()
+
+
+def test_apply_replaces_edges_in_index(relationship_api):
+    relationship_api.edges_api.list.return_value = [make_edge("movie2", "person5"), make_edge("movie2", "person6")]
+    with explain.explain(dry_run=True):
+        relationship_api.apply("actors", "movie2", ["person6", "person7"])
+    index = relationship_api.domain_model_api.domain_client.adjacency_index
+    assert index.ends("Movie.actors", ["movie2"]) == []  # nothing was written
+    relationship_api.domain_model_api.domain_client.clear_graph_cache.assert_not_called()
+
+    relationship_api.apply("actors", "movie2", ["person6", "person7"])
+    assert index.ends("Movie.actors", ["movie2"]) == ["person6", "person7"]
+    relationship_api.domain_model_api.domain_client.clear_graph_cache.assert_called_once()
+
+
+def test_apply_replaces_related_items(relationship_api):
+    relationship_api.edges_api.list.return_value = [make_edge("movie2", "person5"), make_edge("movie2", "person6")]
+    movie = Movie(
+        externalId="movie2",
+        title="Casablanca",
+        genres=["drama"],
+        actors=[Person(externalId=ext_id, name=ext_id) for ext_id in ["person5", "person6"]],
+    )
+    local_index = LocalIndex(Movie, inverted_fields=["actors"])
+    local_index.add([movie])
+    relationship_api.domain_model_api.local_index = local_index
+    domain_client = relationship_api.domain_model_api.domain_client
+    domain_client.cache.get.return_value = movie
+
+    relationship_api.apply("actors", "movie2", ["person6", "person7"])
+
+    domain_client.cache.set.assert_called_once_with("movie2", movie)
+    assert [actor["externalId"] for actor in movie.actors] == ["person6", "person7"]
+    assert local_index.query(actors__contains="person5") == []
+    assert local_index.query(actors__contains="person7") == [movie]
+    assert domain_client.adjacency_index.ends("Movie.actors", ["movie2"]) == ["person6", "person7"]
+
+
+def test_failed_apply_is_not_indexed(relationship_api):
+    relationship_api.edges_api.apply.side_effect = ConnectionError("unavailable")
+    with pytest.raises(ConnectionError):
+        relationship_api.apply("actors", "movie2", ["person7"])
+    index = relationship_api.domain_model_api.domain_client.adjacency_index
+    assert index.ends("Movie.actors", ["movie2"]) == []
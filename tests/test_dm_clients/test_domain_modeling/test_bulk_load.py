@@ -0,0 +1,118 @@
+from functools import partial
+from typing import Any, Dict, Iterator, List, Optional
+
+import pytest
+
+from cognite.dm_clients.domain_modeling.bulk import Checkpoint, Progress, content_external_id
+from cognite.dm_clients.domain_modeling.testing import create_test_client_factory
+from examples.cinematography_domain.client import CineClient
+from examples.cinematography_domain.schema import Movie, Person, cine_schema
+
+
+class FakeDM:
+    def __init__(self, fail_on_apply: Optional[int] = None):
+        self.applied: List[List[str]] = []
+        self.fail_on_apply = fail_on_apply
+
+    def route(self, path: str, payload: Dict[str, Any]) -> dict:
+        if len(self.applied) == self.fail_on_apply:
+            raise ConnectionError("interrupted")
+        self.applied.append([item["externalId"] for item in payload["items"]])
+        return {"items": []}
+
+
+def persons(consumed: List[int]) -> Iterator[Person]:
+    for i in range(5):
+        consumed.append(i)
+        yield Person(name=f"Person {i}")
+
+
+def test_bulk_load_resumes_from_checkpoint(tmp_path, fake_transport):
+    checkpoint_path = tmp_path / "checkpoint.json"
+    fake = FakeDM(fail_on_apply=1)
+    consumed: List[int] = []
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route)
+        with pytest.raises(ConnectionError):
+            test_client.person.bulk_load(
+                persons(consumed), batch_size=2, checkpoint_path=checkpoint_path, checkpoint_key="persons"
+            )
+        assert Checkpoint(checkpoint_path).get("bulk_load Person persons") == 2
+        assert len(consumed) <= 6  # the failed batch, and the one read ahead
+
+        fake.fail_on_apply = None
+        progress = test_client.person.bulk_load(
+            persons([]), batch_size=2, checkpoint_path=checkpoint_path, checkpoint_key="persons", total=5
+        )
+
+    assert Checkpoint(checkpoint_path).get("bulk_load Person persons") is None  # removed when done
+    assert progress.counts == {"items loaded": 3}
+    assert progress.totals == {"items loaded": 3}
+    assert [len(request) for request in fake.applied] == [2, 2, 1]
+    expected_ids = [content_external_id(Person(name=f"Person {i}")) for i in range(5)]
+    assert [ext_id for request in fake.applied for ext_id in request] == expected_ids
+
+
+def test_bulk_load_twice(tmp_path, fake_transport):
+    checkpoint_path = tmp_path / "checkpoint.json"
+    fake = FakeDM(fail_on_apply=1)
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route)
+        load = partial(test_client.person.bulk_load, batch_size=2, checkpoint_path=checkpoint_path)
+        with pytest.raises(ValueError):
+            load(persons([]))
+        with pytest.raises(ConnectionError):
+            load(persons([]), checkpoint_key="persons")
+        fake.fail_on_apply = None
+        other_progress = load((Person(name=f"Other {i}") for i in range(3)), checkpoint_key="others")
+        resumed = load(persons([]), checkpoint_key="persons")
+        again = load(persons([]), checkpoint_key="persons")
+
+    # another input does not skip the items done in the interrupted load, a completed load starts from the beginning:
+    assert other_progress.counts == {"items loaded": 3}
+    assert resumed.counts == {"items loaded": 3}
+    assert again.counts == {"items loaded": 5}
+    assert Checkpoint(checkpoint_path).get("bulk_load Person persons") is None
+
+
+def test_bulk_load_in_session(fake_transport):
+    fake = FakeDM()
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route)
+        with test_client.session():
+            test_client.movie.apply([Movie(externalId="movie1", title="Casablanca", genres=["drama"])])
+            progress = test_client.person.bulk_load(persons([]), batch_size=2)
+            assert len(fake.applied) == 3  # flushed after each batch, with the pending writes
+            test_client.movie.apply([Movie(externalId="movie2", title="Thor", genres=["action"])])
+
+    assert progress.counts == {"items loaded": 5}
+    assert [len(request) for request in fake.applied] == [3, 2, 1, 1]
+    assert fake.applied[0][0] == "movie1" and fake.applied[-1] == ["movie2"]
+
+
+def test_content_external_ids(fake_transport):
+    def movie() -> Movie:
+        return Movie(title="Casablanca", genres=["drama"], director=Person(name="Michael Curtiz"))
+
+    fake = FakeDM()
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route)
+        test_client.movie.bulk_load([movie()])
+        test_client.movie.bulk_load([movie()])
+
+    # the same ids in both runs, also for nested items, written in one mixed-type request per run:
+    assert len(fake.applied) == 2
+    assert fake.applied[0] == fake.applied[1]
+    director_id, movie_id = fake.applied[0]
+    assert director_id == content_external_id(Person(name="Michael Curtiz"))
+    assert movie_id.startswith("Movie_")
+    assert content_external_id(Person(name="A")) != content_external_id(Person(name="B"))
+
+
+def test_progress_eta():
+    progress = Progress(totals={"items loaded": 100})
+    assert progress.eta("items loaded") is None
+    progress.add("items loaded", 50)
+    assert progress.eta("items loaded") > 0
+    assert "items loaded: 50/100" in str(progress)
+    assert "ETA" in str(progress)
@@ -0,0 +1,71 @@
+from typing import Optional
+from unittest.mock import MagicMock
+
+import pytest
+from pydantic import Field
+
+from cognite.dm_clients.cdf.client_dm_v3 import ContainersAPI
+from cognite.dm_clients.cdf.data_classes_dm_v3 import Container
+from cognite.dm_clients.domain_modeling import DomainModel, Schema
+from cognite.dm_clients.domain_modeling.containers import apply_container_hints, container_hints
+
+schema: Schema[DomainModel] = Schema()
+
+
+@schema.register_type
+class Tag(DomainModel):
+    name: str
+
+
+@schema.register_type(root_type=True)
+class Item(DomainModel):
+    title: str = Field(..., index=True)
+    code: Optional[str] = Field(None, index=True, unique=True)
+    tag: Optional[Tag] = None
+
+
+schema.close()
+
+
+def container(external_id: str, **kwargs) -> Container:
+    return Container(space="space", externalId=external_id, properties={}, **kwargs)
+
+
+def test_container_hints():
+    assert container_hints(Tag) == ({}, {})
+    assert container_hints(Item) == (
+        {"title_index": {"properties": ["title"]}, "code_index": {"properties": ["code"]}},
+        {"code_unique": {"constraintType": "uniqueness", "properties": ["code"]}},
+    )
+
+
+def test_apply_container_hints_keeps_existing():
+    containers_api = MagicMock(spec=ContainersAPI)
+    existing_index = {"properties": ["title", "code"]}
+    containers_api.retrieve.return_value = [container("Item", indexes={"title_code": existing_index})]
+
+    changed = apply_container_hints(containers_api, schema, "space")
+
+    containers_api.retrieve.assert_called_once_with("space", ["Item"])
+    (applied,) = containers_api.apply.call_args.args[0]
+    assert changed == [applied]
+    assert applied.indexes == {"title_index": {"properties": ["title"]}, "code_index": {"properties": ["code"]}} | {
+        "title_code": existing_index
+    }
+    assert list(applied.constraints) == ["code_unique"]
+
+    containers_api.reset_mock()
+    containers_api.retrieve.return_value = [applied]
+    assert apply_container_hints(containers_api, schema, "space") == []
+    containers_api.apply.assert_not_called()
+
+
+def test_apply_container_hints_dry_run_and_missing():
+    containers_api = MagicMock(spec=ContainersAPI)
+    containers_api.retrieve.return_value = [container("Item")]
+    assert len(apply_container_hints(containers_api, schema, "space", dry_run=True)) == 1
+    containers_api.apply.assert_not_called()
+
+    containers_api.retrieve.return_value = []
+    with pytest.raises(ValueError, match="Containers Item not found"):
+        apply_container_hints(containers_api, schema, "space")
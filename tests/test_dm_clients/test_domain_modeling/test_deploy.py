@@ -0,0 +1,145 @@
+import gzip
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Dict, List, Tuple
+
+import pytest
+from cognite.client import ClientConfig
+from cognite.client.credentials import Token
+
+from cognite.dm_clients.cdf.client_dm_v3 import CogniteClientDmV3
+from cognite.dm_clients.domain_modeling.deploy import deploy, plan_deployment, schema_containers, schema_views
+from examples.cinematography_domain.schema import cine_schema
+
+PROJECT = "project"
+
+
+class StandInDM:
+    """In-memory stand-in for the DM API endpoints used by `deploy`, adding details like the real API does."""
+
+    def __init__(self) -> None:
+        self.stored: Dict[str, Dict[Tuple[str, ...], dict]] = {
+            "spaces": {},
+            "containers": {},
+            "views": {},
+            "datamodels": {},
+        }
+        self.applied: List[Tuple[str, List[str]]] = []
+
+    @staticmethod
+    def _key(resource: str, item: dict) -> Tuple[str, ...]:
+        if resource == "spaces":
+            return (item["space"],)
+        if resource == "containers":
+            return item["space"], item["externalId"]
+        return item["space"], item["externalId"], item.get("version", "")
+
+    def handle(self, resource: str, action: str, items: List[dict]) -> List[dict]:
+        stored = self.stored[resource]
+        if action == "byids":
+            # all versions, unless the version is given:
+            return [item for item in stored.values() if any(ref.items() <= item.items() for ref in items)]
+        self.applied.append((resource, [item.get("externalId", item.get("space")) for item in items]))
+        for item in items:
+            stored[self._key(resource, item)] = self._with_details(resource, item)
+        return items
+
+    def _with_details(self, resource: str, item: dict) -> dict:
+        item = {**item, "createdTime": 1, "lastUpdatedTime": 1}
+        if resource == "containers":
+            item["properties"] = {
+                name: {**prop, "autoIncrement": False, "type": {**prop["type"], "collation": "ucs_basic"}}
+                for name, prop in item["properties"].items()
+            }
+        if resource == "datamodels":
+            item["views"] = [
+                {"space": view["space"], "externalId": view["externalId"], "version": view["version"], "type": "view"}
+                for view in item["views"]
+            ]
+        return item
+
+
+@pytest.fixture
+def stand_in():
+    dm = StandInDM()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):  # noqa: N802
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            payload = json.loads(gzip.decompress(body) if self.headers.get("Content-Encoding") == "gzip" else body)
+            path = self.path.split("?")[0].split(f"/api/v1/projects/{PROJECT}/models/")[1].split("/")
+            items = dm.handle(path[0], path[1] if len(path) > 1 else "apply", payload["items"])
+            body = json.dumps({"items": items}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    config = ClientConfig(
+        client_name="test",
+        project=PROJECT,
+        credentials=Token("token"),
+        base_url=f"http://127.0.0.1:{server.server_address[1]}",
+    )
+    yield dm, CogniteClientDmV3(config)
+    server.shutdown()
+
+
+def test_schema_definitions():
+    containers = {container.externalId: container for container in schema_containers(cine_schema, "space")}
+    views = {view.externalId: view for view in schema_views(cine_schema, "space", 1)}
+
+    assert containers["Movie"].properties["title"].dict(exclude_none=True) == {
+        "type": {"type": "text", "list": False},
+        "nullable": False,
+    }
+    assert containers["Movie"].properties["genres"].type == {"type": "text", "list": True}
+    assert containers["Movie"].properties["director"].type == {"type": "direct"}
+    assert "actors" not in containers["Movie"].properties
+    assert views["Movie"].properties["actors"] == {
+        "type": {"space": "space", "externalId": "Movie.actors"},
+        "source": {"space": "space", "externalId": "Person", "version": "1", "type": "view"},
+        "direction": "outwards",
+    }
+    assert views["Movie"].properties["director"]["source"]["externalId"] == "Person"
+
+
+def test_deploy_applies_only_changes(stand_in):
+    dm, client = stand_in
+
+    plan = plan_deployment(client, cine_schema, "space", "cine", 1)
+    assert plan.summary() == [
+        "space space",
+        "container Person",
+        "container Movie",
+        "view Person/1",
+        "view Movie/1",
+        "data model cine/1",
+    ]
+    deploy(client, plan)
+    assert sorted(resource for resource, _ in dm.applied) == [
+        "containers",
+        "containers",
+        "datamodels",
+        "spaces",
+        "views",
+    ]
+
+    dm.applied.clear()
+    plan = plan_deployment(client, cine_schema, "space", "cine", 1)
+    assert plan.is_empty
+    assert len(plan.unchanged) == 5
+
+    # a view which differs from the local one is re-applied, nothing else:
+    del dm.stored["views"][("space", "Person", "1")]["properties"]["name"]
+    plan = plan_deployment(client, cine_schema, "space", "cine", 1)
+    assert plan.summary() == ["view Person/1"]
+    deploy(client, plan)
+    assert dm.applied == [("views", ["Person"])]
@@ -0,0 +1,35 @@
+from unittest.mock import patch
+
+from cognite.dm_clients.cdf.client_dm_v3 import ViewsAPI
+from cognite.dm_clients.cdf.view_cache import ViewCache
+from cognite.dm_clients.domain_modeling.testing import Config, create_test_client_factory
+from examples.cinematography_domain.client import CineClient
+from examples.cinematography_domain.schema import Movie, Person, cine_schema
+
+
+def test_apis_created_on_first_use():
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        with patch.object(ViewsAPI, "retrieve", wraps=test_client._client.views.retrieve) as retrieve:
+            assert "movie" not in vars(test_client)
+            movie_api = test_client.movie
+            assert test_client.movie is movie_api
+            assert test_client.get_api_for_domain_model(Movie) is movie_api
+
+    retrieve.assert_called_once_with(Config.space, ["Movie"], Config.version)
+    assert movie_api.view.externalId == "Movie"
+    assert "person" not in vars(test_client)
+
+
+def test_view_cache(tmp_path):
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        test_client._view_cache = ViewCache(tmp_path, Config.project, Config.space, Config.data_model, Config.version)
+        test_client.preload()
+        assert test_client._view_cache.path.exists()
+
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        test_client._view_cache = ViewCache(tmp_path, Config.project, Config.space, Config.data_model, Config.version)
+        with patch.object(ViewsAPI, "retrieve") as retrieve:
+            person_api = test_client.get_api_for_domain_model(Person)
+
+    retrieve.assert_not_called()
+    assert person_api.view.externalId == "Person"
@@ -0,0 +1,172 @@
+import pytest
+
+from cognite.dm_clients.cdf.data_classes_dm_v3 import Node, View
+from cognite.dm_clients.custom_types import JSONObject, Timestamp
+from cognite.dm_clients.domain_modeling import ReadOnlyModel
+from cognite.dm_clients.domain_modeling.read_only_model import make_read_only_type
+from cognite.dm_clients.domain_modeling.testing import Config, create_test_client_factory
+from examples.cinematography_domain.client import CineClient
+from examples.cinematography_domain.schema import Movie, Person, cine_schema
+
+
+def make_movie() -> Movie:
+    return Movie(
+        externalId="movie1",
+        title="Casablanca",
+        genres=["drama", "romance"],
+        director=Person(externalId="person1", name="Michael Curtiz"),
+        actors=[Person(externalId="person2", name="Ingrid Bergman")],
+        release="1942-11-26T00:00:00Z",
+        meta={"imdb": "tt0034583"},
+    )
+
+
+def test_generated_node_properties_match_generic():
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        movie_api = test_client.movie
+        movie = make_movie()
+
+        generated = movie_api._node_properties(movie)
+        generic = movie_api._generic_node_properties(movie)
+
+    assert movie_api._to_node_properties is not None
+    assert generated == generic
+    assert generated["director"] == {"space": movie_api.space_id, "externalId": "person1"}
+    assert "actors" not in generated
+
+
+def test_generated_item_from_node_matches_generic():
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        movie_api = test_client.movie
+        node = Node(
+            externalId="movie1",
+            space=movie_api.space_id,
+            version="1",
+            properties={
+                movie_api.space_id: {
+                    f"{movie_api.view.externalId}/{movie_api.view.version}": {
+                        "title": "Casablanca",
+                        "genres": ["drama"],
+                        "release": "1942-11-26T00:00:00.123456Z",
+                        "meta": {"imdb": "tt0034583"},
+                    }
+                }
+            },
+        )
+        update = {"director": None, "actors": None, "producers": None}
+
+        generated = movie_api._make_item_from_node(node, update)
+        generic = Movie(externalId="movie1", **{**node.get_properties(movie_api.view), **update})
+
+    assert generated == generic
+    assert isinstance(generated.release, Timestamp) and generated.release == "1942-11-26T00:00:00.123Z"
+    assert isinstance(generated.meta, JSONObject)
+
+
+def test_list_read_only():
+    node = {
+        "instanceType": "node",
+        "externalId": "movie1",
+        "space": "IntegrationTestsImmutable",
+        "version": "1",
+        "properties": {
+            "IntegrationTestsImmutable": {
+                "Movie": {
+                    "title": "Casablanca",
+                    "genres": ["drama"],
+                    "director": {"space": "IntegrationTestsImmutable", "externalId": "person1"},
+                    "release": "1942-11-26T00:00:00Z",
+                }
+            }
+        },
+    }
+    with create_test_client_factory(CineClient, cine_schema, return_jsons=[[node]]) as test_client:
+        (movie,) = test_client.movie.list(read_only=True)
+
+    assert isinstance(movie, ReadOnlyModel)
+    assert type(movie) is cine_schema.get_read_only_type(Movie)
+    assert movie.externalId == "movie1"
+    assert movie.title == "Casablanca"
+    assert movie.director == "person1"
+    assert movie.release == "1942-11-26T00:00:00Z"
+    assert movie.actors is None
+    assert not hasattr(movie, "__dict__")
+    with pytest.raises(AttributeError):
+        movie.title = "Casablanca 2"
+
+
+def test_read_only_model():
+    person_read_only = make_read_only_type(Person)
+    person = person_read_only("person1", name="Michael Curtiz")
+
+    assert person_read_only.__name__ == "PersonReadOnly"
+    assert person.dict() == {"externalId": "person1", "name": "Michael Curtiz"}
+    assert person == person_read_only._from_properties("person1", {"name": "Michael Curtiz"})
+    assert repr(person) == "PersonReadOnly(externalId='person1', name='Michael Curtiz')"
+    with pytest.raises(AttributeError):
+        del person.name
+
+
+def test_refresh_local_index_reads_all_pages():
+    def person(external_id: str, name: str) -> dict:
+        properties = {Config.space: {f"Person/{Config.version}": {"name": name}}}
+        return {"instanceType": "node", "externalId": external_id, "space": Config.space, "properties": properties}
+
+    pages = [
+        {"items": [person("person1", "Ingrid Bergman")], "nextCursor": "page2"},
+        {"items": [person("person2", "Humphrey Bogart")]},
+    ]
+    with create_test_client_factory(CineClient, cine_schema, return_jsons=pages) as test_client:
+        test_client.person.create_local_index(hash_fields=["name"])
+
+        assert [item.externalId for item in test_client.person.local_query()] == ["person1", "person2"]
+        assert test_client.person.local_query(name="Humphrey Bogart")[0].externalId == "person2"
+
+
+def test_refresh_local_index_without_resolving_relationships(fake_transport):
+    space, version = Config.space, str(Config.version)
+    movie_view = View(
+        space=space,
+        externalId="Movie",
+        version=version,
+        properties={
+            "title": {},
+            "director": {},
+            "actors": {"type": {"space": space, "externalId": "Movie.actors"}, "direction": "outwards"},
+            "producers": {"type": {"space": space, "externalId": "Movie.producers"}, "direction": "outwards"},
+        },
+    )
+    person_view = View(space=space, externalId="Person", version=version, properties={"name": {}})
+    properties = {"title": "Casablanca", "genres": ["drama"], "director": {"space": space, "externalId": "person1"}}
+    movie = {"instanceType": "node", "space": space, "externalId": "movie1", "properties": {space: {}}}
+    movie["properties"][space][f"Movie/{version}"] = properties
+    actor_edge = {
+        "instanceType": "edge",
+        "space": space,
+        "externalId": "movie1.actors__person2",
+        "type": {"space": space, "externalId": "Movie.actors"},
+        "startNode": {"space": space, "externalId": "movie1"},
+        "endNode": {"space": space, "externalId": "person2"},
+    }
+    requests = []
+
+    def route(path: str, payload: dict) -> dict:
+        requests.append(payload.get("instanceType"))
+        assert path.endswith("/instances/list"), "related items are not retrieved"
+        return {"items": [movie if payload["instanceType"] == "node" else actor_edge]}
+
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, route, [movie_view, person_view])
+        local_index = test_client.movie.create_local_index(
+            hash_fields=["director"], inverted_fields=["actors"], populate=False
+        )
+        local_index.add([Movie(externalId="movie9", title="Deleted meanwhile", genres=[])])
+        test_client.movie.refresh_local_index()
+
+        (indexed,) = test_client.movie.local_query(director="person1", actors__contains="person2")
+        assert test_client.movie.local_index is local_index
+        assert test_client.movie.local_query(title="Deleted meanwhile") == []
+        assert indexed.externalId == "movie1"
+        assert indexed.director.externalId == "person1" and indexed.director._reference
+        assert indexed.producers is None
+        assert requests == ["node", "edge"]
@@ -0,0 +1,139 @@
+import gzip
+import json
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from cognite.dm_clients.cdf.data_classes_dm_v3 import View
+from cognite.dm_clients.domain_modeling.bulk import Checkpoint
+from cognite.dm_clients.domain_modeling.export import _checkpoint_key, export_space, import_space, iter_export
+from cognite.dm_clients.domain_modeling.testing import create_test_client_factory
+from examples.cinematography_domain.client import CineClient
+from examples.cinematography_domain.schema import cine_schema
+
+SPACE = "source_space"
+
+VIEWS = [
+    View(
+        space=SPACE,
+        externalId="Movie",
+        version="1",
+        properties={
+            "title": {},
+            "director": {},
+            "actors": {"type": {"space": SPACE, "externalId": "Movie.actors"}, "direction": "outwards"},
+        },
+    ),
+    View(space=SPACE, externalId="Person", version="1", properties={"name": {}}),
+]
+
+
+def node(external_id: str, view_ext_id: str, **properties: Any) -> dict:
+    return {
+        "instanceType": "node",
+        "space": SPACE,
+        "externalId": external_id,
+        "properties": {SPACE: {view_ext_id: properties}},
+    }
+
+
+def edge(start: str, end: str) -> dict:
+    return {
+        "instanceType": "edge",
+        "space": SPACE,
+        "externalId": f"{start}.actors__{end}",
+        "type": {"space": SPACE, "externalId": "Movie.actors"},
+        "startNode": {"space": SPACE, "externalId": start},
+        "endNode": {"space": SPACE, "externalId": end},
+        "createdTime": 1,
+    }
+
+
+LIST_PAGES = {
+    ("Movie", None): {
+        "items": [node("movie1", "Movie/1", title="Casablanca", director={"space": SPACE, "externalId": "person1"})],
+        "nextCursor": "movies2",
+    },
+    ("Movie", "movies2"): {"items": [node("movie2", "Movie/1", title="Notorious")]},
+    ("Person", None): {"items": [node("person1", "Person/1", name="Michael Curtiz")]},
+    ("edges", None): {"items": [edge("movie1", "person1")], "nextCursor": "edges2"},
+    ("edges", "edges2"): {"items": [edge("movie2", "person1")]},
+}
+
+
+class FakeDM:
+    def __init__(self, fail_on_apply: Optional[int] = None):
+        self.applied: List[List[dict]] = []
+        self.fail_on_apply = fail_on_apply
+
+    def route(self, path: str, payload: Dict[str, Any]) -> dict:
+        if path.endswith("/list"):
+            source = "edges" if payload["instanceType"] == "edge" else payload["sources"][0]["source"]["externalId"]
+            return LIST_PAGES[(source, payload.get("cursor"))]
+        if len(self.applied) == self.fail_on_apply:
+            raise ConnectionError("interrupted")
+        self.applied.append(payload["items"])
+        return {"items": []}
+
+
+@pytest.fixture
+def exported(tmp_path, fake_transport):
+    path = tmp_path / "export.ndjson.gz"
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, FakeDM().route, VIEWS)
+        progress = export_space(test_client.cognite_client, SPACE, path, version=1, page_size=1)
+    assert progress.counts == {"nodes exported": 3, "edges exported": 2}
+    return path
+
+
+def test_export(exported):
+    with gzip.open(exported, "rt") as file:
+        assert json.loads(next(file)) == {"format": "dm-export", "version": 1, "space": SPACE}
+    lines = list(iter_export(exported))
+    assert [line["externalId"] for line in lines] == [
+        "movie1",
+        "movie2",
+        "person1",
+        "movie1.actors__person1",
+        "movie2.actors__person1",
+    ]
+    assert lines[0]["view"] == {"space": SPACE, "externalId": "Movie", "version": "1"}
+    assert lines[0]["properties"]["title"] == "Casablanca"
+    assert "createdTime" not in lines[3]
+
+
+def test_import_to_other_space_and_resume(exported, tmp_path, fake_transport):
+    checkpoint = Checkpoint(tmp_path / "checkpoint.json")
+    fake = FakeDM(fail_on_apply=2)
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route, VIEWS)
+        client = test_client.cognite_client
+        with pytest.raises(ConnectionError):
+            import_space(client, exported, "target_space", batch_size=2, chunk_size=1, checkpoint=checkpoint)
+        key = _checkpoint_key(exported, "target_space")
+        assert checkpoint.get(key) == 2
+        assert _checkpoint_key(exported, SPACE) != key
+
+        fake.fail_on_apply = None
+        progress = import_space(client, exported, "target_space", batch_size=2, chunk_size=1, checkpoint=checkpoint)
+        # the checkpoint of a completed import is removed, so importing the file again imports all of it:
+        assert checkpoint.get(key) is None
+        assert Checkpoint(tmp_path / "checkpoint.json").get(key) is None
+        again = import_space(client, exported, "target_space", batch_size=2, chunk_size=1, checkpoint=checkpoint)
+        assert again.counts == {"nodes imported": 3, "edges imported": 2}
+        del fake.applied[-5:]
+
+    assert progress.counts == {"nodes imported": 1, "edges imported": 2}
+    items = [item for request in fake.applied for item in request]
+    assert [item["externalId"] for item in items] == [
+        "movie1",
+        "movie2",
+        "person1",
+        "movie1.actors__person1",
+        "movie2.actors__person1",
+    ]
+    assert all(item["space"] == "target_space" for item in items)
+    movie1 = items[0]
+    assert movie1["sources"][0]["source"]["space"] == "target_space"
+    assert movie1["sources"][0]["properties"]["director"] == {"space": "target_space", "externalId": "person1"}
+    assert items[3]["type"] == {"space": "target_space", "externalId": "Movie.actors"}
@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from cognite.dm_clients.cdf.data_classes_dm_v3 import View
+from cognite.dm_clients.domain_modeling.filters import FieldRef
+from cognite.dm_clients.domain_modeling.testing import create_test_client_factory
+from examples.cinematography_domain.client import CineClient, MovieFields
+from examples.cinematography_domain.schema import Person, cine_schema
+
+VIEW = View(space="space", externalId="Movie", version="1", name="Movie", properties={})
+
+
+def prop(name: str) -> list:
+    return ["space", "Movie/1", name]
+
+
+def test_field_operators():
+    assert (MovieFields.title == "Thor").dump(VIEW, "space") == {"equals": {"property": prop("title"), "value": "Thor"}}
+    assert (MovieFields.title != "Thor").dump(VIEW, "space") == {
+        "not": {"equals": {"property": prop("title"), "value": "Thor"}}
+    }
+    assert (MovieFields.release >= datetime(2000, 1, 1, tzinfo=timezone.utc)).dump(VIEW, "space") == {
+        "range": {"property": prop("release"), "gte": "2000-01-01T00:00:00.000+00:00"}
+    }
+    assert MovieFields.genres.contains("drama").dump(VIEW, "space") == {
+        "containsAny": {"property": prop("genres"), "values": ["drama"]}
+    }
+    assert MovieFields.title.prefix("Thor").dump(VIEW, "space") == {
+        "prefix": {"property": prop("title"), "value": "Thor"}
+    }
+    assert MovieFields.meta.exists().dump(VIEW, "space") == {"exists": {"property": prop("meta")}}
+
+
+def test_direct_relation_values():
+    director = Person(externalId="person1", name="Michael Curtiz")
+
+    assert MovieFields.director.in_([director, "person2"]).dump(VIEW, "space") == {
+        "in": {
+            "property": prop("director"),
+            "values": [{"space": "space", "externalId": "person1"}, {"space": "space", "externalId": "person2"}],
+        }
+    }
+
+
+def test_combined_filters_are_flattened():
+    filter_ = (MovieFields.release > "2000") & (MovieFields.release < "2010") & ~MovieFields.genres.contains("drama")
+
+    dumped = filter_.dump(VIEW, "space")
+
+    assert list(dumped) == ["and"]
+    assert [list(item)[0] for item in dumped["and"]] == ["range", "range", "not"]
+    assert filter_.field_names() == {"release", "genres"}
+
+
+def test_list_and_iter_list_send_filter():
+    pages = [
+        {"items": [], "nextCursor": "cursor1"},
+        {"items": []},
+    ]
+    with create_test_client_factory(CineClient, cine_schema, return_jsons=pages) as test_client:
+        posted = []
+        post = test_client.cognite_client.post
+        test_client.cognite_client.post = lambda url, json, **kwargs: posted.append(json) or post(url, json, **kwargs)
+        movie_api = test_client.movie
+
+        items = list(movie_api.iter_list(filter_=MovieFields.title == "Thor", chunk_size=10))
+        with pytest.raises(ValueError, match="one-to-many"):
+            movie_api.list(filter_=FieldRef("actors").contains("person1"))
+        with pytest.raises(ValueError, match="no field"):
+            movie_api.list(filter_=FieldRef("rating") > 5)
+
+    list_payloads = [payload for payload in posted if payload.get("instanceType") == "node"]
+    assert items == []
+    assert [payload.get("cursor") for payload in list_payloads] == [None, "cursor1"]
+    assert all(payload["limit"] == 10 for payload in list_payloads)
+    assert list_payloads[0]["filter"] == {
+        "equals": {"property": [movie_api.view.space, f"Movie/{movie_api.view.version}", "title"], "value": "Thor"}
+    }
@@ -0,0 +1,111 @@
+import pytest
+
+from cognite.dm_clients.custom_types import Timestamp
+from cognite.dm_clients.domain_modeling.local_index import LocalIndex
+from examples.cinematography_domain.schema import Movie, Person
+
+
+@pytest.fixture
+def movies():
+    return [
+        Movie(
+            externalId="movie1",
+            title="Casablanca",
+            genres=["drama"],
+            release=Timestamp("1942-11-26T11:12:13Z"),
+            director=Person(externalId="person1", name="Michael Curtiz"),
+        ),
+        Movie(
+            externalId="movie2",
+            title="Thor",
+            genres=["action", "fantasy"],
+            release=Timestamp("2011-04-17T00:00:00+10"),
+            director=Person(externalId="person4", name="Kenneth Branagh"),
+        ),
+        Movie(
+            externalId="movie3",
+            title="Thor: Ragnarok",
+            genres=["action", "fantasy"],
+            release=Timestamp("2017-10-10T00:00:00-08"),
+        ),
+    ]
+
+
+@pytest.fixture
+def index(movies):
+    index_ = LocalIndex(Movie, hash_fields=["title", "director"], sorted_fields=["release"], inverted_fields=["genres"])
+    index_.add(movies)
+    return index_
+
+
+def ext_ids(items):
+    return [item.externalId for item in items]
+
+
+def test_hash_lookup(index):
+    assert ext_ids(index.query(title="Thor")) == ["movie2"]
+    assert ext_ids(index.query(director="person1")) == ["movie1"]
+    assert ext_ids(index.query(director__in=["person1", "person4"])) == ["movie1", "movie2"]
+
+
+def test_range_lookup(index):
+    assert ext_ids(index.query(release__gte="2011-04-16T14:00:00Z")) == ["movie2", "movie3"]
+    assert ext_ids(index.query(release__gt="2011-04-16T14:00:00Z")) == ["movie3"]
+    assert ext_ids(index.query(release__lt="2011-04-16T14:00:00Z")) == ["movie1"]
+
+
+def test_timestamp_strings_in_equality(index):
+    assert ext_ids(index.query(release="1942-11-26T11:12:13Z")) == ["movie1"]
+    assert ext_ids(index.query(release__in=["1942-11-26T11:12:13Z", "2011-04-16T14:00:00Z"])) == ["movie1", "movie2"]
+    hash_index = LocalIndex(Movie, hash_fields=["release"])
+    hash_index.add(index.query())
+    assert ext_ids(hash_index.query(release="2011-04-16T14:00:00Z")) == ["movie2"]
+
+
+def test_inverted_lookup(index):
+    assert ext_ids(index.query(genres__contains="action")) == ["movie2", "movie3"]
+    assert ext_ids(index.query(genres__contains_any=["drama", "fantasy"])) == ["movie1", "movie2", "movie3"]
+
+
+def test_combined_and_unindexed(index):
+    assert ext_ids(index.query(genres__contains="action", title__in=["Thor: Ragnarok"])) == ["movie3"]
+    # "meta" is not indexed, so it is evaluated by scanning:
+    assert ext_ids(index.query(genres__contains="fantasy", meta=None)) == ["movie2", "movie3"]
+
+
+def test_update_and_remove(index, movies):
+    index.add([Movie(externalId="movie2", title="Thor (2011)", genres=["action"])])
+    assert index.query(title="Thor") == []
+    assert ext_ids(index.query(genres__contains="fantasy")) == ["movie3"]
+    assert ext_ids(index.query(release__gte="2000-01-01T00:00:00Z")) == ["movie3"]
+
+    index.remove(["movie3"])
+    assert index.query(genres__contains="fantasy") == []
+    assert len(index) == 2
+
+
+def test_batch_update(index, movies):
+    released = [Timestamp("2001-01-01T00:00:00Z"), Timestamp("1990-01-01T00:00:00Z")]
+    index.add(
+        [
+            Movie(externalId="movie1", title="Casablanca", genres=[], release=released[0]),
+            Movie(externalId="movie3", title="Thor: Ragnarok", genres=[], release=Timestamp("2020-01-01T00:00:00Z")),
+            Movie(externalId="movie3", title="Thor: Ragnarok", genres=[], release=released[1]),
+            Movie(externalId="movie4", title="Thor: Love and Thunder", genres=[]),
+        ]
+    )
+    assert len(index) == 4
+    assert ext_ids(index.query(release__lt="2005-01-01T00:00:00Z")) == ["movie1", "movie3"]
+    assert ext_ids(index.query(release__gte="2005-01-01T00:00:00Z")) == ["movie2"]
+
+    index.remove(["movie1", "movie2"])
+    assert ext_ids(index.query(release__gte="1900-01-01T00:00:00Z")) == ["movie3"]
+
+
+def test_invalid_queries(index):
+    with pytest.raises(ValueError):
+        index.query(title__like="Thor")
+    with pytest.raises(ValueError):
+        index.query(rating=5)
+    with pytest.raises(ValueError):
+        LocalIndex(Movie, hash_fields=["rating"])
@@ -0,0 +1,146 @@
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from cognite.dm_clients.cdf.data_classes_dm_v3 import View
+from cognite.dm_clients.domain_modeling.bulk import Checkpoint, Progress
+from cognite.dm_clients.domain_modeling.testing import create_test_client_factory
+from examples.cinematography_domain.client import CineClient
+from examples.cinematography_domain.schema import cine_schema
+
+SPACE = "IntegrationTestsImmutable"
+
+
+def view(external_id: str, version: str, properties: Dict[str, dict]) -> View:
+    return View(space=SPACE, externalId=external_id, version=version, properties=properties)
+
+
+def edge_prop(edge_type: str) -> dict:
+    return {"type": {"space": SPACE, "externalId": edge_type}, "direction": "outwards"}
+
+
+VIEWS = {
+    ("Movie", "1"): view("Movie", "1", {"title": {}, "rating": {}, "actors": edge_prop("Movie.actors")}),
+    ("Movie", "2"): view("Movie", "2", {"title": {}, "genres": {}, "cast": edge_prop("Movie.cast")}),
+    ("Person", "1"): view("Person", "1", {"name": {}}),
+    ("Person", "2"): view("Person", "2", {"name": {}}),
+    ("Movie", "3"): view("Movie", "3", {"title": {}, "genres": {}, "cast": edge_prop("Movie.cast")}),
+    ("Person", "3"): view("Person", "3", {"name": {}}),
+}
+
+
+def node(external_id: str, view_ext_id: str, **properties: Any) -> dict:
+    return {
+        "instanceType": "node",
+        "space": SPACE,
+        "externalId": external_id,
+        "properties": {SPACE: {view_ext_id: properties}},
+    }
+
+
+NODE_PAGES = {
+    ("Movie", None): {"items": [node("movie1", "Movie/1", title="Casablanca", rating=9)], "nextCursor": "movies2"},
+    ("Movie", "movies2"): {"items": [node("movie2", "Movie/1", title="Thor", rating=6)]},
+    ("Person", None): {"items": [node("person1", "Person/1", name="Ingrid Bergman")]},
+}
+EDGE = {
+    "instanceType": "edge",
+    "space": SPACE,
+    "externalId": "movie1.actors__person1",
+    "type": {"space": SPACE, "externalId": "Movie.actors"},
+    "startNode": {"space": SPACE, "externalId": "movie1"},
+    "endNode": {"space": SPACE, "externalId": "person1"},
+}
+
+
+class FakeDM:
+    def __init__(self, fail_on: Optional[str] = None):
+        self.applied: List[dict] = []
+        self.listed: List[dict] = []
+        self.fail_on = fail_on
+
+    def route(self, path: str, payload: Dict[str, Any]) -> dict:
+        if not path.endswith("/instances/list"):
+            self.applied.extend(payload["items"])
+            return {"items": []}
+        self.listed.append(payload)
+        if payload["instanceType"] == "edge":
+            return {"items": [EDGE]}
+        page = (payload["sources"][0]["source"]["externalId"], payload.get("cursor"))
+        if page[1] is not None and page[1] == self.fail_on:
+            raise ConnectionError("interrupted")
+        return NODE_PAGES.get(page, {"items": []})
+
+
+def transform(type_name: str, external_id: str, properties: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if type_name == "Movie":
+        return None if properties["title"] == "Thor" else {"title": properties["title"], "genres": ["drama"]}
+    return properties
+
+
+def test_migrate_nodes_and_renamed_edges(tmp_path, fake_transport):
+    fake = FakeDM()
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route, VIEWS.values())
+        progress = test_client.migrate(
+            1, 2, transform=transform, renamed_attrs={"Movie": {"actors": "cast"}}, checkpoint_path=tmp_path / "cp"
+        )
+
+    nodes = {item["externalId"]: item for item in fake.applied if item["instanceType"] == "node"}
+    assert set(nodes) == {"movie1", "person1"}
+    assert nodes["movie1"]["sources"][0]["source"]["version"] == "2"
+    assert nodes["movie1"]["sources"][0]["properties"] == {"title": "Casablanca", "genres": ["drama"]}
+    (edge,) = [item for item in fake.applied if item["instanceType"] == "edge"]
+    assert edge["externalId"] == "movie1.cast__person1"
+    assert edge["type"] == {"space": SPACE, "externalId": "Movie.cast"}
+    assert progress.counts == {
+        "nodes read": 3,
+        "nodes skipped": 1,
+        "nodes written": 2,
+        "edges read": 1,
+        "edges written": 1,
+    }
+    assert "nodes written: 2" in str(progress)
+
+    # completed, nothing is read again:
+    fake.listed.clear()
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route, VIEWS.values())
+        test_client.migrate(1, 2, transform=transform, checkpoint_path=tmp_path / "cp")
+    assert fake.listed == []
+
+    # the next migration, with the same checkpoint file, is not skipped:
+    fake.applied.clear()
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route, VIEWS.values())
+        progress = test_client.migrate(2, 3, checkpoint_path=tmp_path / "cp")
+    assert progress.counts["nodes written"] == 3
+    assert {item["sources"][0]["source"]["version"] for item in fake.applied} == {"3"}
+
+
+def test_migrate_continues_from_checkpoint(tmp_path, fake_transport):
+    checkpoint_path = tmp_path / "cp"
+    fake = FakeDM(fail_on="movies2")
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route, VIEWS.values())
+        with pytest.raises(ConnectionError):
+            test_client.migrate(1, 2, checkpoint_path=checkpoint_path)
+    assert Checkpoint(checkpoint_path).get("Movie 1->2/nodes") == "movies2"
+
+    fake.fail_on = None
+    fake.listed.clear()
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route, VIEWS.values())
+        test_client.migrate(1, 2, checkpoint_path=checkpoint_path)
+    movie_pages = [payload.get("cursor") for payload in fake.listed if payload["instanceType"] == "node"]
+    assert movie_pages[0] == "movies2"
+    assert Checkpoint(checkpoint_path).get("Movie 1->2/nodes") == "done"
+
+
+def test_bulk_helpers():
+    reported = []
+    progress = Progress(on_progress=lambda p: reported.append(dict(p.counts)))
+    progress.add("items", 3)
+    progress.add("items", 2)
+    assert reported == [{"items": 3}, {"items": 5}]
+    assert progress.rate("items") > 0
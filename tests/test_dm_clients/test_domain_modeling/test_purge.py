@@ -0,0 +1,197 @@
+from typing import Any, Dict, List
+
+from cognite.dm_clients.cdf.data_classes_dm_v3 import View
+from cognite.dm_clients.domain_modeling.testing import Config, create_test_client_factory
+from examples.cinematography_domain.client import CineClient, MovieFields
+from examples.cinematography_domain.schema import Movie, cine_schema
+
+SPACE = Config.space
+
+VIEWS = {
+    "Movie": View(
+        space=SPACE,
+        externalId="Movie",
+        version=str(Config.version),
+        properties={
+            "title": {},
+            "release": {},
+            "director": {},
+            "actors": {"type": {"space": SPACE, "externalId": "Movie.actors"}, "direction": "outwards"},
+            "producers": {"type": {"space": SPACE, "externalId": "Movie.producers"}, "direction": "outwards"},
+        },
+    ),
+    "Person": View(space=SPACE, externalId="Person", version=str(Config.version), properties={"name": {}}),
+}
+
+
+def instance(instance_type: str, external_id: str, **properties: Any) -> dict:
+    item = {"instanceType": instance_type, "space": SPACE, "externalId": external_id}
+    if properties:
+        item["properties"] = {SPACE: {f"Movie/{Config.version}": properties}}
+    return item
+
+
+def edge(start: str, end: str) -> dict:
+    return {
+        **instance("edge", f"{start}.actors__{end}"),
+        "type": {"space": SPACE, "externalId": "Movie.actors"},
+        "startNode": {"space": SPACE, "externalId": start},
+        "endNode": {"space": SPACE, "externalId": end},
+    }
+
+
+class FakeDM:
+    def __init__(self, pages: Dict[Any, dict]):
+        self.pages = pages
+        self.listed: List[dict] = []
+        self.deleted: List[str] = []
+
+    def route(self, path: str, payload: Dict[str, Any]) -> dict:
+        if path.endswith("/instances/list"):
+            self.listed.append(payload)
+            if "sources" in payload:
+                key: Any = (payload["sources"][0]["source"]["externalId"], payload.get("cursor"))
+            elif "startNode" in str(payload["filter"]):
+                key = tuple(value[1] for value in payload["filter"]["and"][1]["in"]["values"])
+            else:
+                key = (payload["instanceType"], payload.get("cursor"))
+            return self.pages.get(key, {"items": []})
+        if path.endswith("/instances/byids"):
+            self.listed.append(payload)
+            return self.pages.get(("byids", *(item["externalId"] for item in payload["items"])), {"items": []})
+        assert path.endswith("/instances/delete")
+        self.deleted.extend(f"{item['instanceType']} {item['externalId']}" for item in payload["items"])
+        return {"items": []}
+
+
+def test_purge_type(fake_transport):
+    fake = FakeDM(
+        {
+            ("Movie", None): {"items": [instance("node", "movie1")], "nextCursor": "movies2"},
+            ("Movie", "movies2"): {"items": [instance("node", "movie2")]},
+            ("movie1",): {"items": [edge("movie1", "person1"), edge("movie1", "person2")]},
+        }
+    )
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route, VIEWS.values())
+        adjacency_index = test_client.enable_adjacency_index()
+        test_client.movie.relationships.list(["actors"], ["movie1"])  # fills the adjacency index
+        assert adjacency_index.ends("Movie.actors", ["movie1"]) == ["person1", "person2"]
+        test_client.cache.set("movie1", "cached")
+        test_client.cache.set("person1", "cached")
+
+        progress = test_client.movie.purge(MovieFields.release < "1950-01-01T00:00:00Z", page_size=1, chunk_size=1)
+
+        assert test_client.cache.get("movie1") is None
+        assert test_client.cache.get("person1") == "cached"
+        assert adjacency_index.ends("Movie.actors", ["movie1"]) == []
+
+    assert progress.counts == {"edges deleted": 2, "nodes deleted": 2}
+    assert fake.deleted == [
+        "edge movie1.actors__person1",
+        "edge movie1.actors__person2",
+        "node movie1",
+        "node movie2",
+    ]
+    node_lists = [payload for payload in fake.listed if payload["instanceType"] == "node"]
+    assert [payload.get("cursor") for payload in node_lists] == [None, "movies2"]
+    assert all(payload["filter"]["range"]["lt"] == "1950-01-01T00:00:00Z" for payload in node_lists)
+
+
+def test_purge_space(fake_transport):
+    fake = FakeDM(
+        {
+            ("edge", None): {"items": [edge("movie1", "person1")], "nextCursor": "edges2"},
+            ("edge", "edges2"): {"items": [edge("movie2", "person1")]},
+            ("node", None): {"items": [instance("node", "movie1"), instance("node", "person1")]},
+        }
+    )
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route, VIEWS.values())
+        test_client.cache.set("movie1", "cached")
+        progress = test_client.purge_space()
+        assert test_client.cache.get("movie1") is None
+
+    assert progress.counts == {"edges deleted": 2, "nodes deleted": 2}
+    assert fake.deleted == [
+        "edge movie1.actors__person1",
+        "edge movie2.actors__person1",
+        "node movie1",
+        "node person1",
+    ]
+    assert fake.listed[0]["filter"] == {"equals": {"property": ["edge", "space"], "value": SPACE}}
+
+
+def test_delete_by_ids_cascade(fake_transport):
+    fake = FakeDM(
+        {
+            ("movie1", "movie2"): {
+                "items": [edge("movie1", "person1"), edge("movie2", "person1"), edge("movie2", "person2")],
+            },
+            ("byids", "movie1", "movie2"): {
+                "items": [
+                    instance("node", "movie1", director={"space": SPACE, "externalId": "person3"}),
+                    instance("node", "movie2", director=None),
+                ],
+            },
+        }
+    )
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route, VIEWS.values())
+        test_client.cache.set("person3", "cached")
+        test_client.movie.delete_by_ids(["movie1", "movie2", "movie1"], cascade=True, chunk_size=2)
+        assert test_client.cache.get("person3") is None
+
+    assert fake.deleted == [
+        "edge movie1.actors__person1",
+        "edge movie2.actors__person1",
+        "edge movie2.actors__person2",
+        "node movie1",
+        "node movie2",
+        "node person1",
+        "node person2",
+        "node person3",
+    ]
+    # one wave per level, each with batched lookups (Person has no relationships to look up):
+    assert len(fake.listed) == 2
+
+
+def test_delete_without_cascade(fake_transport):
+    fake = FakeDM({("movie1",): {"items": [edge("movie1", "person1")]}})
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route, VIEWS.values())
+        test_client.movie.delete([Movie(externalId="movie1", title="Casablanca", genres=["drama"])])
+
+    assert fake.deleted == ["edge movie1.actors__person1", "node movie1"]
+    assert [payload["instanceType"] for payload in fake.listed] == ["edge"]
+
+
+def test_dry_run_keeps_local_state(fake_transport):
+    fake = FakeDM(
+        {
+            ("Movie", None): {"items": [instance("node", "movie1")]},
+            ("movie1",): {"items": [edge("movie1", "person1")]},
+        }
+    )
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route, VIEWS.values())
+        adjacency_index = test_client.enable_adjacency_index()
+        test_client.movie.relationships.list(["actors"], ["movie1"])  # fills the adjacency index
+        local_index = test_client.movie.create_local_index(hash_fields=["title"], populate=False)
+        local_index.add([Movie(externalId="movie1", title="Casablanca", genres=["drama"])])
+        test_client.cache.set("movie1", "cached")
+        fake.listed.clear()
+
+        with test_client.explain(dry_run=True) as report:
+            test_client.movie.delete_by_ids(["movie1"])
+            test_client.movie.purge()
+            test_client.purge_space()
+
+        assert [item.externalId for item in test_client.movie.local_query(title="Casablanca")] == ["movie1"]
+        assert adjacency_index.ends("Movie.actors", ["movie1"]) == ["person1"]
+        assert test_client.cache.get("movie1") == "cached"
+
+    assert fake.deleted == []
+    assert all(node.skipped for node in report.requests if node.name.endswith("/delete"))
+    # all the lookups are reported, also those of the edges of purged nodes (listed in the thread pool):
+    assert len([node for node in report.requests if node.name.endswith("/list")]) == len(fake.listed)
@@ -0,0 +1,137 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from cognite.dm_clients.custom_types import Timestamp
+from cognite.dm_clients.domain_modeling.testing import create_test_client_factory
+from examples.cinematography_domain.client import CineClient, MovieSelection, PersonSelection
+from examples.cinematography_domain.schema import Movie, Person, cine_schema
+
+
+def test_list_query():
+    selection = MovieSelection("title").director(PersonSelection("name")).actors(first=5)
+
+    assert selection.list_query(limit=10) == (
+        "query {\n"
+        "  listMovie(first: 10) {\n"
+        "    items {\n"
+        "      externalId\n"
+        "      title\n"
+        "      director {\n"
+        "        externalId\n"
+        "        name\n"
+        "      }\n"
+        "      actors(first: 5) {\n"
+        "        items {\n"
+        "          externalId\n"
+        "          name\n"
+        "        }\n"
+        "      }\n"
+        "    }\n"
+        "  }\n"
+        "}"
+    )
+
+
+def test_unknown_field():
+    with pytest.raises(ValueError):
+        MovieSelection("director")
+
+
+def test_hydrate_partial_selection():
+    movie = (
+        MovieSelection("title", "release")
+        .director()
+        .hydrate(
+            {
+                "externalId": "movie1",
+                "title": "Casablanca",
+                "release": "1942-11-26T00:00:00.123456Z",
+                "director": {"externalId": "person1", "name": "Michael Curtiz"},
+            }
+        )
+    )
+
+    assert isinstance(movie, Movie)
+    assert movie.release == Timestamp("1942-11-26T00:00:00.123Z") and isinstance(movie.release, Timestamp)
+    assert movie.director == Person(externalId="person1", name="Michael Curtiz")
+    assert movie.genres is None  # not selected
+
+
+def test_graph_hydrates_and_caches_complete_items():
+    movie_data = {
+        "externalId": "movie1",
+        "title": "Casablanca",
+        "release": None,
+        "meta": None,
+        "genres": ["drama"],
+        "director": {"externalId": "person1", "name": "Michael Curtiz"},
+        "actors": {"items": [{"externalId": "person2", "name": "Ingrid Bergman"}]},
+        "producers": {"items": []},
+    }
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        test_client._client.graph = MagicMock(return_value={"data": {"listMovie": {"items": [movie_data]}}})
+        selection = MovieSelection().director().actors().producers()
+
+        (movie,) = test_client.graph(selection, limit=1)
+        cached_movies = test_client.movie.retrieve(["movie1"])
+        partial = test_client.graph(MovieSelection("title"))
+
+    assert movie.director.name == "Michael Curtiz"
+    assert [actor.externalId for actor in movie.actors] == ["person2"]
+    assert cached_movies == [movie]
+    assert test_client._client.graph.call_count == 2
+    assert partial[0].genres is None
+    assert test_client.cache.get("movie1").genres == ["drama"]  # the partial item is not cached
+
+
+def test_iter_graph_follows_cursors():
+    pages = [
+        {
+            "data": {
+                "listPerson": {
+                    "items": [{"externalId": "person1", "name": "A"}],
+                    "pageInfo": {"hasNextPage": True, "endCursor": "c1"},
+                }
+            }
+        },
+        {
+            "data": {
+                "listPerson": {"items": [{"externalId": "person2", "name": "B"}], "pageInfo": {"hasNextPage": False}}
+            }
+        },
+    ]
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        test_client._client.graph = MagicMock(side_effect=pages)
+
+        persons = test_client.iter_graph(PersonSelection(), page_size=1)
+        first = next(persons)
+        calls_after_first = test_client._client.graph.call_count
+        rest = list(persons)
+
+    assert [first.name, *(person.name for person in rest)] == ["A", "B"]
+    assert calls_after_first == 1
+    query, variables = test_client._client.graph.call_args_list[1].args[3:]
+    assert "listPerson(first: 1, after: $after)" in query
+    assert variables == {"after": "c1"}
+
+
+def test_graph_cache_and_graph_many():
+    response = {"data": {"listPerson": {"items": [{"externalId": "person1", "name": "A"}]}}}
+    with create_test_client_factory(CineClient, cine_schema, return_jsons=[[], [], []]) as test_client:
+        test_client._client.graph = MagicMock(return_value=response)
+        test_client.enable_graph_cache(ttl=60)
+
+        test_client.graph("{ listPerson { items { name } } }")
+        cached = test_client.graph("{\n  listPerson {\n    items { name }\n  }\n}")
+        calls_before_write = test_client._client.graph.call_count
+        test_client.person.delete([Person(externalId="person1", name="A")])
+        test_client.graph("{ listPerson { items { name } } }")
+        calls_after_write = test_client._client.graph.call_count
+        persons, raw = test_client.graph_many([PersonSelection(), "{ listPerson { items { externalId name } } }"])
+
+    assert cached == response
+    assert calls_before_write == 1
+    assert calls_after_write == 2
+    assert [person.name for person in persons] == ["A"]
+    assert raw == response
@@ -0,0 +1,117 @@
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from cognite.dm_clients.cdf.data_classes_dm_v3 import View
+from cognite.dm_clients.domain_modeling.testing import Config, create_test_client_factory
+from examples.cinematography_domain.client import CineClient
+from examples.cinematography_domain.schema import Movie, Person, cine_schema
+
+SPACE = Config.space
+
+
+def edge_prop(edge_type: str) -> dict:
+    return {"type": {"space": SPACE, "externalId": edge_type}, "direction": "outwards"}
+
+
+VIEWS = {
+    "Movie": View(
+        space=SPACE,
+        externalId="Movie",
+        version=str(Config.version),
+        properties={
+            "title": {},
+            "director": {},
+            "actors": edge_prop("Movie.actors"),
+            "producers": edge_prop("Movie.producers"),
+        },
+    ),
+    "Person": View(space=SPACE, externalId="Person", version=str(Config.version), properties={"name": {}}),
+}
+
+EXISTING_EDGE = {
+    "instanceType": "edge",
+    "space": SPACE,
+    "externalId": "movie1.actors__person0",
+    "type": {"space": SPACE, "externalId": "Movie.actors"},
+    "startNode": {"space": SPACE, "externalId": "movie1"},
+    "endNode": {"space": SPACE, "externalId": "person0"},
+}
+
+
+class FakeDM:
+    def __init__(self):
+        self.requests: List[Tuple[str, Dict[str, Any]]] = []
+
+    def route(self, path: str, payload: Dict[str, Any]) -> dict:
+        self.requests.append((path.rsplit("/", 1)[-1], payload))
+        if path.endswith("/instances/list"):
+            return {"items": [EXISTING_EDGE]}
+        return {"items": []}
+
+
+def test_session_batches_writes(fake_transport):
+    fake = FakeDM()
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route, VIEWS.values())
+        with test_client.session() as session:
+            test_client.movie.apply(
+                [
+                    Movie(
+                        externalId="movie1",
+                        title="Casablanca",
+                        genres=["drama"],
+                        director=Person(externalId="person3", name="Michael Curtiz"),
+                        actors=[
+                            Person(externalId="person1", name="Humphrey Bogart"),
+                            Person(externalId="person2", name="I.B."),
+                        ],
+                    )
+                ]
+            )
+            test_client.person.apply([Person(externalId="person2", name="Ingrid Bergman")])
+            test_client.movie.connect.actors("movie2", ["person1"])
+            test_client.movie.connect.actors("movie2", ["person1", "person2"])
+            test_client.person.delete_by_ids(["person4"])
+            assert fake.requests == []
+            assert session.pending == {"nodes": 4, "relationships": 1, "edges": 2, "deletes": 1}
+
+        assert test_client.cache.get("movie1").title == "Casablanca"
+
+    endpoints = [endpoint for endpoint, _ in fake.requests]
+    # deletes, nodes of both types, existing edges of movie1, obsolete edges, new edges:
+    assert endpoints == ["delete", "instances", "list", "delete", "instances"]
+    nodes = fake.requests[1][1]["items"]
+    assert [node["externalId"] for node in nodes] == ["person3", "person1", "person2", "movie1"]
+    assert {node["sources"][0]["source"]["externalId"] for node in nodes} == {"Movie", "Person"}
+    assert nodes[2]["sources"][0]["properties"] == {"name": "Ingrid Bergman"}  # the last write wins
+    assert [item["externalId"] for item in fake.requests[3][1]["items"]] == ["movie1.actors__person0"]
+    assert [item["externalId"] for item in fake.requests[4][1]["items"]] == [
+        "movie1.actors__person1",
+        "movie1.actors__person2",
+        "movie2.actors__person1",
+        "movie2.actors__person2",
+    ]
+
+
+def test_session_dedupes_deletes_and_discards_on_error(fake_transport):
+    fake = FakeDM()
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route, VIEWS.values())
+        with test_client.session() as session:
+            test_client.person.apply([Person(externalId="person1", name="A")])
+            test_client.person.delete_by_ids(["person1"])
+            test_client.person.delete_by_ids(["person1"])
+            assert session.pending == {"nodes": 0, "relationships": 0, "edges": 0, "deletes": 1}
+        assert [endpoint for endpoint, _ in fake.requests] == ["delete"]
+
+        fake.requests.clear()
+        with pytest.raises(KeyError):
+            with test_client.session():
+                test_client.person.apply([Person(externalId="person1", name="A")])
+                raise KeyError("oops")
+        assert fake.requests == []
+
+        # outside of the session, writes are sent right away:
+        test_client.person.apply([Person(externalId="person1", name="A")])
+        assert [endpoint for endpoint, _ in fake.requests] == ["instances"]
@@ -0,0 +1,95 @@
+from threading import Event, Thread
+from typing import Any, Dict, List
+
+import pytest
+
+from cognite.dm_clients.domain_modeling.testing import create_test_client_factory
+from examples.cinematography_domain.client import CineClient
+from examples.cinematography_domain.schema import Person, cine_schema
+
+
+class FakeDM:
+    def __init__(self, fail: bool = False):
+        self.applied: List[List[str]] = []
+        self.fail = fail
+        self.release = Event()
+        self.release.set()
+
+    def route(self, path: str, payload: Dict[str, Any]) -> dict:
+        self.release.wait(5)
+        if self.fail:
+            raise ConnectionError("unavailable")
+        self.applied.append([item["externalId"] for item in payload["items"]])
+        return {"items": []}
+
+
+def test_write_behind_coalesces_items_from_threads(fake_transport):
+    fake = FakeDM()
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route)
+        with test_client.write_behind(max_latency=60) as writer:
+
+            def produce(name: str) -> None:
+                for i in range(10):
+                    writer.apply([Person(externalId=f"person{i}", name=name)])
+
+            threads = [Thread(target=produce, args=(name,)) for name in "ABC"]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert writer.pending == 10
+            writer.flush()
+            assert writer.pending == 0
+            assert fake.applied == [[f"person{i}" for i in range(10)]]
+
+            writer.apply([Person(name="D")])  # gets an externalId
+            writer.apply([Person(externalId="person1", name="E")])
+        assert writer.progress.counts == {"items written": 12}
+        assert test_client.cache.get("person1").name == "E"
+
+    assert len(fake.applied) == 2
+    with pytest.raises(RuntimeError):
+        writer.apply([Person(externalId="person1", name="F")])
+
+
+def test_write_behind_max_batch_and_latency(fake_transport):
+    fake = FakeDM()
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route)
+        with test_client.write_behind(max_batch=2, max_latency=0.01) as writer:
+            writer.apply([Person(externalId="person1", name="A"), Person(externalId="person2", name="B")])
+            writer.flush(timeout=5)
+            writer.apply([Person(externalId="person3", name="C")])
+            for _ in range(500):  # written after max_latency, without a flush
+                if len(fake.applied) == 2:
+                    break
+                Event().wait(0.01)
+            assert fake.applied == [["person1", "person2"], ["person3"]]
+
+
+def test_write_behind_backpressure_and_errors(fake_transport):
+    fake = FakeDM(fail=True)
+    fake.release.clear()
+    failed: List[List[str]] = []
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        fake_transport(test_client, fake.route)
+        writer = test_client.write_behind(
+            max_batch=1,
+            max_pending=1,
+            on_error=lambda items, exc: failed.append([item.externalId for item in items]),
+        )
+        writer.apply([Person(externalId="person1", name="A")])  # taken, blocked in the request
+        for _ in range(500):
+            if writer.pending == 0:
+                break
+            Event().wait(0.01)
+        writer.apply([Person(externalId="person2", name="B")])  # pending
+        with pytest.raises(TimeoutError):
+            writer.apply([Person(externalId="person3", name="C")], timeout=0.05)
+
+        fake.release.set()
+        writer.close()
+
+    assert failed == [["person1"], ["person2"]]
+    assert writer.progress.counts == {"items failed": 2}
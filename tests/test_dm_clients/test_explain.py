@@ -0,0 +1,77 @@
+from cognite.dm_clients.domain_modeling.testing import ApplyResponse, create_test_client_factory
+from examples.cinematography_domain.client import CineClient
+from examples.cinematography_domain.schema import Movie, Person, cine_schema
+
+
+def make_movie() -> Movie:
+    return Movie(
+        externalId="movie1",
+        title="Casablanca",
+        genres=["drama"],
+        director=Person(externalId="person1", name="Michael Curtiz"),
+    )
+
+
+def test_explain_dry_run():
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        test_client.preload()
+        with test_client.explain(dry_run=True) as report:
+            test_client.movie.apply([make_movie()])
+        cached = test_client.cache.get("movie1")
+
+    assert cached is None
+    assert [(node.name, node.depth) for node in report.root.walk()] == [
+        ("explain", 0),
+        ("Movie.apply", 1),
+        ("Person.apply", 2),
+        ("POST models/instances", 3),
+        ("POST models/instances", 2),
+    ]
+    assert all(node.skipped for node in report.requests)
+    assert report.by_endpoint()["POST models/instances"] == {
+        "calls": 2,
+        "items": 2,
+        "max_items": 1,
+        "payload_bytes": sum(node.payload_bytes for node in report.requests),
+    }
+    assert report.hot_spots(1)[0].name == "Movie.apply"
+    assert "2 request(s) (dry run):" in str(report)
+
+
+def test_explain_issued_calls():
+    responses = [
+        [ApplyResponse(external_id="person1").dict(by_alias=True)],
+        [ApplyResponse(external_id="movie1").dict(by_alias=True)],
+    ]
+    with create_test_client_factory(CineClient, cine_schema, responses) as test_client:
+        test_client.preload()
+        with test_client.explain() as report:
+            test_client.movie.apply([make_movie()])
+
+    assert len(report.requests) == 2
+    assert not any(node.skipped for node in report.requests)
+    assert report.max_depth == 3
+
+
+def test_explain_dry_run_of_chunked_writes():
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        test_client.preload()
+        with test_client.explain(dry_run=True) as report:
+            with test_client.session():
+                test_client.movie.apply([make_movie()])
+
+    assert [node.name for node in report.requests] == ["POST models/instances"]
+    assert all(node.skipped for node in report.requests)
+
+
+def test_explain_dry_run_keeps_cached_items(mocker):
+    with create_test_client_factory(CineClient, cine_schema) as test_client:
+        test_client.preload()
+        cached = make_movie()
+        test_client.cache.set("movie1", cached)
+        clear_graph_cache = mocker.spy(test_client, "clear_graph_cache")
+        with test_client.explain(dry_run=True):
+            test_client.movie.apply([Movie(externalId="movie1", title="Casablanca (1942)", genres=["drama"])])
+
+        assert test_client.cache.get("movie1") == cached
+        clear_graph_cache.assert_not_called()
@@ -0,0 +1,143 @@
+import pytest
+from cachelib import SimpleCache
+from cognite.client import ClientConfig
+from cognite.client.credentials import CredentialProvider
+from cognite.client.exceptions import CogniteAPIError
+
+from cognite.dm_clients import explain
+from cognite.dm_clients.cdf.client_dm_v3 import _MAX_TRIES, DataModelAPI, DataModelStorageAPI
+from cognite.dm_clients.cdf.client_registry import client_registry
+from cognite.dm_clients.domain_modeling import DomainModelAPI
+from cognite.dm_clients.domain_modeling.testing import ApplyResponse, create_test_client_factory
+from cognite.dm_clients.metrics import Metrics, MetricsExporter
+from examples.cinematography_domain.client import CineClient
+from examples.cinematography_domain.schema import Person, cine_schema
+from tests.test_dm_clients.test_cdf._utils import *  # noqa
+
+
+@pytest.fixture
+def make_api(mocker, make_cognite_client):
+    def _make_api(responses, api_class=DataModelStorageAPI):
+        return api_class(
+            config=mocker.MagicMock(project="mock_proj"),
+            api_version="mock_api_version",
+            cognite_client=make_cognite_client(responses),
+        )
+
+    return _make_api
+
+
+class ListExporter(MetricsExporter):
+    def __init__(self):
+        self.records = []
+
+    def record(self, name, value, labels):
+        self.records.append((name, value, labels))
+
+
+def test_disabled_by_default(make_api):
+    mock_api = make_api([{"items": ["A"]}])
+    mock_api._post_to_endpoint({"mock": "data"}, "/models/instances/list")
+    assert mock_api.metrics.snapshot()["counters"] == {}
+
+
+def test_request_metrics(make_api):
+    mock_api = make_api([{"items": ["A", "B"], "nextCursor": "abc"}, {"items": ["C"]}])
+    exporter = ListExporter()
+    mock_api.metrics.enable()
+    mock_api.metrics.add_exporter(exporter)
+
+    mock_api._post_to_endpoint({"mock": "data"}, "/models/instances/list")
+
+    snapshot = mock_api.metrics.snapshot()
+    assert snapshot["counters"]["requests"] == {"POST models/instances/list": 2}
+    items = snapshot["histograms"]["request_items"]["POST models/instances/list"]
+    assert items["count"] == 2
+    assert items["sum"] == 3
+    assert ("requests", 1, {"method": "POST", "endpoint": "models/instances/list"}) in exporter.records
+
+
+def test_retries_exclude_the_last_attempt(make_api, mocker):
+    mocker.patch("retry.api.time.sleep")
+    mock_api = make_api([])
+    mock_api.metrics.enable()
+    failure = CogniteAPIError("unavailable", 503)
+    mock_api._cognite_client.post.side_effect = [failure, failure, mock_api._cognite_client.post.return_value]
+    mock_api._cognite_client.post.return_value.json.side_effect = [{"items": ["A"]}]
+    mock_api._post_to_endpoint({"mock": "data"}, "/models/instances/list")
+    assert mock_api.metrics.snapshot()["counters"]["retries"] == {"POST models/instances/list": 2}
+
+    mock_api.metrics.reset()
+    mock_api._cognite_client.post.side_effect = failure
+    with pytest.raises(CogniteAPIError):
+        mock_api._post_to_endpoint({"mock": "data"}, "/models/instances/list")
+    assert mock_api.metrics.snapshot()["counters"]["retries"] == {"POST models/instances/list": _MAX_TRIES - 1}
+
+
+def test_graphql_is_recorded(make_api):
+    mock_api = make_api([{"data": {"listMovie": {"items": []}}}], api_class=DataModelAPI)
+    mock_api.metrics.enable()
+    with explain.explain() as report:
+        mock_api.graphql("cine", "Cine", "1", "{ listMovie { items { title } } }")
+
+    endpoint = "userapis/spaces/cine/datamodels/Cine/versions/1/graphql"
+    assert mock_api.metrics.snapshot()["counters"]["requests"] == {f"POST {endpoint}": 1}
+    assert [node.name for node in report.requests] == [f"POST {endpoint}"]
+
+
+def test_prometheus_text():
+    metrics = Metrics(enabled=True)
+    metrics.record_request("POST", "models/instances", 0.02, 100, 2000, 3)
+    metrics.record_cache(hits=2, misses=1)
+    text = metrics.prometheus_text()
+    assert 'dm_clients_requests_total{method="POST",endpoint="models/instances"} 1' in text
+    assert 'dm_clients_request_latency_seconds_bucket{method="POST",endpoint="models/instances",le="0.025"} 1' in text
+    assert "dm_clients_cache_hits_total 2" in text
+    assert "dm_clients_thread_pool_queue_depth 0" in text
+
+
+def test_prometheus_label_escaping():
+    metrics = Metrics(enabled=True)
+    metrics.record_operation('Movie."apply"\\\n', 0.01, 1)
+    text = metrics.prometheus_text()
+    assert 'dm_clients_operations_total{operation="Movie.\\"apply\\"\\\\\\n"} 1' in text
+
+
+def test_domain_client_stats():
+    responses = [[ApplyResponse(external_id="person1").dict(by_alias=True)]]
+    with create_test_client_factory(CineClient, cine_schema, responses) as test_client:
+        test_client.metrics.enable()
+        test_client.person.apply([Person(externalId="person1", name="Michael Curtiz")])
+        stats = test_client.stats()
+
+    assert stats["counters"]["operations"] == {"Person.apply": 1}
+    assert stats["histograms"]["operation_items"]["Person.apply"]["sum"] == 1
+
+
+def test_stats_shared_per_config(mocker):
+    def make_config() -> ClientConfig:
+        credentials = mocker.MagicMock(spec_set=CredentialProvider)
+        return ClientConfig(client_name="test", project="proj", credentials=credentials, base_url="https://x")
+
+    def make_client(config: ClientConfig, space_id: str) -> CineClient:
+        return CineClient(cine_schema, DomainModelAPI, SimpleCache(), config, space_id, "Cine", 1)
+
+    config, other_config = make_config(), make_config()
+    try:
+        first, second = make_client(config, "space1"), make_client(config, "space2")
+        other = make_client(other_config, "space1")
+        first.metrics.enable()
+        first.metrics.record_request("POST", "models/instances", 0.02, 100, 2000, 3)
+
+        assert second.stats() == first.stats()
+        assert second.stats()["counters"]["requests"] == {"POST models/instances": 1}
+        assert not other.metrics.enabled
+        assert other.stats()["counters"] == {}
+    finally:
+        client_registry.discard(config)
+        client_registry.discard(other_config)
+
+
+def test_exporter_must_implement_record():
+    with pytest.raises(TypeError):
+        MetricsExporter()
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from pydantic import Field
+
+from cognite.dm_clients.custom_types import JSONObject, Timestamp
+from cognite.dm_clients.domain_modeling import DomainModel, Schema
+
+schema_2: Schema[DomainModel] = Schema()
+
+
+@schema_2.register_type
+class Wellbore(DomainModel):
+    name: str
+    meta: Optional[JSONObject] = None
+
+
+@schema_2.register_type
+class Well(DomainModel):
+    name: str
+    depth: float
+    active: bool
+    spud: Timestamp
+    readings: List[int]
+    tags: Optional[List[str]] = None
+    wellbores: Optional[List[Wellbore]] = []
+    operator_name: Optional[str] = Field(None, alias="operatorName")
+
+
+@schema_2.register_type(root_type=True)
+class Field_(DomainModel):
+    name: str
+    wells: List[Optional[Well]]
+
+
+@schema_2.register_type
+class Unreachable(DomainModel):
+    name: str
+
+
+schema_2.close()
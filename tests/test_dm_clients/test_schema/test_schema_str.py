@@ -1,6 +1,11 @@
+import subprocess
+import sys
+
 import pytest
 
+from cognite.dm_clients.custom_types import SCALARS, _scalars
 from cognite.dm_clients.domain_modeling import DomainModel, Schema
+from tests.constants import CINEMATOGRAPHY
 
 
 @pytest.fixture
@@ -24,3 +29,32 @@ def test_schema_1(schema: Schema):
     schema.close()
     qgl_str = schema.as_str()
     assert qgl_str.strip() == schema_1.expected.strip()
+
+
+def test_import_schema_without_strawberry():
+    code = (
+        "import sys, examples.cinematography_domain.schema;"
+        "assert not {'strawberry', 'cognite.client'} & set(sys.modules), 'imported eagerly'"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_scalar_names():
+    assert set(SCALARS) == set(_scalars.__all__)
+
+
+def test_native_rendering_identical_to_strawberry():
+    from .schema_2 import schema_2
+
+    assert schema_2.as_str() == schema_2._as_str_with_strawberry()
+    assert "Unreachable" not in schema_2.as_str()
+
+
+def test_native_rendering_falls_back_to_strawberry(mocker):
+    from examples.cinematography_domain.schema import cine_schema
+
+    mocker.patch("cognite.dm_clients.domain_modeling.schema.render_types", return_value=None)
+    as_str_with_strawberry = mocker.spy(cine_schema, "_as_str_with_strawberry")
+
+    assert cine_schema.as_str() == (CINEMATOGRAPHY / "schema.graphql").read_text()
+    as_str_with_strawberry.assert_called_once()
@@ -0,0 +1,100 @@
+import shutil
+import time
+from pathlib import Path
+from threading import Event, Thread
+
+import click
+import pytest
+
+from cognite.gqlpygen.batch import GenerationJob, Manifest, expand_schemas, generate, watch
+from cognite.gqlpygen.main import to_python
+from tests.constants import CINEMATOGRAPHY, TestSchemas
+
+
+def make_jobs(tmp_path: Path) -> list[GenerationJob]:
+    for domain, schema in [("cine", CINEMATOGRAPHY / "schema.graphql"), ("foobar", TestSchemas.foobar)]:
+        (tmp_path / domain).mkdir(exist_ok=True)
+        shutil.copy(schema, tmp_path / domain / "schema.graphql")
+    return [
+        GenerationJob(path, path.parent, f"{path.parent.name.title()}Client", f"{path.parent.name}_schema")
+        for path in expand_schemas([tmp_path / "*" / "schema.graphql"])
+    ]
+
+
+def test_generate_skips_unchanged_schemas(tmp_path):
+    jobs = make_jobs(tmp_path)
+    manifest_path = tmp_path / "manifest.json"
+
+    first = generate(jobs, Manifest(manifest_path), workers=2)
+    second = generate(jobs, Manifest(manifest_path))
+    (tmp_path / "cine" / "client.py").write_text("# edited\n")
+    third = generate(jobs, Manifest(manifest_path))
+    forced = generate(jobs, Manifest(manifest_path), force=True)
+
+    assert [len(result.written) for result in first] == [2, 2]
+    assert all(result.skipped for result in second)
+    assert [result.skipped for result in third] == [False, True]
+    assert [path.name for path in third[0].written] == ["client.py"]
+    assert [path.name for path in third[0].unchanged] == ["schema.py"]
+    assert all(not result.written and len(result.unchanged) == 2 for result in forced)
+
+
+def test_watch_regenerates_changed_schemas(tmp_path):
+    jobs = make_jobs(tmp_path)
+    batches = []
+    stop = Event()
+    thread = Thread(target=watch, args=(lambda: jobs, batches.append), kwargs={"interval": 0.01, "stop": stop})
+    thread.start()
+    try:
+        while not batches:
+            time.sleep(0.01)
+        schema = tmp_path / "foobar" / "schema.graphql"
+        schema.write_text(schema.read_text().replace("type", "\ntype"))
+        while len(batches) < 2:
+            time.sleep(0.01)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert batches[1][0].job.graphql_schema.parent.name == "foobar"
+
+
+def test_watch_survives_broken_schema(tmp_path):
+    jobs = make_jobs(tmp_path)
+    schema = tmp_path / "foobar" / "schema.graphql"
+    valid = schema.read_text()
+    batches = []
+    stop = Event()
+    thread = Thread(target=watch, args=(lambda: jobs, batches.append), kwargs={"interval": 0.01, "stop": stop})
+    thread.start()
+    try:
+        while not batches:
+            time.sleep(0.01)
+        schema.write_text(valid.replace("type", "tpye", 1))  # saved half-edited
+        while len(batches) < 2:
+            time.sleep(0.01)
+        schema.write_text(valid.replace("type", "\ntype"))
+        while len(batches) < 3:
+            time.sleep(0.01)
+    finally:
+        stop.set()
+        thread.join()
+
+    broken, fixed = batches[1][0], batches[2][0]
+    assert broken.error is not None and "Syntax Error" in broken.error
+    assert not broken.written
+    assert fixed.error is None
+    assert [path.name for path in fixed.unchanged] == ["client.py", "schema.py"]
+
+
+def test_schemas_in_the_same_directory(tmp_path):
+    shutil.copy(CINEMATOGRAPHY / "schema.graphql", tmp_path / "cine.graphql")
+    shutil.copy(TestSchemas.foobar, tmp_path / "foobar.graphql")
+    jobs = [GenerationJob(path, tmp_path, "Client", "schema") for path in expand_schemas([tmp_path / "*.graphql"])]
+
+    with pytest.raises(ValueError, match="would all be generated in"):
+        generate(jobs)
+    with pytest.raises(click.UsageError, match="would all be generated in"):
+        to_python([tmp_path / "*.graphql"], manifest=None)
+    assert not (tmp_path / "client.py").exists()
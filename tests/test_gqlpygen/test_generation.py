@@ -1,3 +1,7 @@
+import pickle
+import sys
+import types
+
 import pytest
 
 from cinematography_domain.schema import cine_schema
@@ -39,3 +43,57 @@ def test_generate_client_sdk_from_graphql(
     actual = to_client_sdk(graphql_schema, client_name, schema_name)
 
     assert actual == expected
+
+
+def test_generate_read_only_models(monkeypatch):
+    graphql_schema = (CINEMATOGRAPHY / "schema.graphql").read_text()
+    sdk = to_client_sdk(graphql_schema, "CineClient", "cine_schema", read_only_models=True)
+
+    module = types.ModuleType("generated_cine_schema")
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    exec(compile(sdk.schema, "schema.py", "exec"), module.__dict__)
+    generated_schema = module.cine_schema
+
+    assert generated_schema.read_only_types == {
+        module.Movie: module.MovieReadOnly,
+        module.Person: module.PersonReadOnly,
+    }
+    assert module.PersonReadOnly.__slots__ == ("name",)
+    person = module.PersonReadOnly("person1", name="Michael Curtiz")
+    assert pickle.loads(pickle.dumps(person)) == person
+
+
+def test_generate_cyclic_schema(monkeypatch):
+    graphql_schema = "type Tag {\n  name: String\n  parent: Tag\n  items: [Item]\n}\n\ntype Item {\n  tags: [Tag]\n}\n"
+    sdk = to_client_sdk(graphql_schema, "TagClient", "tag_schema")
+
+    module = types.ModuleType("generated_tag_schema")
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    exec(compile(sdk.schema, "schema.py", "exec"), module.__dict__)
+
+    assert module.tag_schema.as_str().endswith(
+        "type Item {\n  tags: [Tag]\n}\n\ntype Tag {\n  name: String\n  parent: Tag\n  items: [Item]\n}"
+    )
+    assert module.Tag(externalId="tag1", parent=module.Tag(externalId="tag2")).parent.externalId == "tag2"
+
+
+def test_generate_container_hints(monkeypatch):
+    graphql_schema = "type Item {\n  title: String! @index\n  code: String @unique\n}\n"
+    sdk = to_client_sdk(graphql_schema, "ItemClient", "item_schema")
+
+    module = types.ModuleType("generated_item_schema")
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    exec(compile(sdk.schema, "schema.py", "exec"), module.__dict__)
+
+    assert module.Item.get_indexed_attrs() == ["title"]
+    assert module.Item.get_unique_attrs() == ["code"]
+    assert module.item_schema.as_str().endswith("type Item {\n  title: String!\n  code: String\n}")
+
+
+def test_generate_client_without_scalar_fields():
+    sdk = to_client_sdk("type Tag {\n  items: [Item]\n}\n\ntype Item {\n  tags: [Tag]\n}\n", "TagClient", "tag_schema")
+    assert "from typing import Optional\n" in sdk.client
+    assert "Literal" not in sdk.client
+
+    sdk = to_client_sdk("type Tag {\n  name: String\n}\n", "TagClient", "tag_schema")
+    assert "from typing import Literal, Optional\n" in sdk.client
@@ -1,7 +1,7 @@
 import pytest
 
 from cognite.gqlpygen.data_classes import DomainModel, Field
-from cognite.gqlpygen.parser import parse_graphql
+from cognite.gqlpygen.parser import parse_graphql, strip_hint_directives
 from tests.constants import CINEMATOGRAPHY
 
 
@@ -28,3 +28,47 @@ def test_parse_graphql(schema: str, expected_models: list[DomainModel]):
     actual_models = parse_graphql(schema)
 
     assert sorted(actual_models, key=lambda m: m.name) == sorted(expected_models, key=lambda m: m.name)
+
+
+def test_topological_order_with_cycles():
+    models = parse_graphql(
+        """
+        type Tag { name: String parent: Tag items: [Item] }
+        type Item { name: String! tags: [Tag] owner: Owner }
+        type Owner { name: String }
+        type Shelf { items: [Item] }
+        """
+    )
+
+    assert [model.name for model in models.topological_order] == ["Owner", "Tag", "Item", "Shelf"]
+
+
+def test_topological_order_unknown_type():
+    with pytest.raises(ValueError, match="Unknown type"):
+        parse_graphql("type Item { owner: Owner }").topological_order
+
+
+def test_parse_container_hints():
+    schema = "type Item {\n  title: String! @index\n  code: String @unique @index\n  tags: [String]\n}\n"
+    (item,) = parse_graphql(schema)
+
+    assert [(field.name, field.is_indexed, field.is_unique) for field in item.fields] == [
+        ("title", True, False),
+        ("code", True, True),
+        ("tags", False, False),
+    ]
+    assert [field.type_hint for field in item.fields] == [
+        "str = Field(..., index=True)",
+        "Optional[str] = Field(None, index=True, unique=True)",
+        "Optional[List[Optional[str]]] = []",
+    ]
+    assert strip_hint_directives(schema) == "type Item {\n  title: String!\n  code: String\n  tags: [String]\n}\n"
+
+
+def test_strip_hint_directives_only_in_field_directives():
+    schema = (
+        '"""Items, @index them by title"""\n'
+        'type Item {\n  "Unique, see @unique"\n  title: String! @index @deprecated(reason: "no @unique")\n}\n'
+    )
+
+    assert strip_hint_directives(schema) == schema.replace(" @index @", " @")